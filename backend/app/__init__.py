@@ -1,9 +1,10 @@
 import os
-from flask import Flask, render_template
+from flask import Flask
 from flask_cors import CORS
-from flask import send_from_directory
 from flask_jwt_extended import JWTManager
 from app.extensions import db, migrate
+from app import database
+from app.utils import assets, cache, compression, hashing, health, log, metrics, slow_queries
 from app.routes import register_routes
 from dotenv import load_dotenv
 
@@ -22,10 +23,19 @@ def create_app():
 
     app.config.from_object("config.Config")
 
-    CORS(app, supports_credentials=True, origins=app.config["CORS_ORIGINS"])
+    CORS(app, supports_credentials=True, origins=app.config["CORS_ORIGINS"], expose_headers=["ETag", "X-Request-ID"])
 
     db.init_app(app)
     migrate.init_app(app, db)
+    log.init_app(app)
+    database.init_app(app)
+    slow_queries.init_app(app)
+    cache.init_app(app)
+    compression.init_app(app)
+    assets.init_app(app)
+    hashing.init_app(app)
+    metrics.init_app(app)
+    health.init_app(app)
     JWTManager(app)
 
     register_routes(app)
@@ -33,22 +43,9 @@ def create_app():
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def serve_frontend(path):
-        templates_dir = os.path.join(BASE_DIR, "templates")
-        static_dir = os.path.join(BASE_DIR, "static")
-
-        # Serve actual static files (_next, images)
-        static_path = os.path.join(static_dir, path)
-        if path != "" and os.path.exists(static_path):
-            return send_from_directory(static_dir, path)
-
-        # Serve HTML files from templates
-        html_file = os.path.join(templates_dir, f"{path}.html")
-        if path != "" and os.path.exists(html_file):
-            return render_template(f"{path}.html")
-
-        # Otherwise return index.html
-        return render_template("index.html")
-
+        # Static files (_next, images), then HTML pages, otherwise index.html;
+        # all answered from the manifest built in assets.init_app
+        return assets.serve(path)
 
     return app
 
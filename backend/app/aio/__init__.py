@@ -0,0 +1,21 @@
+"""Optional ASGI entry point: the hot read endpoints on asyncio + asyncpg.
+
+Needs the optional packages in requirements-async.txt (asyncpg, starlette,
+a2wsgi, uvicorn); the Flask app (run.py) does not.
+"""
+try:
+    import a2wsgi  # noqa: F401
+    import asyncpg  # noqa: F401
+    import starlette  # noqa: F401
+except ImportError as e:
+    raise ImportError("The ASGI app needs asyncpg, starlette and a2wsgi: pip install -r requirements-async.txt") from e
+
+
+def create_asgi_app(flask_app=None):
+    from app import create_app
+    from app.aio import routes
+    from app.aio.server import AsyncAPI
+
+    api = AsyncAPI(flask_app or create_app())
+    routes.register(api)
+    return api.build()
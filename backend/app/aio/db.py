@@ -0,0 +1,80 @@
+"""asyncpg counterparts of the data-layer helpers the read endpoints use.
+
+The SQL comes from the same model builders as the Flask side (Student.query_sql,
+Student.seek_sql, ...), which emit psycopg2-style %s placeholders;
+app.database.numbered turns them into asyncpg's $1, $2, ...
+"""
+import json
+
+import asyncpg
+
+from app.database import numbered
+
+
+async def fetch(conn, sql, params=()):
+    return await conn.fetch(numbered(sql), *params)
+
+
+async def fetchval(conn, sql, params=()):
+    return await conn.fetchval(numbered(sql), *params)
+
+
+async def table_versions(conn, tables):
+    rows = await conn.fetch(
+        "SELECT table_name, version FROM table_versions WHERE table_name = ANY($1::text[])", list(tables)
+    )
+    versions = {row["table_name"]: row["version"] for row in rows}
+    return [versions.get(table, 0) for table in tables]
+
+
+async def estimate_rows(conn, from_sql, params):
+    plan = await fetchval(conn, f"EXPLAIN (FORMAT JSON) SELECT 1 {from_sql}", params)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate(conn, select_sql, from_sql, order_sql, params, page, page_size, count, order_params,
+                   estimate_threshold):
+    """Async app.utils.pagination.paginate(): ``(rows, total, exact)``."""
+    offset = (page - 1) * page_size
+    page_params = params + list(order_params) + [page_size, offset]
+
+    if count == "estimate":
+        estimate = await estimate_rows(conn, from_sql, params)
+        if estimate >= estimate_threshold:
+            rows = await fetch(conn, f"{select_sql} {from_sql} {order_sql} LIMIT %s OFFSET %s", page_params)
+            return [tuple(row) for row in rows], estimate, False
+
+    rows = await fetch(conn, f"{select_sql}, COUNT(*) OVER () {from_sql} {order_sql} LIMIT %s OFFSET %s", page_params)
+    if rows:
+        return [tuple(row)[:-1] for row in rows], rows[0][-1], True
+
+    # Past the last page the window has no rows to ride on
+    if offset:
+        return [], await fetchval(conn, f"SELECT COUNT(*) {from_sql}", params), True
+    return [], 0, True
+
+
+async def iter_chunks(conn, sql, params, chunk_size):
+    """Yield lists of up to ``chunk_size`` rows from a server-side cursor.
+
+    Must run inside a transaction on ``conn`` (asyncpg cursors require one).
+    """
+    cursor = await conn.cursor(numbered(sql), *params)
+    while True:
+        rows = await cursor.fetch(chunk_size)
+        if not rows:
+            break
+        yield [tuple(row) for row in rows]
+
+
+async def create_pool(config):
+    return await asyncpg.create_pool(
+        config["DATABASE_URL"],
+        min_size=config["ASYNC_DB_POOL_MIN_SIZE"],
+        max_size=config["ASYNC_DB_POOL_MAX_SIZE"],
+        # asyncpg prepares every statement it runs; a transaction-pooling proxy
+        # (DB_PREPARED_STATEMENTS=false) cannot keep them between calls
+        statement_cache_size=100 if config["DB_PREPARED_STATEMENTS"] else 0,
+    )
@@ -0,0 +1,250 @@
+"""Async versions of the read endpoints, with the same JSON as their Flask views."""
+import json
+
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.aio import db
+from app.models.college import College
+from app.models.program import Program
+from app.models.student import Student
+from app.utils.cache import reference_cache
+from app.utils.log import get_logger
+from app.utils.pagination import InvalidCursor, decode_cursor, page_cursors
+
+log = get_logger(__name__)
+
+
+def _arg(request, name, default=None):
+    # The first value, as request.args.get() in a Flask view
+    values = request.query_params.getlist(name)
+    return values[0] if values else default
+
+
+def _filter_args(request):
+    """app.controllers.student_controller._filter_args() for an async request."""
+    search = _arg(request, 'search', '').lower()
+    search_by = _arg(request, 'searchBy', 'all')
+    sort_by = _arg(request, 'sortBy', 'studentID')
+    sort_order = _arg(request, 'order', 'asc')
+
+    program_codes = _arg(request, 'programCode').lower().split(',') if _arg(request, 'programCode') else []
+    genders = _arg(request, 'gender').lower().split(',') if _arg(request, 'gender') else []
+    year_levels = _arg(request, 'yearLevel').split(',') if _arg(request, 'yearLevel') else []
+
+    return search, search_by, sort_by, sort_order, program_codes, genders, year_levels
+
+
+def _stream_limit(request, config):
+    max_rows = config["MAX_STREAM_ROWS"]
+    try:
+        limit = int(_arg(request, "limit", 0))
+    except ValueError:
+        limit = 0
+    return min(limit, max_rows) if limit and limit > 0 else max_rows
+
+
+async def _json_array_stream(key, chunks, serialize, max_rows):
+    """Async app.utils.streaming.json_array_stream()."""
+    yield f'{{"{key}": ['
+    sent = 0
+    truncated = False
+    try:
+        async for rows in chunks:
+            if sent + len(rows) > max_rows:
+                rows = rows[:max_rows - sent]
+                truncated = True
+            if rows:
+                prefix = "," if sent else ""
+                yield prefix + ",".join(json.dumps(serialize(row)) for row in rows)
+                sent += len(rows)
+            if truncated:
+                break
+    finally:
+        await chunks.aclose()
+    yield f'], "truncated": {"true" if truncated else "false"}}}'
+
+
+async def _in_transaction(conn, sql, params, chunk_size):
+    # asyncpg cursors only live inside a transaction; reads commit nothing
+    async with conn.transaction(readonly=True):
+        async for rows in db.iter_chunks(conn, sql, params, chunk_size):
+            yield rows
+
+
+async def search_matches(conn, search, search_by):
+    """Student._lookup_matches() over asyncpg."""
+    sql, params = Student.search_values_sql(search, search_by)
+    if sql is None:
+        return {}
+    rows = await db.fetch(conn, sql, params)
+    return Student.search_matches(search, search_by, [tuple(row) for row in rows])
+
+
+async def query_students(conn, config, search, search_by, sort_by, sort_order, page, page_size,
+                         program_codes, genders, year_levels, count="exact"):
+    """Student.query() over asyncpg."""
+    from_sql, order_sql, params, order_params = Student.query_sql(
+        search, search_by, sort_by, sort_order, program_codes, genders, year_levels,
+        await search_matches(conn, search, search_by)
+    )
+    rows, total, exact = await db.paginate(
+        conn, Student.select_sql, from_sql, order_sql, params, page, page_size, count, order_params,
+        config["COUNT_ESTIMATE_THRESHOLD"]
+    )
+    return [Student(*row) for row in rows], total, exact
+
+
+async def seek_students(conn, search, search_by, sort_by, sort_order, cursor_token, page_size,
+                        program_codes, genders, year_levels):
+    """Student.seek() over asyncpg."""
+    cursor_data = decode_cursor(cursor_token, Student.cursor_types.get(sort_by, str))
+    sql, params, backwards, sort_index = Student.seek_sql(
+        search, search_by, sort_by, sort_order, cursor_data, page_size, program_codes, genders, year_levels,
+        await search_matches(conn, search, search_by)
+    )
+    rows = await db.fetch(conn, sql, params)
+    rows, next_cursor, prev_cursor = page_cursors([tuple(row) for row in rows], page_size, cursor_data, backwards, sort_index)
+    return [Student(*row) for row in rows], next_cursor, prev_cursor
+
+
+async def cached_all(model, conn, config):
+    """model.all() over asyncpg, through the same reference_cache entry as the Flask side."""
+    async def load():
+        return [tuple(row) for row in await conn.fetch(model.all_sql)]
+    rows = await reference_cache.get_or_set_async(model.cache_key, load, config["REFERENCE_CACHE_TTL"])
+    return [model(*row) for row in rows]
+
+
+def register(app):
+    config = app.config
+
+    #page display with search, sort, pagination and filters
+    @app.route("/api/students", tables=("student",))
+    async def list_students_filtered(request, conn):
+        if request.state.log_sampled:
+            log.info("student.list", user_id=request.state.identity, request_id=request.state.request_id)
+        search, search_by, sort_by, sort_order, program_codes, genders, year_levels = _filter_args(request)
+        cursor = _arg(request, 'cursor')
+        try:
+            page = int(_arg(request, 'page', 1))
+            per_page = int(_arg(request, 'per_page', 10))
+            count_mode = _arg(request, 'count', 'exact')
+
+            # Opt-in keyset pagination: pass ?cursor= (empty for the first page)
+            if cursor is not None:
+                students, next_cursor, prev_cursor = await seek_students(
+                    conn, search, search_by, sort_by, sort_order, cursor, per_page,
+                    program_codes, genders, year_levels
+                )
+                return JSONResponse({
+                    'students': [s.serialize() for s in students],
+                    'next_cursor': next_cursor,
+                    'prev_cursor': prev_cursor
+                })
+
+            students, total, total_exact = await query_students(
+                conn, config, search, search_by, sort_by, sort_order, page, per_page,
+                program_codes, genders, year_levels, count_mode
+            )
+            pages = (total + per_page - 1) // per_page
+            return JSONResponse({
+                'students': [s.serialize() for s in students],
+                'total': total,
+                'total_exact': total_exact,
+                'pages': pages,
+                'current_page': page
+            })
+        except InvalidCursor as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception:
+            log.exception("student.list_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Internal server error"}, 500)
+
+    @app.route("/api/students/by-program", tables=("student",))
+    async def get_students_by_program(request, conn):
+        program_code = _arg(request, "programCode")
+        max_rows = _stream_limit(request, config)
+        if not program_code or program_code.lower() == "all":
+            sql, params = Student.iter_all_sql(max_rows)
+        else:
+            sql, params = Student.iter_by_prog_sql(program_code, max_rows)
+
+        chunks = _in_transaction(conn, sql, params, config['STREAM_CHUNK_SIZE'])
+        try:
+            # Pull the first chunk here so a failing query still gets a JSON error
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except Exception:
+            await chunks.aclose()
+            log.exception("student.by_program_failed", program_code=program_code, request_id=request.state.request_id)
+            return JSONResponse({"error": "Failed to fetch students"}, 500)
+
+        async def rest():
+            try:
+                if first is not None:
+                    yield first
+                    async for rows in chunks:
+                        yield rows
+            finally:
+                # Ends the cursor's transaction even when the client goes away
+                await chunks.aclose()
+
+        body = _json_array_stream('students', rest(), lambda row: Student(*row).serialize(), max_rows)
+        return StreamingResponse(body, media_type='application/json')
+
+    @app.route("/api/students/count-by-program", tables=("student",))
+    async def count_by_program(request, conn):
+        try:
+            rows = await conn.fetch(Student.count_by_prog_sql)
+            return JSONResponse([{"programCode": row[0], "count": row[1]} for row in rows])
+        except Exception:
+            log.exception("student.count_by_program_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Failed to fetch student counts"}, 500)
+
+    @app.route("/api/students/count-by-gender", tables=("student",))
+    async def count_by_gender(request, conn):
+        try:
+            rows = await conn.fetch(Student.gender_count_sql)
+            return JSONResponse([{"gender": row[0], "count": row[1]} for row in rows])
+        except Exception:
+            log.exception("student.count_by_gender_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Failed to fetch gender counts"}, 500)
+
+    #total students
+    @app.route("/api/students/total", tables=("student",))
+    async def get_total_students(request, conn):
+        try:
+            total = await conn.fetchval(Student.total_sql)
+            return JSONResponse({"total": total})
+        except Exception:
+            log.exception("student.total_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Internal server error"}, 500)
+
+    #dropdowns
+    @app.route("/api/programs/dropdown", tables=("program",))
+    async def list_program_for_dropdown(request, conn):
+        programs = await cached_all(Program, conn, config)
+        return JSONResponse({'programs': [p.serialize() for p in programs]})
+
+    @app.route("/api/colleges/dropdown", tables=("college",))
+    async def list_colleges_for_dropdown(request, conn):
+        colleges = await cached_all(College, conn, config)
+        return JSONResponse({'colleges': [c.serialize() for c in colleges]})
+
+    #totals
+    @app.route("/api/programs/total", tables=("program",))
+    async def get_total_programs(request, conn):
+        try:
+            return JSONResponse({"total": await conn.fetchval(Program.total_sql)})
+        except Exception:
+            log.exception("program.total_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Internal server error"}, 500)
+
+    @app.route("/api/colleges/total", tables=("college",))
+    async def get_total_colleges(request, conn):
+        try:
+            return JSONResponse({"total": await conn.fetchval(College.total_sql)})
+        except Exception:
+            log.exception("college.total_failed", request_id=request.state.request_id)
+            return JSONResponse({"error": "Internal server error"}, 500)
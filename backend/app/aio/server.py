@@ -0,0 +1,212 @@
+"""The ASGI app: Starlette routes for the hot reads, Flask for everything else.
+
+GET routes registered with ``AsyncAPI.route`` run on asyncio + asyncpg. Every
+other request (writes, auth, the frontend) falls through to the Flask app,
+run on a thread pool by a2wsgi, so the whole API stays on one port. The async
+routes answer with the same JWT checks, ETags and compression as the Flask
+views.
+"""
+import asyncio
+import contextlib
+import random
+import uuid
+
+import anyio
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header, parse_etags
+
+from app.aio import db
+from app.utils.auth import verify_access_token
+from app.utils.compression import StreamCompressor, available_encodings, compress, is_compressible
+from app.utils.etag import etag_for
+from app.utils.health import get_health
+from app.utils.log import REQUEST_ID_HEADER, REQUEST_ID_PATTERN, get_logger
+
+log = get_logger(__name__)
+
+# Let clients keep the body but always come back to revalidate (as app.utils.etag)
+_REVALIDATE = {"Cache-Control": "private, no-cache"}
+
+
+class PooledStreamingResponse(StreamingResponse):
+    """Streaming body that holds a pooled connection until it ends.
+
+    The connection goes back to the pool once the body is sent, or as soon as
+    the client goes away; the body's generator is closed first, so any open
+    cursor and its transaction end with it.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                try:
+                    await self.body_iterator.aclose()
+                finally:
+                    await self.release()
+
+
+class AsyncAPI:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.routes = []
+        self.pool = None
+        self._pool_lock = asyncio.Lock()
+
+    def route(self, path, tables=(), auth=True):
+        """Register an async GET handler; ``tables`` makes the response conditional on their versions."""
+        def decorator(handler):
+            async def endpoint(request):
+                return await self._dispatch(request, handler, tuple(tables), auth)
+            self.routes.append(Route(path, endpoint, methods=["GET"], middleware=self._middleware()))
+            return handler
+        return decorator
+
+    def build(self):
+        # Routes only match GET/HEAD; other methods on the same paths (and
+        # CORS preflights) reach Flask through the catch-all mount
+        wsgi = WSGIMiddleware(self.flask_app, workers=self.config["ASYNC_WSGI_THREADS"])
+        return Starlette(routes=[*self.routes, Mount("/", app=wsgi)], lifespan=self._lifespan)
+
+    def _middleware(self):
+        return [Middleware(
+            CORSMiddleware,
+            allow_origins=self.config["CORS_ORIGINS"],
+            allow_credentials=True,
+            expose_headers=["ETag", REQUEST_ID_HEADER],
+        )]
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app):
+        await self._ensure_pool()
+        # The Flask side (pool, reference data) warms up before traffic too
+        await asyncio.to_thread(get_health(self.flask_app).warm_up)
+        try:
+            yield
+        finally:
+            if self.pool is not None:
+                await self.pool.close()
+
+    async def _ensure_pool(self):
+        # Servers without lifespan support get the pool on the first request
+        if self.pool is None:
+            async with self._pool_lock:
+                if self.pool is None:
+                    self.pool = await db.create_pool(self.config)
+        return self.pool
+
+    async def _dispatch(self, request, handler, tables, auth):
+        supplied = request.headers.get(REQUEST_ID_HEADER, "")
+        request.state.request_id = supplied if REQUEST_ID_PATTERN.match(supplied) else uuid.uuid4().hex
+        # Same per-request read sampling as app.utils.log for the Flask views
+        request.state.log_sampled = random.random() < self.config["LOG_READ_SAMPLE_RATE"]
+        request.state.identity = None
+        try:
+            response = await self._respond(request, handler, tables, auth)
+        except Exception:
+            log.exception("aio.request_failed", path=request.url.path, request_id=request.state.request_id)
+            response = JSONResponse({"error": "Internal server error"}, 500)
+        response.headers[REQUEST_ID_HEADER] = request.state.request_id
+        # CORSMiddleware adds Origin
+        response.headers["Vary"] = "Accept-Encoding"
+        return await self._compress(request, response)
+
+    async def _respond(self, request, handler, tables, auth):
+        if auth:
+            headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in request.headers.raw]
+            request.state.identity, error = verify_access_token(self.flask_app, headers)
+            if error is not None:
+                return Response(error.get_data(), error.status_code, media_type=error.mimetype)
+
+        pool = await self._ensure_pool()
+        try:
+            conn = await pool.acquire(timeout=self.config["DB_POOL_TIMEOUT"])
+        except asyncio.TimeoutError:
+            return JSONResponse({"error": "Server is busy, please try again."}, 503)
+
+        streaming = False
+        try:
+            etag = None
+            if tables:
+                etag = etag_for(tables, await db.table_versions(conn, tables))
+                matched = self._matching_etag(request, etag)
+                if matched:
+                    return Response(status_code=304, headers={"ETag": f'"{matched}"', **_REVALIDATE})
+
+            response = await handler(request, conn)
+            if isinstance(response, StreamingResponse):
+                # The stream still needs the connection; it is released when the body ends
+                response = PooledStreamingResponse(
+                    response.body_iterator, lambda: pool.release(conn),
+                    status_code=response.status_code, media_type=response.media_type,
+                )
+                streaming = True
+            if etag and response.status_code == 200:
+                response.headers.update({"ETag": f'"{etag}"', **_REVALIDATE})
+            return response
+        finally:
+            if not streaming:
+                await pool.release(conn)
+
+    def _matching_etag(self, request, etag):
+        header = request.headers.get("if-none-match")
+        if not header:
+            return None
+        etags = parse_etags(header)
+        candidates = [etag] + [f"{etag}-{encoding}" for encoding in available_encodings()]
+        return next((tag for tag in candidates if etags.contains(tag)), None)
+
+    def _negotiate(self, request):
+        accepted = parse_accept_header(request.headers.get("accept-encoding"))
+        best, best_quality = None, 0
+        for encoding in available_encodings():
+            quality = accepted[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    async def _compress(self, request, response):
+        """app.utils.compression.compress_response() for a Starlette response."""
+        if response.status_code != 200 or not is_compressible(response.media_type):
+            return response
+        encoding = self._negotiate(request)
+        if encoding is None:
+            return response
+        level = self.config["COMPRESS_BROTLI_QUALITY"] if encoding == "br" else self.config["COMPRESS_GZIP_LEVEL"]
+
+        if isinstance(response, StreamingResponse):
+            response.body_iterator = _compressed(response.body_iterator, StreamCompressor(encoding, level))
+        else:
+            if len(response.body) < self.config["COMPRESS_MIN_SIZE"]:
+                return response
+            response.body = await asyncio.to_thread(compress, response.body, encoding, level)
+            response.headers["Content-Length"] = str(len(response.body))
+
+        response.headers["Content-Encoding"] = encoding
+        # A compressed body is a different representation, so it needs its own tag
+        etag = response.headers.get("ETag", "").strip('"')
+        if etag:
+            response.headers["ETag"] = f'"{etag}-{encoding}"'
+        return response
+
+
+async def _compressed(chunks, compressor):
+    try:
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        await chunks.aclose()
@@ -0,0 +1,64 @@
+from flask import Blueprint, current_app, jsonify, request
+from app.database import pool_stats, prepared_statements
+from app.utils.auth import has_bearer_token
+from app.utils.cache import reference_cache, user_cache
+from app.utils.hashing import get_hash_pool
+from app.utils.log import get_pipeline
+from app.utils.slow_queries import get_slow_log
+from app.controllers.dashboard_controller import summary_cache
+
+admin_bp = Blueprint("admin_bp", __name__, url_prefix="/api/admin")
+
+#operator-only: these expose SQL, plans and internals, so a user's JWT is not enough
+@admin_bp.before_request
+def require_admin_token():
+    token = current_app.config["ADMIN_TOKEN"]
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    if not has_bearer_token(token):
+        return jsonify({"error": "Unauthorized"}), 401
+
+#connection pool usage, for sizing DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE, and the registered prepared statements
+@admin_bp.route("/pool", methods=["GET"])
+def get_pool_stats():
+    stats = pool_stats()
+    stats["prepared_statements"] = {name: statement.sql for name, statement in sorted(prepared_statements.items())}
+    return jsonify(stats), 200
+
+#hit/miss/eviction counters of the in-process caches
+@admin_bp.route("/cache", methods=["GET"])
+def get_cache_stats():
+    return jsonify({
+        "reference": reference_cache.stats(),
+        "user": user_cache.stats(),
+        "dashboard": summary_cache.stats(),
+    }), 200
+
+#password hashing queue depth and timings, for sizing PASSWORD_HASH_WORKERS
+@admin_bp.route("/hashing", methods=["GET"])
+def get_hashing_stats():
+    return jsonify(get_hash_pool().stats()), 200
+
+#log queue depth and records dropped because the writer fell behind
+@admin_bp.route("/logging", methods=["GET"])
+def get_logging_stats():
+    return jsonify(get_pipeline().stats()), 200
+
+#slowest statement shapes since startup, with their captured EXPLAIN plans
+SLOW_QUERY_ORDERS = ("max_ms", "total_ms", "mean_ms", "calls")
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+def get_slow_queries():
+    slow_log = get_slow_log()
+    if slow_log is None:
+        return jsonify({"error": "The slow-query log is off; set SLOW_QUERY_MS to enable it."}), 404
+
+    limit = request.args.get("limit", 20, type=int)
+    order = request.args.get("order", "max_ms")
+    if order not in SLOW_QUERY_ORDERS:
+        return jsonify({"error": f"order must be one of {', '.join(SLOW_QUERY_ORDERS)}"}), 400
+
+    return jsonify({
+        "threshold_ms": slow_log.threshold * 1000,
+        "queries": slow_log.top(max(1, min(limit, 100)), order),
+    }), 200
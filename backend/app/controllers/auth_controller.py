@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import (
     create_access_token, set_access_cookies,
-    jwt_required, get_jwt_identity, unset_jwt_cookies, decode_token
+    jwt_required, get_jwt, get_jwt_identity, unset_jwt_cookies, decode_token
 )
 from app.extensions import db
 from app.forms.login_form import LoginForm
@@ -9,6 +9,10 @@ from app.forms.signup_form import SignUpForm
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import text
 from app.models.user import User
+from app.utils.hashing import HashingBusy
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
 
 auth_bp = Blueprint('auth_bp', __name__, url_prefix="/api/auth")
 
@@ -36,13 +40,27 @@ def login():
         if not user.check_password(form.password):
             return jsonify({"error": "Incorrect password."}), 401
 
-        access_token = create_access_token(identity=str(user.userid))
+        # Upgrade hashes made with an older method or cost while we have the password
+        if user.needs_rehash():
+            try:
+                user.update_password(form.password)
+            except Exception:
+                log.exception("auth.rehash_failed", user_id=user.userid)
+
+        # Display claims let /ping answer without a user lookup
+        access_token = create_access_token(
+            identity=str(user.userid),
+            additional_claims={"name": user.username, "email": user.email}
+        )
         response = jsonify({"message": "Login successful"})
         set_access_cookies(response, access_token)
         return response, 200
 
-    except Exception as e:
-        print("Login error:", e)
+    except HashingBusy as e:
+        log.warning("auth.login_rejected", reason=str(e))
+        return jsonify({"error": "Server is busy, please try again."}), 503, {"Retry-After": "1"}
+    except Exception:
+        log.exception("auth.login_failed")
         return jsonify({"error": "Server error during login"}), 500
 
 
@@ -57,7 +75,10 @@ def signup():
         return jsonify({"error": "Email or username already exists."}), 409
 
     new_user = User(username=form.username, email=form.email)
-    new_user.add(form.password)
+    try:
+        new_user.add(form.password)
+    except HashingBusy:
+        return jsonify({"error": "Server is busy, please try again."}), 503, {"Retry-After": "1"}
 
     return jsonify({"message": "User registered successfully."}), 201
 
@@ -67,20 +88,26 @@ def signup():
 def ping():
     try:
         user_id = get_jwt_identity()
-        user = User.get_by_id(user_id)
+        claims = get_jwt()
 
-        if not user:
-            return jsonify({"error": "User not found"}), 404
+        if "name" in claims and "email" in claims:
+            name, email = claims["name"], claims["email"]
+        else:
+            # Tokens issued before the display claims were added
+            user = User.get_by_id(user_id)
+            if not user:
+                return jsonify({"error": "User not found"}), 404
+            name, email = user.username, user.email
 
         return jsonify({
             "user_id": user_id,
             "user": {
-                "name": user.username,
-                "email": user.email
+                "name": name,
+                "email": email
             }
         }), 200
     except Exception as e:
-        print("Ping error:", repr(e))
+        log.warning("auth.ping_failed", error=repr(e))
         return jsonify({"error": "Invalid token"}), 422
 
 
@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app.models.college import College
 from app.forms.college_form import CollegeForm
+from app.forms.batch_form import BatchForm
 from app.database import get_db
+from app.utils.etag import conditional
+from app.utils.log import get_logger
+from app.utils.pagination import InvalidCursor
+from app.utils.streaming import json_array_stream, primed, stream_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+log = get_logger(__name__)
+
 college_bp = Blueprint("college_bp", __name__, url_prefix="/api/colleges")
 
 #add
@@ -21,19 +28,20 @@ def create_college():
     college = College(form.collegeCode, form.collegeName)
     college.add()
 
-    print(f"[CREATE] User {current_user_id} created college {form.collegeCode}")
+    log.info("college.create", user_id=current_user_id, college_code=form.collegeCode)
     return jsonify({'message': 'College created', 'college': college.serialize()}), 201
 
 #edit (for pre-filled data)
 @college_bp.route('/<collegeCode>', methods=['GET'])
 @jwt_required()
+@conditional('college')
 def get_college(collegeCode):
     current_user_id = get_jwt_identity()
     college = College.get(collegeCode)
     if not college:
         return jsonify({"error": "College not found"}), 404
 
-    print(f"[READ] User {current_user_id} accessed college {collegeCode}")
+    log.read("college.read", user_id=current_user_id, college_code=collegeCode)
     return jsonify(college.serialize())
 
 #update
@@ -55,7 +63,7 @@ def update_college(collegeCode):
     updated_college = College(form.collegeCode, form.collegeName)
     updated_college.update(collegeCode)
 
-    print(f"[UPDATE] User {current_user_id} updated college {collegeCode}")
+    log.info("college.update", user_id=current_user_id, college_code=collegeCode)
     return jsonify({'message': 'College updated', 'college': updated_college.serialize()})
 
 #delete
@@ -69,32 +77,66 @@ def delete_college(collegeCode):
 
     try:
         college.delete_with_program_update()
-        print(f"[DELETE] User {current_user_id} deleted college {collegeCode}")
+        log.info("college.delete", user_id=current_user_id, college_code=collegeCode)
         return jsonify({'message': f'College {collegeCode} deleted and programs updated.'}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
+# Batch update/delete
+BATCH_ERRORS = {
+    "not_found": "College not found",
+}
+
+@college_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_colleges():
+    current_user_id = get_jwt_identity()
+    form = BatchForm(
+        request.get_json(silent=True),
+        ("collegeName",),
+        max_operations=current_app.config["BATCH_MAX_OPERATIONS"]
+    )
+    if not form.is_valid():
+        return jsonify({"error": form.errors[0]}), 400
+
+    # An atomic batch with a malformed operation never reaches the database
+    if form.atomic and form.invalid:
+        return jsonify(form.finish({}, False, BATCH_ERRORS)), 409
+
+    try:
+        statuses, applied = College.apply_batch(form.updates, form.deletes, form.atomic)
+    except Exception:
+        log.exception("college.batch_failed")
+        return jsonify({"error": "Internal server error"}), 500
+
+    log.info("college.batch", user_id=current_user_id, updates=len(form.updates), deletes=len(form.deletes), applied=applied)
+    return jsonify(form.finish(statuses, applied, BATCH_ERRORS)), 200 if applied else 409
+
 #list
 @college_bp.route('/list', methods=['GET']) 
 @jwt_required() 
+@conditional('college')
 def list_colleges(): 
     try: 
         current_user_id = get_jwt_identity() 
-        print("Authenticated user:", current_user_id) 
-        colleges = [c.serialize() for c in College.all()]
-        return jsonify({'colleges': colleges}), 200
-
-    except Exception as e: 
-        print("🔥 Error in list_colleges:", str(e)) 
+        log.read("college.list", user_id=current_user_id)
+        max_rows = stream_limit()
+        chunks = primed(College.iter_all(max_rows, current_app.config['STREAM_CHUNK_SIZE']))
+        body = json_array_stream('colleges', chunks, lambda row: College(*row).serialize(), max_rows)
+        return Response(stream_with_context(body), mimetype='application/json'), 200
+
+    except Exception:
+        log.exception("college.list_failed")
         return jsonify({"error": "Internal server error"}), 500
 
 #page display with search, sort, pagination
 @college_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('college')
 def list_colleges_filtered():
     try:
         current_user_id = get_jwt_identity()
-        print("Authenticated user:", current_user_id)
+        log.read("college.list", user_id=current_user_id)
 
         # Parse query params
         search = request.args.get('search', '').lower()
@@ -103,15 +145,34 @@ def list_colleges_filtered():
         sort_order = request.args.get('order', 'asc')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 15))
+        count_mode = request.args.get('count', 'exact')
 
         # Delegate to model
-        colleges, total = College.query(
+        # Opt-in keyset pagination: pass ?cursor= (empty for the first page)
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            colleges, next_cursor, prev_cursor = College.seek(
+                search=search,
+                search_by=search_by,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor_token=cursor,
+                page_size=per_page
+            )
+            return jsonify({
+                'colleges': [c.serialize() for c in colleges],
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+
+        colleges, total, total_exact = College.query(
             search=search,
             search_by=search_by,
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=per_page
+            page_size=per_page,
+            count=count_mode
         )
 
         pages = (total + per_page - 1) // per_page
@@ -119,12 +180,15 @@ def list_colleges_filtered():
         return jsonify({
             'colleges': [c.serialize() for c in colleges],
             'total': total,
+            'total_exact': total_exact,
             'pages': pages,
             'current_page': page
         }), 200
 
-    except Exception as e:
-        print("🔥 Error in list_colleges:", str(e))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception:
+        log.exception("college.list_failed")
         return jsonify({"error": "Internal server error"}), 500
 
 
@@ -132,6 +196,7 @@ def list_colleges_filtered():
 # Dropdown
 @college_bp.route('/dropdown', methods=['GET'])
 @jwt_required()
+@conditional('college')
 def list_colleges_for_dropdown():
     colleges = College.all()
     return jsonify({
@@ -141,11 +206,12 @@ def list_colleges_for_dropdown():
 #total colleges
 @college_bp.route("/total", methods=["GET"])
 @jwt_required()
+@conditional('college')
 def get_total_colleges():
     try:
         total = College.total()
         return jsonify({"total": total}), 200
-    except Exception as e:
-        print("🔥 Error in get_total_colleges:", str(e))
+    except Exception:
+        log.exception("college.total_failed")
         return jsonify({"error": "Internal server error"}), 500
 
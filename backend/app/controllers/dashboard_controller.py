@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.models.dashboard import Dashboard
+from app.utils.cache import TTLCache
+from app.utils.log import get_logger
+from app.utils.metrics import register_cache
+
+log = get_logger(__name__)
+
+dashboard_bp = Blueprint("dashboard_bp", __name__, url_prefix="/api/dashboard")
+
+summary_cache = TTLCache()
+register_cache("dashboard", summary_cache)
+
+#totals plus program/gender/college/year-level breakdowns in one request
+@dashboard_bp.route("/summary", methods=["GET"])
+@jwt_required()
+def get_summary():
+    try:
+        summary = summary_cache.get_or_set("summary", Dashboard.summary, current_app.config["DASHBOARD_CACHE_TTL"])
+        return jsonify(summary), 200
+    except Exception:
+        log.exception("dashboard.summary_failed")
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,15 @@
+from flask import Blueprint, jsonify
+from app.utils.health import get_health
+
+health_bp = Blueprint("health_bp", __name__)
+
+#liveness: the process is up and answering; never touches the database
+@health_bp.route("/healthz", methods=["GET"])
+def healthz():
+    return jsonify(get_health().liveness()), 200
+
+#readiness: warmed up and the database answers; 503 until then and while draining
+@health_bp.route("/readyz", methods=["GET"])
+def readyz():
+    ready, body = get_health().readiness()
+    return jsonify(body), 200 if ready else 503
@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app.models.program import Program
 from app.forms.program_form import ProgramForm
+from app.forms.batch_form import BatchForm
 from app.database import get_db
+from app.utils.etag import conditional
+from app.utils.log import get_logger
+from app.utils.pagination import InvalidCursor
+from app.utils.streaming import json_array_stream, primed, stream_limit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+log = get_logger(__name__)
+
 program_bp = Blueprint("program_bp", __name__, url_prefix="/api/programs")
 
 #add
@@ -21,19 +28,20 @@ def create_program():
     program = Program(form.programCode, form.programName, form.collegeCode)
     program.add()
 
-    print(f"[CREATE] User {current_user_id} created program {form.programCode}")
+    log.info("program.create", user_id=current_user_id, program_code=form.programCode)
     return jsonify({'message': 'Program created', 'program': program.serialize()}), 201
 
 #edit (for pre-filled data)
 @program_bp.route('/<programCode>', methods=['GET'])
 @jwt_required()
+@conditional('program')
 def get_program(programCode):
     current_user_id = get_jwt_identity()
     program = Program.get(programCode)
     if not program:
         return jsonify({"error": "Program not found"}), 404
     
-    print(f"[READ] User {current_user_id} accessed program {programCode}")
+    log.read("program.read", user_id=current_user_id, program_code=programCode)
     return jsonify(program.serialize())
 
 #update
@@ -55,7 +63,7 @@ def update_program(programCode):
     updated_program = Program(form.programCode, form.programName, form.collegeCode)
     updated_program.update(programCode)
 
-    print(f"[UPDATE] User {current_user_id} updated program {programCode}")
+    log.info("program.update", user_id=current_user_id, program_code=programCode)
     return jsonify({'message': 'Program updated', 'program': updated_program.serialize()})
 
 #delete
@@ -69,33 +77,68 @@ def delete_program(programCode):
     
     try:
         program.delete_with_student_update()
-        print(f"[DELETE] User {current_user_id} deleted program {programCode}")
+        log.info("program.delete", user_id=current_user_id, program_code=programCode)
         return jsonify({'message': f'Program {programCode} deleted and students updated.'}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# Batch update/delete
+BATCH_ERRORS = {
+    "not_found": "Program not found",
+    "unknown_college": "College code does not exist",
+}
+
+@program_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_programs():
+    current_user_id = get_jwt_identity()
+    form = BatchForm(
+        request.get_json(silent=True),
+        ("programName", "collegeCode"),
+        max_operations=current_app.config["BATCH_MAX_OPERATIONS"]
+    )
+    if not form.is_valid():
+        return jsonify({"error": form.errors[0]}), 400
+
+    # An atomic batch with a malformed operation never reaches the database
+    if form.atomic and form.invalid:
+        return jsonify(form.finish({}, False, BATCH_ERRORS)), 409
+
+    try:
+        statuses, applied = Program.apply_batch(form.updates, form.deletes, form.atomic)
+    except Exception:
+        log.exception("program.batch_failed")
+        return jsonify({"error": "Internal server error"}), 500
+
+    log.info("program.batch", user_id=current_user_id, updates=len(form.updates), deletes=len(form.deletes), applied=applied)
+    return jsonify(form.finish(statuses, applied, BATCH_ERRORS)), 200 if applied else 409
+
 #list
 @program_bp.route('/list', methods=['GET'])
 @jwt_required()
+@conditional('program')
 def list_programs():
     try:
         current_user_id = get_jwt_identity()
-        print("Authenticated user:", current_user_id)
-
-        programs = [p.serialize() for p in Program.all()]
-        return jsonify({'programs': programs}), 200
-    except Exception as e:
-        print("🔥 Error in list_programs:", str(e))
+        log.read("program.list", user_id=current_user_id)
+
+        max_rows = stream_limit()
+        chunks = primed(Program.iter_all(max_rows, current_app.config['STREAM_CHUNK_SIZE']))
+        body = json_array_stream('programs', chunks, lambda row: Program(*row).serialize(), max_rows)
+        return Response(stream_with_context(body), mimetype='application/json'), 200
+    except Exception:
+        log.exception("program.list_failed")
         return jsonify({"error": "Internal server error"}), 500
     
 #page display with search, sort, pagination
 @program_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('program')
 def list_programs_filtered():
     try:
         current_user_id = get_jwt_identity()
-        print("Authenticated user:", current_user_id)
+        log.read("program.list", user_id=current_user_id)
 
         search = request.args.get('search', '').lower()
         search_by = request.args.get('searchBy', 'all')
@@ -103,14 +146,33 @@ def list_programs_filtered():
         sort_order = request.args.get('order', 'asc')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 15))
-
-        programs, total = Program.query(
+        count_mode = request.args.get('count', 'exact')
+
+        # Opt-in keyset pagination: pass ?cursor= (empty for the first page)
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            programs, next_cursor, prev_cursor = Program.seek(
+                search=search,
+                search_by=search_by,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor_token=cursor,
+                page_size=per_page
+            )
+            return jsonify({
+                'programs': [p.serialize() for p in programs],
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+
+        programs, total, total_exact = Program.query(
             search=search,
             search_by=search_by,
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
-            page_size=per_page
+            page_size=per_page,
+            count=count_mode
         )
 
         pages = (total + per_page - 1) // per_page
@@ -118,18 +180,22 @@ def list_programs_filtered():
         return jsonify({
             'programs': [p.serialize() for p in programs],
             'total': total,
+            'total_exact': total_exact,
             'pages': pages,
             'current_page': page
         }), 200
     
-    except Exception as e:
-        print("🔥 Error in list_programs:", str(e))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception:
+        log.exception("program.list_failed")
         return jsonify({"error": "Internal server error"}), 500
 
 
 #dropdown
 @program_bp.route('/dropdown', methods=['GET'])
 @jwt_required()
+@conditional('program')
 def list_program_for_dropdown():
     programs = Program.all()
     return jsonify({
@@ -139,10 +205,11 @@ def list_program_for_dropdown():
 #total programs
 @program_bp.route("/total", methods=["GET"])
 @jwt_required()
+@conditional('program')
 def get_total_programs():
     try:
         total = Program.total()
         return jsonify({"total": total}), 200
-    except Exception as e:
-        print("🔥 Error in get_total_programs:", str(e))
+    except Exception:
+        log.exception("program.total_failed")
         return jsonify({"error": "Internal server error"}), 500
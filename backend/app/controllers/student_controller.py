@@ -1,8 +1,20 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+import json
+import time
+
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from app.models.student import Student
 from app.forms.student_form import StudentForm
+from app.forms.batch_form import BatchForm
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.database import get_db
+from app.utils.etag import conditional
+from app.utils.log import get_logger
+from app.utils.pagination import InvalidCursor
+from app.utils.streaming import iter_lines, json_array_stream, primed, stream_limit
+
+log = get_logger(__name__)
 
 student_bp = Blueprint("student_bp", __name__, url_prefix="/api/students")
 
@@ -33,19 +45,146 @@ def create_student():
     )
     student.add()
 
-    print(f"[CREATE] User {current_user_id} created student {student.studentID}")
+    log.info("student.create", user_id=current_user_id, student_id=student.studentID)
     return jsonify({'message': 'Student created', 'student': student.serialize()}), 201
 
 
+# Bulk import
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+def _import_records(fmt, stream):
+    """Yield (line, dict) for each record in the body; dict is None when the line is unparseable."""
+    lines = iter_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines, restval="")
+        for row in reader:
+            year = (row.get("yearLevel") or "").strip()
+            row["yearLevel"] = int(year) if year.isdigit() else (year or None)
+            yield reader.line_num, row
+    else:
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+
+def _validated_batches(records, batch_size, result, max_errors):
+    """Validate records with StudentForm rules and group the valid ones into batches."""
+    batch = []
+    for line, data in records:
+        result["received"] += 1
+        try:
+            form = StudentForm(data) if data is not None else None
+            error = "Invalid record" if form is None else (None if form.is_valid() else form.errors[0])
+        except AttributeError:
+            form, error = None, "Invalid field types"
+
+        if error:
+            result["rejected"] += 1
+            if len(result["errors"]) < max_errors:
+                student_id = data.get("studentID") if isinstance(data, dict) else None
+                result["errors"].append({"line": line, "studentID": student_id, "error": error})
+            continue
+
+        photo_url = form.photoUrl if form.photoUrl not in [None, "", "null"] else "/student-icon.jpg"
+        batch.append((line, Student(form.studentID, form.firstName, form.lastName, form.programCode, form.yearLevel, form.gender, photo_url)))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@student_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_students():
+    current_user_id = get_jwt_identity()
+    fmt = IMPORT_FORMATS.get(request.mimetype)
+    if fmt is None:
+        return jsonify({"error": "Content-Type must be text/csv or application/x-ndjson"}), 415
+
+    max_errors = current_app.config["IMPORT_MAX_ERRORS"]
+    result = {"received": 0, "rejected": 0, "errors": []}
+    started = time.perf_counter()
+
+    batches = _validated_batches(
+        _import_records(fmt, request.stream),
+        current_app.config["IMPORT_BATCH_SIZE"],
+        result,
+        max_errors
+    )
+    inserted, db_rejected, db_errors = Student.bulk_import(batches, max_errors)
+
+    result["rejected"] += db_rejected
+    for line, student_id, error in db_errors:
+        if len(result["errors"]) >= max_errors:
+            break
+        result["errors"].append({"line": line, "studentID": student_id, "error": error})
+    result["errors"].sort(key=lambda e: e["line"])
+
+    elapsed = time.perf_counter() - started
+    result.update({
+        "inserted": inserted,
+        "errors_truncated": len(result["errors"]) < result["rejected"],
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(result["received"] / elapsed, 1) if elapsed else None,
+    })
+
+    log.info("student.import", user_id=current_user_id, format=fmt, received=result["received"],
+             inserted=inserted, rejected=result["rejected"], rows_per_second=result["rows_per_second"])
+    return jsonify(result), 200
+
+
+# Batch update/delete
+BATCH_ERRORS = {
+    "not_found": "Student not found",
+    "unknown_program": "Program code does not exist",
+}
+
+@student_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_students():
+    current_user_id = get_jwt_identity()
+    form = BatchForm(
+        request.get_json(silent=True),
+        Student.batch_columns,
+        int_fields=("yearLevel",),
+        nullable_fields=("photoUrl",),
+        max_operations=current_app.config["BATCH_MAX_OPERATIONS"]
+    )
+    if not form.is_valid():
+        return jsonify({"error": form.errors[0]}), 400
+
+    # An atomic batch with a malformed operation never reaches the database
+    if form.atomic and form.invalid:
+        return jsonify(form.finish({}, False, BATCH_ERRORS)), 409
+
+    try:
+        statuses, applied = Student.apply_batch(form.updates, form.deletes, form.atomic)
+    except Exception:
+        log.exception("student.batch_failed")
+        return jsonify({"error": "Internal server error"}), 500
+
+    log.info("student.batch", user_id=current_user_id, updates=len(form.updates), deletes=len(form.deletes), applied=applied)
+    return jsonify(form.finish(statuses, applied, BATCH_ERRORS)), 200 if applied else 409
+
 # Read
 @student_bp.route('/<studentID>', methods=['GET'])
 @jwt_required()
+@conditional('student')
 def get_student(studentID):
     student = Student.get(studentID)
     if not student:
         return jsonify({"error": "Student not found"}), 404
 
-    print(f"[READ] Student {studentID} data accessed")
+    log.read("student.read", student_id=studentID)
     return jsonify(student.serialize())
 
 # Update
@@ -69,7 +208,7 @@ def update_student(studentID):
     updated_student = Student(form.studentID, form.firstName, form.lastName, form.programCode, form.yearLevel, form.gender, photo_url)
     updated_student.update(studentID)
 
-    print(f"[UPDATE] User {current_user_id} updated student {studentID}")
+    log.info("student.update", user_id=current_user_id, student_id=studentID)
     return jsonify({'message': 'Student updated', 'student': updated_student.serialize()})
 
 # Delete
@@ -82,50 +221,86 @@ def delete_student(studentID):
         return jsonify({"error": "Student not found"}), 404
 
     student.delete()
-    print(f"[DELETE] User {current_user_id} deleted student {studentID}")
+    log.info("student.delete", user_id=current_user_id, student_id=studentID)
     return jsonify({'message': f'Student {studentID} deleted'})
 
+def _stream_students(chunks, max_rows):
+    # The query runs here, so the caller's try still catches its errors
+    body = json_array_stream('students', primed(chunks), lambda row: Student(*row).serialize(), max_rows)
+    return Response(stream_with_context(body), mimetype='application/json')
+
 #list
 @student_bp.route('/list', methods=['GET'])
 @jwt_required()
+@conditional('student')
 def list_students():
     try:
         current_user_id = get_jwt_identity()
-        print("Authenticated user:", current_user_id)
+        log.read("student.list", user_id=current_user_id)
 
-        students = [s.serialize() for s in Student.all()]
-        return jsonify({'students': students}), 200
+        max_rows = stream_limit()
+        chunks = Student.iter_all(max_rows, current_app.config['STREAM_CHUNK_SIZE'])
+        return _stream_students(chunks, max_rows), 200
 
-    except Exception as e:
-        print("🔥 Error in list_students:", str(e))
+    except Exception:
+        log.exception("student.list_failed")
         return jsonify({"error": "Internal server error"}), 500
     
+def _filter_args():
+    """Search, sort and filter parameters shared by the list and export endpoints."""
+    search = request.args.get('search', '').lower()
+    search_by = request.args.get('searchBy', 'all')
+    sort_by = request.args.get('sortBy', 'studentID')
+    sort_order = request.args.get('order', 'asc')
+
+    program_codes = request.args.get('programCode', '').lower().split(',') if request.args.get('programCode') else []
+    genders = request.args.get('gender', '').lower().split(',') if request.args.get('gender') else []
+    year_levels = request.args.get('yearLevel', '').split(',') if request.args.get('yearLevel') else []
+
+    return search, search_by, sort_by, sort_order, program_codes, genders, year_levels
+
 #page display with search, sort, pagination and filters
 @student_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional('student')
 def list_students_filtered():
     try:
         current_user_id = get_jwt_identity()
-        print("Authenticated user:", current_user_id)
+        log.read("student.list", user_id=current_user_id)
 
-        search = request.args.get('search', '').lower()
-        search_by = request.args.get('searchBy', 'all')
-        sort_by = request.args.get('sortBy', 'studentID')
-        sort_order = request.args.get('order', 'asc')
+        search, search_by, sort_by, sort_order, program_codes, genders, year_levels = _filter_args()
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
-
-        program_codes = request.args.get('programCode', '').lower().split(',') if request.args.get('programCode') else []
-        genders = request.args.get('gender', '').lower().split(',') if request.args.get('gender') else []
-        year_levels = request.args.get('yearLevel', '').split(',') if request.args.get('programCode') else []
-
-        students, total = Student.query(
+        count_mode = request.args.get('count', 'exact')
+
+        # Opt-in keyset pagination: pass ?cursor= (empty for the first page)
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            students, next_cursor, prev_cursor = Student.seek(
+                search=search,
+                search_by=search_by,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor_token=cursor,
+                page_size=per_page,
+                program_codes=program_codes,
+                genders=genders,
+                year_levels=year_levels
+            )
+            return jsonify({
+                'students': [s.serialize() for s in students],
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
+            }), 200
+
+        students, total, total_exact = Student.query(
             search=search,
             search_by=search_by,
             sort_by=sort_by,
             sort_order=sort_order,
             page=page,
             page_size=per_page,
+            count=count_mode,
             program_codes=program_codes,
             genders=genders,
             year_levels=year_levels
@@ -136,63 +311,119 @@ def list_students_filtered():
         return jsonify({
             'students': [s.serialize() for s in students],
             'total': total,
+            'total_exact': total_exact,
             'pages': pages,
             'current_page': page
         }), 200
-    except Exception as e:
-        print("🔥 Error in list_students:", str(e))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception:
+        log.exception("student.list_failed")
         return jsonify({"error": "Internal server error"}), 500
 
 
+#export with the same search, sort and filters as the page display
+EXPORT_FIELDS = ['studentID', 'firstName', 'lastName', 'programCode', 'yearLevel', 'gender', 'photoUrl']
+
+@student_bp.route('/export', methods=['GET'])
+@jwt_required()
+@conditional('student')
+def export_students():
+    current_user_id = get_jwt_identity()
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    search, search_by, sort_by, sort_order, program_codes, genders, year_levels = _filter_args()
+    chunks = primed(Student.export(
+        search=search,
+        search_by=search_by,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        program_codes=program_codes,
+        genders=genders,
+        year_levels=year_levels,
+        chunk_size=current_app.config['EXPORT_CHUNK_SIZE']
+    ))
+
+    def generate():
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            yield buffer.getvalue()
+        for rows in chunks:
+            if fmt == 'csv':
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(Student(*row).serialize() for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield ''.join(json.dumps(Student(*row).serialize()) + '\n' for row in rows)
+
+    log.info("student.export", user_id=current_user_id, format=fmt)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=students.{fmt}'}
+    )
+
 @student_bp.route("/by-program", methods=["GET"])
 @jwt_required()
+@conditional('student')
 def get_students_by_program():
     program_code = request.args.get("programCode")
 
     try:
+        max_rows = stream_limit()
+        chunk_size = current_app.config['STREAM_CHUNK_SIZE']
         if not program_code or program_code.lower() == "all":
-            students = [s.serialize() for s in Student.all()]
+            chunks = Student.iter_all(max_rows, chunk_size)
         else:
-            students = [s.serialize() for s in Student.students_by_prog(program_code)]
+            chunks = Student.iter_by_prog(program_code, max_rows, chunk_size)
 
-        return jsonify({"students": students}), 200
+        return _stream_students(chunks, max_rows), 200
 
-    except Exception as e:
-        print("Error fetching students by program:", e)
+    except Exception:
+        log.exception("student.by_program_failed", program_code=program_code)
         return jsonify({"error": "Failed to fetch students"}), 500
 
 @student_bp.route("/count-by-program", methods=["GET"])
 @jwt_required()
+@conditional('student')
 def count_by_program():
     try:
         rows = Student.student_count_by_prog()
         return jsonify([
             {"programCode": row[0], "count": row[1]} for row in rows
         ]), 200
-    except Exception as e:
-        print("Error fetching student counts:", e)
+    except Exception:
+        log.exception("student.count_by_program_failed")
         return jsonify({"error": "Failed to fetch student counts"}), 500
 
 @student_bp.route("/count-by-gender", methods=["GET"])
 @jwt_required()
+@conditional('student')
 def count_by_gender():
     try:
         rows = Student.gender_count()
         return jsonify([
             {"gender": row[0], "count": row[1]} for row in rows
         ]), 200
-    except Exception as e:
-        print("Error fetching gender counts:", e)
+    except Exception:
+        log.exception("student.count_by_gender_failed")
         return jsonify({"error": "Failed to fetch gender counts"}), 500
     
 #total students
 @student_bp.route("/total", methods=["GET"])
 @jwt_required()
+@conditional('student')
 def get_total_students():
     try:
         total = Student.total()
         return jsonify({"total": total}), 200
-    except Exception as e:
-        print("🔥 Error in get_total_students:", str(e))
+    except Exception:
+        log.exception("student.total_failed")
         return jsonify({"error": "Internal server error"}), 500
 
@@ -1,15 +1,442 @@
+import os
+import threading
+import time
+from collections import deque
+
 import psycopg2
-from flask import current_app, g
+import psycopg2.extensions
+from flask import current_app, g, has_app_context
+
+
+def numbered(sql):
+    """Rewrite %s placeholders as PostgreSQL's $1, $2, ... (and %% as %).
+
+    For SQL written for psycopg2 that runs elsewhere: PREPARE, or asyncpg (app.aio).
+    """
+    parts = []
+    index = 0
+    i = 0
+    while i < len(sql):
+        if sql.startswith("%s", i):
+            index += 1
+            parts.append(f"${index}")
+            i += 2
+        elif sql.startswith("%%", i):
+            parts.append("%")
+            i += 2
+        else:
+            parts.append(sql[i])
+            i += 1
+    return "".join(parts)
+
+
+class PreparedStatement:
+    """SQL that is PREPAREd once per pooled connection and then run with EXECUTE.
+
+    ``sql`` uses the usual %s placeholders (%% for a literal %); PostgreSQL infers
+    the parameter types from where each placeholder is used.
+    """
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.param_count = sql.replace("%%", "").count("%s")
+        self.prepare_sql = f"PREPARE {name} AS {numbered(sql)}"
+        placeholders = ", ".join(["%s"] * self.param_count)
+        self.execute_sql = f"EXECUTE {name} ({placeholders})" if self.param_count else f"EXECUTE {name}"
+
+
+# Every statement a model has registered, by name
+prepared_statements = {}
+
+
+def prepare(name, sql):
+    """Register a statement for execute_prepared(); call once, at import time."""
+    existing = prepared_statements.get(name)
+    if existing is not None and existing.sql != sql:
+        raise ValueError(f"Prepared statement {name!r} is already registered with different SQL")
+    statement = prepared_statements[name] = PreparedStatement(name, sql)
+    return statement
+
+
+def execute_prepared(cursor, statement, params=()):
+    """Run a registered statement, preparing it first if this connection has not yet."""
+    conn = cursor.connection
+    if not getattr(conn, "use_prepared", False):
+        cursor.execute(statement.sql, params)
+        return
+    if statement.name not in conn.prepared:
+        # PREPARE is not transactional: the statement outlives a later rollback
+        cursor.execute(statement.prepare_sql)
+        conn.prepared.add(statement.name)
+    cursor.execute(statement.execute_sql, params)
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection handed out by ConnectionPool; remembers which statements it has prepared."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_prepared = False
+        self.prepared = set()
+        # Streams still reading from this connection after their view returned
+        self.stream_holds = 0
+        self.release_pending = False
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor that adds each statement's time and row count to its connection's totals.
+
+    A named (server-side) cursor only DECLAREs on execute; its rows are produced
+    by the FETCHes behind fetchone/fetchmany/fetchall, so those are timed too.
+    Its statement reaches the slow-query log when the cursor is closed, with the
+    DECLARE and every FETCH added up.
+    """
+
+    _statement = None
+    _elapsed = 0.0
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.name is not None:
+                self._statement = (query, vars)
+                self._elapsed = elapsed
+            self.connection.record(self, elapsed, query, vars)
+
+    def fetchone(self):
+        return self._fetch(super().fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(super().fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._fetch(super().fetchall)
+
+    def _fetch(self, fetch, *args, **kwargs):
+        if self.name is None:
+            # Rows of a client-side cursor are already in memory
+            return fetch(*args, **kwargs)
+        started = time.perf_counter()
+        result = fetch(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self._elapsed += elapsed
+        rows = len(result) if isinstance(result, list) else int(result is not None)
+        self.connection.record_fetch(elapsed, rows)
+        return result
+
+    def close(self):
+        statement, self._statement = self._statement, None
+        slow_log = self.connection.slow_log
+        if statement is not None and slow_log is not None and self._elapsed >= slow_log.threshold:
+            slow_log.observe(self, statement[0], statement[1], self._elapsed)
+        return super().close()
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self.connection.record(self, time.perf_counter() - started, query)
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            self.connection.record(self, time.perf_counter() - started, sql)
+
+
+class InstrumentedConnection(PooledConnection):
+    """Connection whose cursors are timed; ``reset_counters`` runs at every checkout."""
+
+    # Set by the pool when the slow-query log is on (app.utils.slow_queries)
+    slow_log = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cursor_factory = InstrumentedCursor
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.row_count = 0
+
+    def record(self, cursor, elapsed, query, vars=None):
+        self.query_count += 1
+        self.query_time += elapsed
+        # rowcount is -1 for named cursors (rows arrive on fetch) and utility statements
+        if cursor.rowcount > 0:
+            self.row_count += cursor.rowcount
+        # A named cursor's statement is observed on close (InstrumentedCursor.close)
+        if self.slow_log is not None and cursor.name is None and elapsed >= self.slow_log.threshold:
+            self.slow_log.observe(cursor, query, vars, elapsed)
+
+    def record_fetch(self, elapsed, rows):
+        """A FETCH on a named cursor; its statement was already counted by record()."""
+        self.query_time += elapsed
+        self.row_count += rows
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections shared by every request in a process.
+
+    Connections idle for longer than ``check_interval`` seconds are pinged before
+    being handed out; dead ones are discarded and replaced transparently. With
+    ``instrument`` set, connections count their queries (see InstrumentedCursor).
+    With ``prepared_statements`` set, execute_prepared() uses server-side
+    prepared statements, which live as long as the pooled connection.
+
+    The pool is safe to create before a pre-forking server forks: a child
+    process never uses the connections it inherited and opens its own.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=30.0, check_interval=30.0, instrument=False,
+                 prepared_statements=True):
+        self.dsn = dsn
+        self.instrument = instrument
+        self.prepared_statements = prepared_statements
+        self.slow_log = None
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_interval = check_interval
+
+        # Connections a forked child inherited; kept referenced so they are never
+        # closed (and the parent's sessions terminated) by this process
+        self._inherited = []
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "reconnects": 0,
+            "discarded": 0,
+            "wait_time": 0.0,
+        }
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._inherited.extend(conn for conn, _ in self._idle)
+            self._reset()
+
+    def _connect(self):
+        if self.instrument:
+            conn = psycopg2.connect(self.dsn, connection_factory=InstrumentedConnection)
+            conn.slow_log = self.slow_log
+        else:
+            conn = psycopg2.connect(self.dsn, connection_factory=PooledConnection)
+        conn.use_prepared = self.prepared_statements
+        with self._cond:
+            self._stats["connects"] += 1
+        return conn
+
+    def open(self):
+        """Eagerly create connections up to ``minconn``."""
+        self._check_pid()
+        while True:
+            with self._cond:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                self._release_slot()
+                raise
+            self._checkin(conn)
+
+    def getconn(self, timeout=None):
+        self._check_pid()
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.maxconn:
+                    self._size += 1
+                    conn, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection available after {timeout:.1f}s "
+                        f"(pool size {self.maxconn})"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_time"] += time.monotonic() - started
+
+        try:
+            if conn is None:
+                return self._connect()
+            if not self._is_alive(conn, last_used):
+                self._discard(conn)
+                conn = self._connect()
+                with self._cond:
+                    self._stats["reconnects"] += 1
+            return conn
+        except Exception:
+            self._release_slot()
+            raise
+
+    def putconn(self, conn):
+        if conn.closed:
+            self._release_slot(discarded=True)
+            return
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except psycopg2.Error:
+            self._discard(conn)
+            self._release_slot()
+            return
+        self._checkin(conn)
+
+    def _checkin(self, conn):
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _release_slot(self, discarded=False):
+        with self._cond:
+            self._size -= 1
+            if discarded:
+                self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def _is_alive(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._cond:
+            self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def closeall(self):
+        self._check_pid()
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                try:
+                    conn.close()
+                except psycopg2.Error:
+                    pass
+
+    def stats(self):
+        self._check_pid()
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiting": self._waiting,
+                **self._stats,
+            }
+
+
+def get_pool(app=None):
+    app = app or current_app
+    return app.extensions["db_pool"]
+
+
+def pool_stats():
+    return get_pool().stats()
+
 
 def get_db():
     if 'db' not in g:
-        g.db = psycopg2.connect(current_app.config['DATABASE_URL'])
+        g.db = get_pool().getconn()
+        if isinstance(g.db, InstrumentedConnection):
+            g.db.reset_counters()
     return g.db
 
 def close_db(e=None):
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
+    db = g.get('db')
+    if db is None:
+        return
+    if getattr(db, 'stream_holds', 0):
+        # A streamed body still reads from it; the stream gives it back (see hold_db)
+        db.release_pending = True
+        return
+    g.pop('db')
+    db.release_pending = False
+    get_pool().putconn(db)
+
+def hold_db():
+    """Keep the request's connection checked out until a streamed body is done with it.
+
+    Flask can tear the request down before the body is sent, and putconn()
+    would roll back (and so close) a named cursor the body still reads from.
+    Returns a function the stream calls once, when it ends: if the request
+    was torn down in the meantime and no teardown is left to come (the
+    client went away), that call returns the connection to the pool.
+    """
+    db = get_db()
+    pool = get_pool()
+    db.stream_holds += 1
+
+    def release():
+        db.stream_holds -= 1
+        if db.stream_holds or not db.release_pending:
+            return
+        if has_app_context() and g.get('db') is db:
+            # Still the current request's connection: its teardown releases it
+            return
+        db.release_pending = False
+        pool.putconn(db)
+
+    return release
 
 def init_app(app):
+    app.extensions["db_pool"] = ConnectionPool(
+        app.config['DATABASE_URL'],
+        minconn=app.config['DB_POOL_MIN_SIZE'],
+        maxconn=app.config['DB_POOL_MAX_SIZE'],
+        timeout=app.config['DB_POOL_TIMEOUT'],
+        check_interval=app.config['DB_POOL_CHECK_INTERVAL'],
+        instrument=app.config['METRICS_ENABLED'] or app.config['SLOW_QUERY_MS'] > 0,
+        prepared_statements=app.config['DB_PREPARED_STATEMENTS'],
+    )
     app.teardown_appcontext(close_db)
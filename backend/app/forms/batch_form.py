@@ -0,0 +1,98 @@
+class BatchForm:
+    """Parses a /batch request body.
+
+    Body: {"operations": [...], "atomic": false}, where each operation is
+    {"op": "update", "id": ..., "data": {...}} or {"op": "delete", "id": ...}.
+    Update data may hold any subset of ``fields``; values are non-empty strings,
+    except ``int_fields`` (integers) and ``nullable_fields`` (may also be null).
+    """
+
+    def __init__(self, data, fields, int_fields=(), nullable_fields=(), max_operations=1000):
+        self.data = data if isinstance(data, dict) else {}
+        self.fields = fields
+        self.int_fields = int_fields
+        self.nullable_fields = nullable_fields
+        self.max_operations = max_operations
+        self.atomic = self.data.get("atomic") is True
+        self.results = []
+        self.updates = {}
+        self.deletes = []
+        self.errors = []
+
+    def is_valid(self):
+        operations = self.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            self.errors.append("operations must be a non-empty list.")
+        elif len(operations) > self.max_operations:
+            self.errors.append(f"A batch may contain at most {self.max_operations} operations.")
+        else:
+            for index, operation in enumerate(operations):
+                self._parse(index, operation)
+        return not self.errors
+
+    @property
+    def invalid(self):
+        return any(result.get("status") == "invalid" for result in self.results)
+
+    def _parse(self, index, operation):
+        operation = operation if isinstance(operation, dict) else {}
+        key = operation.get("id")
+        key = key.strip() if isinstance(key, str) else key
+        result = {"index": index, "op": operation.get("op"), "id": key}
+        self.results.append(result)
+
+        error = None
+        if result["op"] not in ("update", "delete"):
+            error = "op must be 'update' or 'delete'."
+        elif not isinstance(key, str) or not key:
+            error = "id is required."
+        elif key in self.updates or key in self.deletes:
+            error = "Duplicate id in batch."
+        elif result["op"] == "update":
+            fields, error = self._clean(operation.get("data"))
+            if not error:
+                self.updates[key] = fields
+        else:
+            self.deletes.append(key)
+
+        if error:
+            result["status"] = "invalid"
+            result["error"] = error
+
+    def _clean(self, data):
+        if not isinstance(data, dict) or not data:
+            return None, "data must be a non-empty object."
+        fields = {}
+        for name, value in data.items():
+            if name not in self.fields:
+                return None, f"Unknown or read-only field '{name}'."
+            if value is None and name in self.nullable_fields:
+                fields[name] = None
+            elif name in self.int_fields:
+                if not isinstance(value, int) or isinstance(value, bool):
+                    return None, f"{name} must be an integer."
+                fields[name] = value
+            elif not isinstance(value, str) or not value.strip():
+                return None, f"{name} must be a non-empty string."
+            else:
+                fields[name] = value.strip()
+        return fields, None
+
+    def finish(self, statuses, applied, messages):
+        """Fill in each operation's outcome from the model's ``{id: status}`` map."""
+        for result in self.results:
+            if result.get("status") == "invalid":
+                continue
+            status = statuses.get(result["id"])
+            if status in messages:
+                result["status"] = "failed"
+                result["error"] = messages[status]
+            elif applied:
+                result["status"] = status
+            else:
+                result["status"] = "skipped"
+
+        counts = {}
+        for result in self.results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return {"applied": applied, "counts": counts, "results": self.results}
@@ -1,6 +1,25 @@
-from app.database import get_db
+from flask import current_app
+from psycopg2.extras import execute_values
+
+from app.database import execute_prepared, get_db, prepare
+from app.utils.batch import lock_existing
+from app.utils.cache import reference_cache
+from app.utils.pagination import decode_cursor, keyset, page_cursors, paginate
+from app.utils.search import relevance, search_clause
+from app.utils.streaming import iter_chunks
+
+GET_COLLEGE = prepare("college_get", "SELECT collegecode, collegename FROM college WHERE collegecode = %s")
+COLLEGE_EXISTS = prepare("college_exists", "SELECT 1 FROM college WHERE LOWER(collegecode) = LOWER(%s)")
+UPDATE_COLLEGE = prepare("college_update", "UPDATE college SET collegecode = %s, collegename = %s WHERE collegecode = %s")
 
 class College:
+    cache_key = "college:all"
+    # Behind all() (the dropdowns) and total(); also run by app.aio
+    all_sql = "SELECT collegecode, collegename FROM college ORDER BY collegename"
+    total_sql = "SELECT COUNT(*) FROM college"
+
+    columns = ("collegecode", "collegename")
+
     def __init__(self, collegeCode, collegeName):
         self.collegeCode = collegeCode
         self.collegeName = collegeName
@@ -18,12 +37,13 @@ class College:
         cursor.execute(sql, (self.collegeCode, self.collegeName))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     @classmethod
     def get(cls, collegeCode):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT collegecode, collegename FROM college WHERE collegecode = %s", (collegeCode,))
+        execute_prepared(cursor, GET_COLLEGE, (collegeCode,))
         row = cursor.fetchone()
         cursor.close()
         return cls(*row) if row else None
@@ -32,7 +52,7 @@ class College:
     def exists(cls, collegeCode):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT 1 FROM college WHERE LOWER(collegecode) = LOWER(%s)", (collegeCode,))
+        execute_prepared(cursor, COLLEGE_EXISTS, (collegeCode,))
         exists = cursor.fetchone() is not None
         cursor.close()
         return exists
@@ -40,10 +60,10 @@ class College:
     def update(self, originalcode):
         db = get_db()
         cursor = db.cursor()
-        sql = "UPDATE college SET collegecode = %s, collegename = %s WHERE collegecode = %s"
-        cursor.execute(sql, (self.collegeCode, self.collegeName, originalcode))
+        execute_prepared(cursor, UPDATE_COLLEGE, (self.collegeCode, self.collegeName, originalcode))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     def delete(self):
         db = get_db()
@@ -51,6 +71,7 @@ class College:
         cursor.execute("DELETE FROM college WHERE collegecode = %s", (self.collegeCode,))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     def delete_with_program_update(self):
         """Detach programs from this college, then delete the college itself."""
@@ -62,78 +83,160 @@ class College:
         cursor.execute("DELETE FROM college WHERE collegecode = %s", (self.collegeCode,))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     @classmethod
-    def all(cls):
+    def invalidate_cache(cls):
+        # Programs carry their college code, so their cached list goes too
+        reference_cache.invalidate(cls.cache_key, "program:all")
+
+    @classmethod
+    def _load_all(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT collegecode, collegename FROM college ORDER BY collegename")
+        cursor.execute(cls.all_sql)
         rows = cursor.fetchall()
         cursor.close()
+        return rows
+
+    @classmethod
+    def apply_batch(cls, updates, deletes, atomic=False):
+        """Apply partial updates ``{collegeCode: {field: value}}`` and deletes in one transaction.
+
+        Deleted colleges detach their programs first, as delete_with_program_update() does.
+        Returns ``({collegeCode: status}, applied)``; see Student.apply_batch().
+        """
+        if not updates and not deletes:
+            return {}, True
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            found, _ = lock_existing(cursor, "college", "collegecode", list(updates) + list(deletes))
+
+            statuses = {c: "not_found" for c in list(updates) + list(deletes) if c not in found}
+            if atomic and statuses:
+                db.rollback()
+                return statuses, False
+
+            rows = []
+            for collegeCode, fields in updates.items():
+                if collegeCode in statuses:
+                    continue
+                rows.append((collegeCode, fields.get("collegeName")))
+                statuses[collegeCode] = "updated"
+            if rows:
+                execute_values(
+                    cursor,
+                    "UPDATE college c SET collegename = COALESCE(v.collegename, c.collegename) "
+                    "FROM (VALUES %s) AS v(collegecode, collegename) "
+                    "WHERE c.collegecode = v.collegecode",
+                    rows,
+                    page_size=len(rows)
+                )
+
+            doomed = [collegeCode for collegeCode in deletes if collegeCode not in statuses]
+            if doomed:
+                cursor.execute("UPDATE program SET collegecode = NULL WHERE collegecode = ANY(%s)", (doomed,))
+                cursor.execute("DELETE FROM college WHERE collegecode = ANY(%s)", (doomed,))
+                statuses.update((collegeCode, "deleted") for collegeCode in doomed)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        cls.invalidate_cache()
+        return statuses, True
+
+    @classmethod
+    def all(cls):
+        rows = reference_cache.get_or_set(cls.cache_key, cls._load_all, current_app.config["REFERENCE_CACHE_TTL"])
         return [cls(*row) for row in rows]
     
+    @classmethod
+    def iter_all(cls, max_rows, chunk_size):
+        """Streaming counterpart of all(): yields row chunks, capped at max_rows + 1 rows."""
+        sql = "SELECT collegecode, collegename FROM college ORDER BY collegename, collegecode LIMIT %s"
+        yield from iter_chunks(get_db(), sql, (max_rows + 1,), chunk_size, name="college_all")
+
     @classmethod
     def total(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM college")
+        cursor.execute(cls.total_sql)
         total = cursor.fetchone()[0]
         cursor.close()
         return total
     
+    # Sorting (map to actual DB column names)
+    sort_map = {
+        "collegeCode": "collegecode",
+        "collegeName": "collegename"
+    }
+
+    # Searchable fields, lowered to match the trigram indexes
+    search_columns = {
+        "collegeCode": "LOWER(collegecode)",
+        "collegeName": "LOWER(collegename)",
+    }
+
+    @classmethod
+    def _where(cls, search, search_by):
+        search_filter, params = search_clause(cls.search_columns, search, search_by)
+        return ([search_filter] if search_filter else []), params
+
     @classmethod
-    def query(cls, search, search_by, sort_by, sort_order, page, page_size):
+    def query(cls, search, search_by, sort_by, sort_order, page, page_size, count="exact"):
         db = get_db()
         cursor = db.cursor()
 
-        # Base query
-        sql = "SELECT collegecode, collegename FROM college"
-        params = []
-
-        # Search
-        if search:
-            like = f"%{search}%"
-            if search_by == "collegeCode":
-                sql += " WHERE LOWER(collegecode) LIKE %s"
-                params.append(like)
-            elif search_by == "collegeName":
-                sql += " WHERE LOWER(collegename) LIKE %s"
-                params.append(like)
-            elif search_by == "all":
-                sql += " WHERE LOWER(collegecode) LIKE %s OR LOWER(collegename) LIKE %s"
-                params.extend([like, like])
-
-        # Sorting (map to actual DB column names)
-        sort_map = {
-            "collegeCode": "collegecode",
-            "collegeName": "collegename"
-        }
-        sort_column = sort_map.get(sort_by, "collegecode")
-        sql += f" ORDER BY {sort_column} {sort_order.upper()}"
+        where_clauses, params = cls._where(search, search_by)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
-        # Pagination
-        offset = (page - 1) * page_size
-        sql += " LIMIT %s OFFSET %s"
-        params.extend([page_size, offset])
+        sort_column = cls.sort_map.get(sort_by, "collegecode")
+        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+        order_sql = f"ORDER BY {sort_column} {sort_direction}"
+        order_params = []
 
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
+        if sort_by == "relevance":
+            rank_sql, order_params = relevance(cls.search_columns, search, search_by)
+            if rank_sql:
+                order_sql = f"ORDER BY {rank_sql} DESC, collegecode"
 
-        # Count total
-        count_sql = "SELECT COUNT(*) FROM college"
-        if search:
-            if search_by == "collegeCode":
-                count_sql += " WHERE LOWER(collegecode) LIKE %s"
-                cursor.execute(count_sql, [like])
-            elif search_by == "collegeName":
-                count_sql += " WHERE LOWER(collegename) LIKE %s"
-                cursor.execute(count_sql, [like])
-            elif search_by == "all":
-                count_sql += " WHERE LOWER(collegecode) LIKE %s OR LOWER(collegename) LIKE %s"
-                cursor.execute(count_sql, [like, like])
-        else:
-            cursor.execute(count_sql)
-        total = cursor.fetchone()[0]
+        rows, total, exact = paginate(
+            cursor,
+            "SELECT collegecode, collegename",
+            f"FROM college{where_sql}",
+            order_sql,
+            params, page, page_size, count, order_params
+        )
 
         cursor.close()
-        return [cls(*row) for row in rows], total
\ No newline at end of file
+        return [cls(*row) for row in rows], total, exact
+
+    @classmethod
+    def seek(cls, search, search_by, sort_by, sort_order, cursor_token, page_size):
+        """Keyset-paginated variant of query(); returns (colleges, next_cursor, prev_cursor)."""
+        cursor_data = decode_cursor(cursor_token)
+        where_clauses, params = cls._where(search, search_by)
+
+        sort_column = cls.sort_map.get(sort_by, "collegecode")
+        sort_index = cls.columns.index(sort_column)
+        predicate, seek_params, order_sql, backwards = keyset(sort_column, "collegecode", sort_order, cursor_data)
+        if predicate:
+            where_clauses.append(predicate)
+            params.extend(seek_params)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            f"SELECT collegecode, collegename FROM college{where_sql} {order_sql} LIMIT %s",
+            params + [page_size + 1]
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+
+        rows, next_cursor, prev_cursor = page_cursors(rows, page_size, cursor_data, backwards, sort_index)
+        return [cls(*row) for row in rows], next_cursor, prev_cursor
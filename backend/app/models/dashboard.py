@@ -0,0 +1,66 @@
+from app.database import get_db
+
+# GROUPING(collegecode, programcode, gender, yearlevel) bitmask for each grouping
+# set: a bit is 1 when that column is rolled up in the row.
+GRAND_TOTAL = 0b1111
+BY_COLLEGE = 0b0111
+BY_PROGRAM = 0b1011
+BY_GENDER = 0b1101
+BY_YEAR_LEVEL = 0b1110
+
+
+def _sorted(rows, key):
+    # Match ORDER BY <key> (NULLS LAST) of the per-endpoint count queries
+    return sorted(rows, key=lambda row: (row[key] is None, row[key] if row[key] is not None else ""))
+
+
+class Dashboard:
+    @classmethod
+    def summary(cls):
+        """All dashboard totals and breakdowns from a single GROUPING SETS query.
+
+        Aggregates the trigger-maintained student_stats counters, so the cost
+        depends on the number of (program, gender, year level) groups rather
+        than the number of students.
+        """
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("""
+            SELECT GROUPING(p.collegecode, s.programcode, s.gender, s.yearlevel),
+                   p.collegecode, NULLIF(s.programcode, ''), NULLIF(s.gender, ''), NULLIF(s.yearlevel, 0),
+                   COALESCE(SUM(s.student_count), 0)::bigint,
+                   (SELECT COUNT(*) FROM program),
+                   (SELECT COUNT(*) FROM college)
+            FROM student_stats s
+            LEFT JOIN program p ON p.programcode = s.programcode
+            GROUP BY GROUPING SETS ((), (p.collegecode), (s.programcode), (s.gender), (s.yearlevel))
+            HAVING GROUPING(p.collegecode, s.programcode, s.gender, s.yearlevel) = 15
+                OR SUM(s.student_count) > 0
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+
+        summary = {
+            "totals": {"students": 0, "programs": 0, "colleges": 0},
+            "by_college": [],
+            "by_program": [],
+            "by_gender": [],
+            "by_year_level": [],
+        }
+        for grouping, college, program, gender, year, count, programs, colleges in rows:
+            if grouping == GRAND_TOTAL:
+                summary["totals"] = {"students": count, "programs": programs, "colleges": colleges}
+            elif grouping == BY_COLLEGE:
+                summary["by_college"].append({"collegeCode": college, "count": count})
+            elif grouping == BY_PROGRAM:
+                summary["by_program"].append({"programCode": program, "count": count})
+            elif grouping == BY_GENDER:
+                summary["by_gender"].append({"gender": gender, "count": count})
+            elif grouping == BY_YEAR_LEVEL:
+                summary["by_year_level"].append({"yearLevel": year, "count": count})
+
+        summary["by_college"] = _sorted(summary["by_college"], "collegeCode")
+        summary["by_program"] = _sorted(summary["by_program"], "programCode")
+        summary["by_gender"] = _sorted(summary["by_gender"], "gender")
+        summary["by_year_level"] = _sorted(summary["by_year_level"], "yearLevel")
+        return summary
@@ -1,6 +1,27 @@
-from app.database import get_db
+from flask import current_app
+from psycopg2.extras import execute_values
+
+from app.database import execute_prepared, get_db, prepare
+from app.utils.batch import lock_existing
+from app.utils.cache import reference_cache
+from app.utils.pagination import decode_cursor, keyset, page_cursors, paginate
+from app.utils.search import relevance, search_clause
+from app.utils.streaming import iter_chunks
+
+GET_PROGRAM = prepare("program_get", "SELECT programcode, programname, collegecode FROM program WHERE programcode = %s")
+UPDATE_PROGRAM = prepare(
+    "program_update",
+    "UPDATE program SET programcode = %s, programname = %s, collegecode = %s WHERE programcode = %s"
+)
 
 class Program:
+    cache_key = "program:all"
+    # Behind all() (the dropdowns) and total(); also run by app.aio
+    all_sql = "SELECT programcode, programname, collegecode FROM program ORDER BY programname"
+    total_sql = "SELECT COUNT(*) FROM program"
+
+    columns = ("programcode", "programname", "collegecode")
+
     def __init__(self, programCode, programName, collegeCode=None):
         self.programCode = programCode
         self.programName = programName
@@ -20,14 +41,15 @@ class Program:
         cursor.execute(sql, (self.programCode, self.programName, self.collegeCode))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     def update(self, originalcode):
         db = get_db()
         cursor = db.cursor()
-        sql = "UPDATE program SET programcode = %s, programname = %s, collegecode = %s WHERE programcode = %s"
-        cursor.execute(sql, (self.programCode, self.programName, self.collegeCode, originalcode))
+        execute_prepared(cursor, UPDATE_PROGRAM, (self.programCode, self.programName, self.collegeCode, originalcode))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     def delete(self):
         db = get_db()
@@ -35,6 +57,7 @@ class Program:
         cursor.execute("DELETE FROM program WHERE programcode = %s", (self.programCode,))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
 
     def delete_with_student_update(self):
         db = get_db()
@@ -43,25 +66,101 @@ class Program:
         cursor.execute("DELETE FROM program WHERE programcode = %s", (self.programCode,))
         db.commit()
         cursor.close()
+        self.invalidate_cache()
+
+    @classmethod
+    def apply_batch(cls, updates, deletes, atomic=False):
+        """Apply partial updates ``{programCode: {field: value}}`` and deletes in one transaction.
+
+        Deleted programs detach their students first, as delete_with_student_update() does.
+        Returns ``({programCode: status}, applied)``; see Student.apply_batch().
+        """
+        if not updates and not deletes:
+            return {}, True
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            colleges = {f["collegeCode"] for f in updates.values() if f.get("collegeCode")}
+            found, known_colleges = lock_existing(
+                cursor, "program", "programcode", list(updates) + list(deletes),
+                "college", "collegecode", colleges
+            )
+
+            statuses = {}
+            for programCode in list(updates) + list(deletes):
+                if programCode not in found:
+                    statuses[programCode] = "not_found"
+                elif updates.get(programCode, {}).get("collegeCode", None) not in (None, *known_colleges):
+                    statuses[programCode] = "unknown_college"
+            if atomic and statuses:
+                db.rollback()
+                return statuses, False
+
+            rows = []
+            for programCode, fields in updates.items():
+                if programCode in statuses:
+                    continue
+                rows.append((programCode, fields.get("programName"), fields.get("collegeCode")))
+                statuses[programCode] = "updated"
+            if rows:
+                execute_values(
+                    cursor,
+                    "UPDATE program p SET programname = COALESCE(v.programname, p.programname), "
+                    "collegecode = COALESCE(v.collegecode, p.collegecode) "
+                    "FROM (VALUES %s) AS v(programcode, programname, collegecode) "
+                    "WHERE p.programcode = v.programcode",
+                    rows,
+                    page_size=len(rows)
+                )
+
+            doomed = [programCode for programCode in deletes if programCode not in statuses]
+            if doomed:
+                cursor.execute("UPDATE student SET programcode = NULL WHERE programcode = ANY(%s)", (doomed,))
+                cursor.execute("DELETE FROM program WHERE programcode = ANY(%s)", (doomed,))
+                statuses.update((programCode, "deleted") for programCode in doomed)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        cls.invalidate_cache()
+        return statuses, True
 
     @classmethod
     def get(cls, programCode):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT programcode, programname, collegecode FROM program WHERE programcode = %s", (programCode,))
+        execute_prepared(cursor, GET_PROGRAM, (programCode,))
         row = cursor.fetchone()
         cursor.close()
         return cls(*row) if row else None
 
     @classmethod
-    def all(cls):
+    def invalidate_cache(cls):
+        reference_cache.invalidate(cls.cache_key)
+
+    @classmethod
+    def _load_all(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT programcode, programname, collegecode FROM program ORDER BY programname")
+        cursor.execute(cls.all_sql)
         rows = cursor.fetchall()
         cursor.close()
+        return rows
+
+    @classmethod
+    def all(cls):
+        rows = reference_cache.get_or_set(cls.cache_key, cls._load_all, current_app.config["REFERENCE_CACHE_TTL"])
         return [cls(*row) for row in rows]
 
+    @classmethod
+    def iter_all(cls, max_rows, chunk_size):
+        """Streaming counterpart of all(): yields row chunks, capped at max_rows + 1 rows."""
+        sql = "SELECT programcode, programname, collegecode FROM program ORDER BY programname, programcode LIMIT %s"
+        yield from iter_chunks(get_db(), sql, (max_rows + 1,), chunk_size, name="program_all")
+
     @classmethod
     def exists(cls, programCode):
         db = get_db()
@@ -84,66 +183,86 @@ class Program:
     def total(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM program")
+        cursor.execute(cls.total_sql)
         total = cursor.fetchone()[0]
         cursor.close()
         return total
     
+    sort_map = {
+        "programCode": "programcode",
+        "programName": "programname",
+        "collegeCode": "collegecode"
+    }
+
+    # Keyset ordering needs a non-null sort key, so nullable columns are coalesced
+    keyset_map = {
+        **sort_map,
+        "collegeCode": "COALESCE(collegecode, '')",
+    }
+
+    # Searchable fields, lowered to match the trigram indexes
+    search_columns = {
+        "programCode": "LOWER(programcode)",
+        "programName": "LOWER(programname)",
+        "collegeCode": "LOWER(collegecode)",
+    }
+
     @classmethod
-    def query(cls, search, search_by, sort_by, sort_order, page, page_size):
+    def _where(cls, search, search_by):
+        search_filter, params = search_clause(cls.search_columns, search, search_by)
+        return ([search_filter] if search_filter else []), params
+
+    @classmethod
+    def query(cls, search, search_by, sort_by, sort_order, page, page_size, count="exact"):
         db = get_db()
         cursor = db.cursor()
 
-        sql = "SELECT programcode, programname, collegecode FROM program"
-        params = []
-
-        if search:
-            like = f"%{search}%"
-            if search_by == "programCode":
-                sql += " WHERE LOWER(programcode) LIKE %s"
-                params.append(like)
-            elif search_by == "programName":
-                sql += " WHERE LOWER(programname) LIKE %s"
-                params.append(like)
-            elif search_by == "collegeCode":
-                sql += " WHERE LOWER(collegecode) LIKE %s"
-                params.append(like)
-            elif search_by == "all":
-                sql += " WHERE LOWER(programcode) LIKE %s OR LOWER(programname) LIKE %s OR LOWER(collegecode) LIKE %s"
-                params.extend([like, like, like])
-
-        sort_map = {
-            "programCode": "programcode",
-            "programName": "programname",
-            "collegeCode": "collegecode"
-        }
-        sort_column = sort_map.get(sort_by, "programcode")
-        sql += f" ORDER BY {sort_column} {sort_order.upper()}"
+        where_clauses, params = cls._where(search, search_by)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
-        offset = (page - 1) * page_size
-        sql += " LIMIT %s OFFSET %s"
-        params.extend([page_size, offset])
+        sort_column = cls.sort_map.get(sort_by, "programcode")
+        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+        order_sql = f"ORDER BY {sort_column} {sort_direction}"
+        order_params = []
 
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
+        if sort_by == "relevance":
+            rank_sql, order_params = relevance(cls.search_columns, search, search_by)
+            if rank_sql:
+                order_sql = f"ORDER BY {rank_sql} DESC, programcode"
 
-        count_sql = "SELECT COUNT(*) FROM program"
-        if search:
-            if search_by == "programCode":
-                count_sql += " WHERE LOWER(programcode) LIKE %s"
-                cursor.execute(count_sql, [like])
-            elif search_by == "programName":
-                count_sql += " WHERE LOWER(programname) LIKE %s"
-                cursor.execute(count_sql, [like])
-            elif search_by == "collegeCode":
-                count_sql += " WHERE LOWER(collegecode) LIKE %s"
-                cursor.execute(count_sql, [like])
-            elif search_by == "all":
-                count_sql += " WHERE LOWER(programcode) LIKE %s OR LOWER(programname) LIKE %s OR LOWER(collegecode) LIKE %s"
-                cursor.execute(count_sql, [like, like, like])
-        else:
-            cursor.execute(count_sql)
-        total = cursor.fetchone()[0]
+        rows, total, exact = paginate(
+            cursor,
+            "SELECT programcode, programname, collegecode",
+            f"FROM program{where_sql}",
+            order_sql,
+            params, page, page_size, count, order_params
+        )
 
         cursor.close()
-        return [cls(*row) for row in rows], total
+        return [cls(*row) for row in rows], total, exact
+
+    @classmethod
+    def seek(cls, search, search_by, sort_by, sort_order, cursor_token, page_size):
+        """Keyset-paginated variant of query(); returns (programs, next_cursor, prev_cursor)."""
+        cursor_data = decode_cursor(cursor_token)
+        where_clauses, params = cls._where(search, search_by)
+
+        sort_expr = cls.keyset_map.get(sort_by, "programcode")
+        sort_index = cls.columns.index(cls.sort_map.get(sort_by, "programcode"))
+        predicate, seek_params, order_sql, backwards = keyset(sort_expr, "programcode", sort_order, cursor_data)
+        if predicate:
+            where_clauses.append(predicate)
+            params.extend(seek_params)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            f"SELECT programcode, programname, collegecode FROM program{where_sql} {order_sql} LIMIT %s",
+            params + [page_size + 1]
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+
+        rows, next_cursor, prev_cursor = page_cursors(rows, page_size, cursor_data, backwards, sort_index)
+        return [cls(*row) for row in rows], next_cursor, prev_cursor
@@ -1,6 +1,47 @@
-from app.database import get_db
+import csv
+import io
+
+from psycopg2.extras import execute_values
+
+from app.database import execute_prepared, get_db, prepare
+from app.utils.batch import lock_existing
+from app.utils.pagination import decode_cursor, keyset, page_cursors, paginate
+from app.utils.search import relevance, search_clause
+from app.utils.streaming import iter_chunks
+
+# Point lookups and single-row writes run thousands of times a minute
+GET_STUDENT = prepare(
+    "student_get",
+    "SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url FROM student WHERE studentid = %s"
+)
+STUDENT_EXISTS = prepare("student_exists", "SELECT 1 FROM student WHERE LOWER(studentid) = LOWER(%s)")
+UPDATE_STUDENT = prepare(
+    "student_update",
+    "UPDATE student SET studentid = %s, firstname = %s, lastname = %s, programcode = %s, yearlevel = %s, gender = %s, photo_url = %s WHERE studentid = %s"
+)
+DELETE_STUDENT = prepare("student_delete", "DELETE FROM student WHERE studentid = %s")
 
 class Student():
+    columns = ("studentid", "firstname", "lastname", "programcode", "yearlevel", "gender", "photo_url")
+    select_sql = "SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url"
+
+    # Dashboard counts, read from the trigger-maintained counters instead of scanning student
+    count_by_prog_sql = """
+        SELECT NULLIF(programcode, ''), SUM(student_count)::bigint as student_count
+        FROM student_stats
+        GROUP BY programcode
+        HAVING SUM(student_count) > 0
+        ORDER BY 1
+    """
+    gender_count_sql = """
+        SELECT NULLIF(gender, ''), SUM(student_count)::bigint as student_count
+        FROM student_stats
+        GROUP BY gender
+        HAVING SUM(student_count) > 0
+        ORDER BY 1
+    """
+    total_sql = "SELECT COALESCE(SUM(student_count), 0)::bigint FROM student_stats"
+
     def __init__(self, studentID, firstName, lastName, programCode, yearLevel, gender, photoUrl=None):
         self.studentID = studentID
         self.firstName = firstName
@@ -33,23 +74,161 @@ class Student():
     def update(self, originalcode):
         db = get_db()
         cursor = db.cursor()
-        sql = "UPDATE student SET studentid = %s, firstname = %s, lastname = %s, programcode = %s, yearlevel = %s, gender = %s, photo_url = %s WHERE studentid = %s"
-        cursor.execute(sql, (self.studentID, self.firstName, self.lastName, self.programCode, self.yearLevel, self.gender, self.photoUrl, originalcode))
+        execute_prepared(cursor, UPDATE_STUDENT, (self.studentID, self.firstName, self.lastName, self.programCode, self.yearLevel, self.gender, self.photoUrl, originalcode))
         db.commit()
         cursor.close()
 
     def delete(self):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("DELETE FROM student WHERE studentid = %s", (self.studentID,))
+        execute_prepared(cursor, DELETE_STUDENT, (self.studentID,))
         db.commit()
         cursor.close()
 
+    @classmethod
+    def bulk_import(cls, batches, max_errors):
+        """Load validated students through COPY into a staging table, then merge them in one statement.
+
+        ``batches`` yields lists of ``(line, Student)``. Rows whose ID already exists
+        (case-insensitively), repeats an earlier row, or names an unknown program are
+        rejected. Returns ``(inserted, rejected_count, errors)`` where ``errors`` holds
+        at most ``max_errors`` ``(line, studentID, message)`` tuples.
+        """
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("""
+            CREATE TEMP TABLE student_import (
+                line INTEGER, studentid TEXT, firstname TEXT, lastname TEXT,
+                programcode TEXT, yearlevel INTEGER, gender TEXT, photo_url TEXT, error TEXT
+            ) ON COMMIT DROP
+        """)
+
+        for batch in batches:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for line, s in batch:
+                writer.writerow((line, s.studentID, s.firstName, s.lastName, s.programCode, s.yearLevel, s.gender, s.photoUrl))
+            buffer.seek(0)
+            cursor.copy_expert(
+                "COPY student_import (line, studentid, firstname, lastname, programcode, yearlevel, gender, photo_url) "
+                "FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+
+        cursor.execute("""
+            UPDATE student_import i
+            SET error = CASE
+                WHEN c.taken THEN 'Student ID already exists'
+                WHEN c.seen > 1 THEN 'Duplicate student ID in file'
+                ELSE 'Program code does not exist'
+            END
+            FROM (
+                SELECT line,
+                       EXISTS (SELECT 1 FROM student s WHERE LOWER(s.studentid) = LOWER(i.studentid)) AS taken,
+                       ROW_NUMBER() OVER (PARTITION BY LOWER(i.studentid) ORDER BY line) AS seen,
+                       EXISTS (SELECT 1 FROM program p WHERE p.programcode = i.programcode) AS known_program
+                FROM student_import i
+            ) c
+            WHERE c.line = i.line AND (c.taken OR c.seen > 1 OR NOT c.known_program)
+        """)
+        rejected = cursor.rowcount
+
+        cursor.execute("""
+            INSERT INTO student (studentid, firstname, lastname, programcode, yearlevel, gender, photo_url)
+            SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url
+            FROM student_import
+            WHERE error IS NULL
+            ON CONFLICT (studentid) DO NOTHING
+        """)
+        inserted = cursor.rowcount
+
+        cursor.execute("SELECT line, studentid, error FROM student_import WHERE error IS NOT NULL ORDER BY line LIMIT %s", (max_errors,))
+        errors = cursor.fetchall()
+
+        db.commit()
+        cursor.close()
+        return inserted, rejected, errors
+
+    # Fields a batch update may change, mapped to their columns
+    batch_columns = {
+        "firstName": "firstname",
+        "lastName": "lastname",
+        "programCode": "programcode",
+        "yearLevel": "yearlevel",
+        "gender": "gender",
+        "photoUrl": "photo_url",
+    }
+
+    @classmethod
+    def apply_batch(cls, updates, deletes, atomic=False):
+        """Apply partial updates ``{studentID: {field: value}}`` and deletes ``[studentID]`` in one transaction.
+
+        One locking SELECT checks every ID and program code, then a single
+        UPDATE ... FROM (VALUES ...) and DELETE ... = ANY apply the valid
+        operations, so the round trips do not grow with the batch.
+        Returns ``({studentID: status}, applied)``; with ``atomic`` nothing is
+        written if any operation fails.
+        """
+        if not updates and not deletes:
+            return {}, True
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            programs = {f["programCode"] for f in updates.values() if f.get("programCode")}
+            found, known_programs = lock_existing(
+                cursor, "student", "studentid", list(updates) + list(deletes),
+                "program", "programcode", programs
+            )
+
+            statuses = {}
+            for studentID in list(updates) + list(deletes):
+                if studentID not in found:
+                    statuses[studentID] = "not_found"
+                elif updates.get(studentID, {}).get("programCode", None) not in (None, *known_programs):
+                    statuses[studentID] = "unknown_program"
+            if atomic and statuses:
+                db.rollback()
+                return statuses, False
+
+            rows = []
+            for studentID, fields in updates.items():
+                if studentID in statuses:
+                    continue
+                if "photoUrl" in fields and not fields["photoUrl"]:
+                    fields = {**fields, "photoUrl": "/student-icon.jpg"}
+                rows.append((studentID, *(fields.get(name) for name in cls.batch_columns)))
+                statuses[studentID] = "updated"
+            if rows:
+                columns = list(cls.batch_columns.values())
+                assignments = ", ".join(f"{c} = COALESCE(v.{c}, s.{c})" for c in columns)
+                execute_values(
+                    cursor,
+                    f"UPDATE student s SET {assignments} "
+                    f"FROM (VALUES %s) AS v(studentid, {', '.join(columns)}) "
+                    "WHERE s.studentid = v.studentid",
+                    rows,
+                    template="(%s, %s, %s, %s, %s::integer, %s, %s)",
+                    page_size=len(rows)
+                )
+
+            doomed = [studentID for studentID in deletes if studentID not in statuses]
+            if doomed:
+                cursor.execute("DELETE FROM student WHERE studentid = ANY(%s)", (doomed,))
+                statuses.update((studentID, "deleted") for studentID in doomed)
+
+            db.commit()
+            return statuses, True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+
     @classmethod
     def get(cls, studentID):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url FROM student WHERE studentid = %s", (studentID,))
+        execute_prepared(cursor, GET_STUDENT, (studentID,))
         row = cursor.fetchone()
         cursor.close()
         return cls(*row) if row else None
@@ -63,11 +242,21 @@ class Student():
         cursor.close()
         return [cls(*row) for row in rows]
     
+    @classmethod
+    def iter_all_sql(cls, max_rows):
+        return f"{cls.select_sql} FROM student ORDER BY lastname, studentid LIMIT %s", [max_rows + 1]
+
+    @classmethod
+    def iter_all(cls, max_rows, chunk_size):
+        """Streaming counterpart of all(): yields row chunks, capped at max_rows + 1 rows."""
+        sql, params = cls.iter_all_sql(max_rows)
+        yield from iter_chunks(get_db(), sql, params, chunk_size, name="student_all")
+    
     @classmethod
     def exists(cls, studentID):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT 1 FROM student WHERE LOWER(studentid) = LOWER(%s)", (studentID,))
+        execute_prepared(cursor, STUDENT_EXISTS, (studentID,))
         exists = cursor.fetchone() is not None
         cursor.close()
         return exists
@@ -81,16 +270,22 @@ class Student():
         cursor.close()
         return [cls(*row) for row in rows]
 
+    @classmethod
+    def iter_by_prog_sql(cls, programCode, max_rows):
+        sql = f"{cls.select_sql} FROM student WHERE programcode = %s ORDER BY lastname, studentid LIMIT %s"
+        return sql, [programCode, max_rows + 1]
+
+    @classmethod
+    def iter_by_prog(cls, programCode, max_rows, chunk_size):
+        """Streaming counterpart of students_by_prog(): yields row chunks, capped at max_rows + 1 rows."""
+        sql, params = cls.iter_by_prog_sql(programCode, max_rows)
+        yield from iter_chunks(get_db(), sql, params, chunk_size, name="student_by_prog")
+
     @classmethod
     def student_count_by_prog(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("""
-            SELECT programcode, COUNT(*) as student_count
-            FROM student
-            GROUP BY programcode
-            ORDER BY programcode
-        """)
+        cursor.execute(cls.count_by_prog_sql)
         rows = cursor.fetchall()
         cursor.close()
         return rows  
@@ -99,12 +294,7 @@ class Student():
     def gender_count(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("""
-            SELECT gender, COUNT(*) as student_count
-            FROM student
-            GROUP BY gender
-            ORDER BY gender
-        """)
+        cursor.execute(cls.gender_count_sql)
         rows = cursor.fetchall()
         cursor.close()
         return rows
@@ -113,16 +303,89 @@ class Student():
     def total(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM student")
+        cursor.execute(cls.total_sql)
         total = cursor.fetchone()[0]
         cursor.close()
         return total
     
+    # Sorting
+    sort_map = {
+        "studentID": "studentid",
+        "firstName": "firstname",
+        "lastName": "lastname",
+        "yearLevel": "yearlevel",
+        "gender": "gender",
+        "programCode": "programcode",
+    }
+
+    # Searchable fields, lowered to match the trigram indexes
+    search_columns = {
+        "studentID": "LOWER(studentid)",
+        "firstName": "LOWER(firstname)",
+        "lastName": "LOWER(lastname)",
+        "yearLevel": "LOWER(CAST(yearlevel AS TEXT))",
+        "gender": "LOWER(gender)",
+        "programCode": "LOWER(programcode)",
+    }
+
+    # Too few distinct values for a trigram index: the term is matched against
+    # the values in the student_stats counters instead, and the rows holding
+    # them are found on the B-tree expression indexes (see search_clause)
+    search_domains = {
+        "yearLevel": "CAST(yearlevel AS TEXT)",
+        "gender": "LOWER(gender)",
+    }
+
+    # Keyset ordering needs a non-null sort key, so nullable columns are coalesced
+    keyset_map = {
+        **sort_map,
+        "programCode": "COALESCE(programcode, '')",
+    }
+    # Type of a cursor's sort value, where it is not a string
+    cursor_types = {
+        "yearLevel": int,
+    }
+
     @classmethod
-    def query(cls, search, search_by, sort_by, sort_order, page, page_size, program_codes, genders, year_levels):
-        db = get_db()
-        cursor = db.cursor()
+    def search_values_sql(cls, search, search_by):
+        """search_matches()' lookup of the values holding the term: ``(sql, params)``, or ``(None, [])``."""
+        fields = cls._domain_fields(search, search_by)
+        if not fields:
+            return None, []
+        sql = " UNION ALL ".join(
+            f"SELECT DISTINCT '{field}', {cls.search_domains[field]} FROM student_stats "
+            f"WHERE {cls.search_domains[field]} LIKE %s"
+            for field in fields
+        )
+        return sql, [f"%{search}%"] * len(fields)
+
+    @classmethod
+    def search_matches(cls, search, search_by, rows):
+        """search_clause()'s ``matches`` from the ``(field, value)`` rows of search_values_sql()."""
+        matches = {field: (cls.search_domains[field], []) for field in cls._domain_fields(search, search_by)}
+        for field, value in rows:
+            matches[field][1].append(value)
+        return matches
+
+    @classmethod
+    def _domain_fields(cls, search, search_by):
+        if not search:
+            return []
+        return [field for field in cls.search_domains if search_by in ("all", field)]
+
+    @classmethod
+    def _lookup_matches(cls, search, search_by):
+        sql, params = cls.search_values_sql(search, search_by)
+        if sql is None:
+            return {}
+        cursor = get_db().cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        return cls.search_matches(search, search_by, rows)
 
+    @classmethod
+    def _where(cls, search, search_by, program_codes, genders, year_levels, matches=None):
         filters = []
         params = []
 
@@ -142,71 +405,107 @@ class Student():
             filters.append(f"CAST(yearlevel AS TEXT) IN ({placeholders})")
             params.extend(year_levels)
 
-        # Search
-        like = f"%{search}%" if search else None
-        search_filter = ""
-        if search:
-            if search_by == "studentID":
-                search_filter = "LOWER(studentid) LIKE %s"
-            elif search_by == "firstName":
-                search_filter = "LOWER(firstname) LIKE %s"
-            elif search_by == "lastName":
-                search_filter = "LOWER(lastname) LIKE %s"
-            elif search_by == "yearLevel":
-                search_filter = "LOWER(CAST(yearlevel as TEXT)) LIKE %s"
-            elif search_by == "gender":
-                search_filter = "LOWER(gender) LIKE %s"
-            elif search_by == "programCode":
-                search_filter = "LOWER(programcode) LIKE %s"
-            elif search_by == "all":
-                search_filter = (
-                    "LOWER(studentid) LIKE %s OR LOWER(firstname) LIKE %s OR LOWER(lastname) LIKE %s OR "
-                    "LOWER(CAST(yearlevel as TEXT)) LIKE %s OR LOWER(gender) LIKE %s OR LOWER(programcode) LIKE %s"
-                )
-
-        # Combine filters and search
         where_clauses = []
         if filters:
             where_clauses.append(" AND ".join(filters))
-        if search and search_filter:
-            where_clauses.append(f"({search_filter})")
-            if search_by == "all":
-                params.extend([like] * 6)
-            else:
-                params.append(like)
-        
+
+        # Search
+        search_filter, search_params = search_clause(cls.search_columns, search, search_by, matches)
+        if search_filter:
+            where_clauses.append(search_filter)
+            params.extend(search_params)
+
+        return where_clauses, params
+
+    @classmethod
+    def query_sql(cls, search, search_by, sort_by, sort_order, program_codes, genders, year_levels, matches=None):
+        """query()'s statement as paginate() takes it: ``(from_sql, order_sql, params, order_params)``.
+
+        ``matches`` come from search_matches(); without them gender and year
+        level are searched with a plain LIKE.
+        """
+        where_clauses, params = cls._where(search, search_by, program_codes, genders, year_levels, matches)
         where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
+        sort_column = cls.sort_map.get(sort_by, "studentid")
+        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
+        order_sql = f"ORDER BY {sort_column} {sort_direction}"
+        order_params = []
 
+        if sort_by == "relevance":
+            rank_sql, order_params = relevance(cls.search_columns, search, search_by)
+            if rank_sql:
+                order_sql = f"ORDER BY {rank_sql} DESC, studentid"
 
-        # Sorting
-        sort_map = {
-            "studentID": "studentid",
-            "firstName": "firstname",
-            "lastName": "lastname",
-            "yearLevel": "yearlevel",
-            "gender": "gender",
-            "programCode": "programcode",
-        }
-        sort_column = sort_map.get(sort_by, "studentid")
-        offset = (page -1) * page_size
+        return f"FROM student{where_sql}", order_sql, params, order_params
+
+    @classmethod
+    def query(cls, search, search_by, sort_by, sort_order, page, page_size, program_codes, genders, year_levels, count="exact"):
+        db = get_db()
+        cursor = db.cursor()
+
+        from_sql, order_sql, params, order_params = cls.query_sql(
+            search, search_by, sort_by, sort_order, program_codes, genders, year_levels,
+            cls._lookup_matches(search, search_by)
+        )
+        rows, total, exact = paginate(cursor, cls.select_sql, from_sql, order_sql, params, page, page_size, count, order_params)
+
+        cursor.close()
+        return [cls(*row) for row in rows], total, exact
+
+    @classmethod
+    def export(cls, search, search_by, sort_by, sort_order, program_codes, genders, year_levels, chunk_size):
+        """Yield every matching student row, chunk_size rows at a time, from a server-side cursor."""
+        matches = cls._lookup_matches(search, search_by)
+        where_clauses, params = cls._where(search, search_by, program_codes, genders, year_levels, matches)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+        sort_column = cls.sort_map.get(sort_by, "studentid")
+        sort_direction = "DESC" if sort_order.lower() == "desc" else "ASC"
 
         sql = f"""
-            SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url 
-            FROM student {where_sql} 
-            ORDER BY {sort_column} {sort_order.upper()}
-            LIMIT %s OFFSET %s
+            SELECT studentid, firstname, lastname, programcode, yearlevel, gender, photo_url
+            FROM student{where_sql}
+            ORDER BY {sort_column} {sort_direction}, studentid {sort_direction}
         """
+        yield from iter_chunks(get_db(), sql, params, chunk_size, name="student_export")
 
-        query_params = params + [page_size, offset]
-        cursor.execute(sql, query_params)
-        rows = cursor.fetchall()
+    @classmethod
+    def seek_sql(cls, search, search_by, sort_by, sort_order, cursor_data, page_size, program_codes, genders, year_levels,
+                 matches=None):
+        """seek()'s statement for a decoded cursor: ``(sql, params, backwards, sort_index)``."""
+        where_clauses, params = cls._where(search, search_by, program_codes, genders, year_levels, matches)
 
-        # Count query
-        count_sql = f"SELECT COUNT(*) FROM student {where_sql}"
-        cursor.execute(count_sql, params)
-        total = cursor.fetchone()[0]
+        sort_expr = cls.keyset_map.get(sort_by, "studentid")
+        sort_index = cls.columns.index(cls.sort_map.get(sort_by, "studentid"))
+        predicate, seek_params, order_sql, backwards = keyset(sort_expr, "studentid", sort_order, cursor_data)
+        if predicate:
+            where_clauses.append(predicate)
+            params.extend(seek_params)
+        where_sql = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+
+        sql = f"""
+            {cls.select_sql}
+            FROM student {where_sql}
+            {order_sql}
+            LIMIT %s
+        """
+        return sql, params + [page_size + 1], backwards, sort_index
+
+    @classmethod
+    def seek(cls, search, search_by, sort_by, sort_order, cursor_token, page_size, program_codes, genders, year_levels):
+        """Keyset-paginated variant of query(); returns (students, next_cursor, prev_cursor)."""
+        cursor_data = decode_cursor(cursor_token, cls.cursor_types.get(sort_by, str))
+        sql, params, backwards, sort_index = cls.seek_sql(
+            search, search_by, sort_by, sort_order, cursor_data, page_size, program_codes, genders, year_levels,
+            cls._lookup_matches(search, search_by)
+        )
 
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
         cursor.close()
-        return [cls(*row) for row in rows], total
 
+        rows, next_cursor, prev_cursor = page_cursors(rows, page_size, cursor_data, backwards, sort_index)
+        return [cls(*row) for row in rows], next_cursor, prev_cursor
@@ -0,0 +1,17 @@
+from app.database import get_db
+
+
+class TableVersion:
+    """Per-table change counters, bumped when a transaction that wrote the table commits."""
+
+    @classmethod
+    def current(cls, tables):
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)",
+            (list(tables),)
+        )
+        versions = dict(cursor.fetchall())
+        cursor.close()
+        return [versions.get(table, 0) for table in tables]
@@ -1,5 +1,12 @@
-from app.database import get_db
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import current_app
+
+from app.database import execute_prepared, get_db, prepare
+from app.utils import hashing
+from app.utils.cache import user_cache
+
+GET_USER_BY_EMAIL = prepare("user_get_by_email", "SELECT userid, username, email, user_password FROM users WHERE email = %s")
+GET_USER_BY_ID = prepare("user_get_by_id", "SELECT userid, username, email FROM users WHERE userid = %s")
+UPDATE_USER_PASSWORD = prepare("user_update_password", "UPDATE users SET user_password = %s WHERE userid = %s")
 
 class User:
     def __init__(self, userid=None, username=None, email=None, password_hash=None):
@@ -17,10 +24,23 @@ class User:
 
     @staticmethod
     def hash_password(password):
-        return generate_password_hash(password)
+        return hashing.hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return hashing.check_password(self.password_hash, password)
+
+    def needs_rehash(self):
+        return hashing.needs_rehash(self.password_hash)
+
+    def update_password(self, raw_password):
+        """Re-hash and store the password with the configured method"""
+        self.password_hash = self.hash_password(raw_password)
+        db = get_db()
+        cursor = db.cursor()
+        execute_prepared(cursor, UPDATE_USER_PASSWORD, (self.password_hash, self.userid))
+        db.commit()
+        cursor.close()
+        self.invalidate_cache()
 
     def add(self, raw_password):
         """Insert a new user into the database"""
@@ -36,26 +56,38 @@ class User:
         self.userid = cursor.fetchone()[0]
         db.commit()
         cursor.close()
+        self.invalidate_cache()
         return self.userid
 
+    def invalidate_cache(self):
+        user_cache.invalidate(("id", str(self.userid)))
+
     @classmethod
-    def get_by_email(cls, email):
-        """Fetch a user by email"""
+    def _fetch_one(cls, statement, params):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT userid, username, email, user_password FROM users WHERE email = %s", (email,))
+        execute_prepared(cursor, statement, params)
         row = cursor.fetchone()
         cursor.close()
+        return row
+
+    @classmethod
+    def get_by_email(cls, email):
+        """Fetch a user by email, including the password hash"""
+        # Never cached: invalidate_cache() only reaches this worker, and the
+        # others would keep checking logins against a replaced hash
+        row = cls._fetch_one(GET_USER_BY_EMAIL, (email,))
         return cls(*row) if row else None
 
     @classmethod
     def get_by_id(cls, user_id):
-        """Fetch a user by ID"""
-        db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT userid, username, email, user_password FROM users WHERE userid = %s", (user_id,))
-        row = cursor.fetchone()
-        cursor.close()
+        """Fetch a user by ID, without the password hash"""
+        row = user_cache.get_or_set(
+            ("id", str(user_id)),
+            lambda: cls._fetch_one(GET_USER_BY_ID, (user_id,)),
+            current_app.config["USER_CACHE_TTL"],
+            cache_none=False
+        )
         return cls(*row) if row else None
 
     @classmethod
@@ -2,9 +2,15 @@ from app.controllers.student_controller import student_bp
 from app.controllers.program_controller import program_bp
 from app.controllers.college_controller import college_bp
 from app.controllers.auth_controller import auth_bp 
+from app.controllers.admin_controller import admin_bp
+from app.controllers.dashboard_controller import dashboard_bp
+from app.controllers.health_controller import health_bp
 
 def register_routes(app):
     app.register_blueprint(student_bp, url_prefix="/api/students")
     app.register_blueprint(program_bp, url_prefix="/api/programs")
     app.register_blueprint(college_bp, url_prefix="/api/colleges")
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+    app.register_blueprint(health_bp)
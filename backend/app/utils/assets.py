@@ -0,0 +1,111 @@
+"""In-memory manifest of the exported Next.js frontend.
+
+The static and template folders are indexed once at startup. Every page
+shell is rendered a single time, and each text asset is precompressed. After
+that, serve_frontend answers from memory without touching the filesystem.
+"""
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, render_template, request, send_file
+
+from app.utils.compression import available_encodings, compress, is_compressible, negotiate
+
+# Next.js puts a content hash in every path under _next/static/
+IMMUTABLE_PREFIX = "_next/static/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+class Asset:
+    def __init__(self, data, mimetype, cache_control, file_path=None):
+        self.data = data
+        self.file_path = file_path
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.sha1(data).hexdigest()[:20] if data is not None else None
+        self.variants = {}
+
+    def precompress(self, min_size):
+        if self.data is None or len(self.data) < min_size or not is_compressible(self.mimetype):
+            return
+        for encoding in available_encodings():
+            level = 11 if encoding == "br" else 9
+            self.variants[encoding] = compress(self.data, encoding, level)
+
+    def response(self):
+        if self.data is None:
+            # Too large to hold in memory; the OS page cache will do
+            response = send_file(self.file_path, mimetype=self.mimetype, conditional=True)
+            response.headers["Cache-Control"] = self.cache_control
+            return response
+
+        encoding = negotiate(list(self.variants)) if self.variants else None
+        if encoding:
+            response = Response(self.variants[encoding], mimetype=self.mimetype)
+            response.headers["Content-Encoding"] = encoding
+            response.set_etag(f"{self.etag}-{encoding}")
+        else:
+            response = Response(self.data, mimetype=self.mimetype)
+            response.set_etag(self.etag)
+        if self.variants:
+            response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = self.cache_control
+        return response.make_conditional(request)
+
+
+# URL path -> Asset
+_static = {}
+_pages = {}
+
+
+def _walk(folder):
+    for root, _, files in os.walk(folder):
+        for name in files:
+            full_path = os.path.join(root, name)
+            yield os.path.relpath(full_path, folder).replace(os.sep, "/"), full_path
+
+
+def build_manifest(app):
+    config = app.config
+    min_size = config["COMPRESS_MIN_SIZE"] if config["COMPRESS_STATIC"] else float("inf")
+    _static.clear()
+    _pages.clear()
+
+    if app.static_folder and os.path.isdir(app.static_folder):
+        for path, full_path in _walk(app.static_folder):
+            mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            cache_control = IMMUTABLE if path.startswith(IMMUTABLE_PREFIX) else REVALIDATE
+            if os.path.getsize(full_path) > config["ASSET_MEMORY_MAX_SIZE"]:
+                _static[path] = Asset(None, mimetype, cache_control, file_path=full_path)
+                continue
+            with open(full_path, "rb") as f:
+                asset = Asset(f.read(), mimetype, cache_control)
+            asset.precompress(min_size)
+            _static[path] = asset
+
+    if app.template_folder and os.path.isdir(app.template_folder):
+        with app.test_request_context():
+            for path, _ in _walk(app.template_folder):
+                if not path.endswith(".html"):
+                    continue
+                html = render_template(path).encode()
+                page = Asset(html, "text/html", REVALIDATE)
+                page.precompress(min_size)
+                _pages[path[:-len(".html")]] = page
+
+
+def serve(path):
+    asset = None
+    if path:
+        asset = _static.get(path) or _pages.get(path)
+    # Unknown paths fall back to the index shell for client-side routing
+    asset = asset or _pages.get("index")
+    if asset is None:
+        abort(404)
+    return asset.response()
+
+
+def init_app(app):
+    build_manifest(app)
@@ -0,0 +1,34 @@
+"""Access checks that are not a plain @jwt_required().
+
+The async read API (app.aio) validates its JWT cookie here, with the same
+flask_jwt_extended code and configuration as the @jwt_required() views, so
+both servers accept the same tokens and reject bad ones with the same
+responses. Operator endpoints (/metrics, /api/admin) check a static bearer
+token instead, since any user can sign up for a JWT.
+"""
+import hmac
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+def verify_access_token(app, headers):
+    """Run @jwt_required()'s checks against a request's ``headers``.
+
+    Returns ``(identity, None)``, or ``(None, response)`` with the Flask
+    response a @jwt_required() view would have sent (401 for a missing or
+    expired token, 422 for an invalid one).
+    """
+    with app.test_request_context(headers=headers):
+        try:
+            verify_jwt_in_request()
+        except Exception as e:
+            # The JWTManager's error handlers build the usual {"msg": ...} body
+            return None, app.make_response(app.handle_user_exception(e))
+        return get_jwt_identity(), None
+
+
+def has_bearer_token(token):
+    """Whether the request carries ``Authorization: Bearer <token>``."""
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())
@@ -0,0 +1,25 @@
+"""Shared SQL for the set-based /batch endpoints."""
+
+
+def lock_existing(cursor, table, key, ids, ref_table=None, ref_key=None, refs=()):
+    """Lock the rows of ``table`` whose ``key`` is in ``ids`` and check referenced keys, in one round trip.
+
+    Rows are locked in key order so concurrent batches cannot deadlock on each
+    other. Returns ``(found_ids, found_refs)`` as sets.
+    """
+    sql = f"""
+        WITH locked AS (
+            SELECT {key} FROM {table} WHERE {key} = ANY(%s) ORDER BY {key} FOR UPDATE
+        )
+        SELECT 'row', {key} FROM locked
+    """
+    params = [list(ids)]
+    if ref_table:
+        sql += f" UNION ALL SELECT 'ref', {ref_key} FROM {ref_table} WHERE {ref_key} = ANY(%s)"
+        params.append(list(refs))
+    cursor.execute(sql, params)
+
+    found = {"row": set(), "ref": set()}
+    for kind, value in cursor.fetchall():
+        found[kind].add(value)
+    return found["row"], found["ref"]
@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Small thread-safe in-process cache whose entries expire after a TTL.
+
+    With ``maxsize`` set, the least recently used entry is evicted once the
+    cache is full. Hits, misses and evictions are counted for ``stats()``.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate()/clear() so a load that started before the
+        # invalidation cannot store its (possibly stale) result afterwards.
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get_or_set(self, key, loader, ttl, cache_none=True):
+        now = time.monotonic()
+        hit, value, generation = self._lookup(key, now)
+        if hit:
+            return value
+        value = loader()
+        if value is not None or cache_none:
+            self._store(key, value, now + ttl, generation)
+        return value
+
+    async def get_or_set_async(self, key, loader, ttl, cache_none=True):
+        """get_or_set() with a coroutine ``loader``, for the asyncio server (app.aio)."""
+        now = time.monotonic()
+        hit, value, generation = self._lookup(key, now)
+        if hit:
+            return value
+        value = await loader()
+        if value is not None or cache_none:
+            self._store(key, value, now + ttl, generation)
+        return value
+
+    def _lookup(self, key, now):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return True, entry[1], None
+            self._stats["misses"] += 1
+            return False, None, self._generation
+
+    def _store(self, key, value, expires, generation):
+        with self._lock:
+            if generation == self._generation:
+                self._data[key] = (expires, value)
+                self._data.move_to_end(key)
+                while self.maxsize and len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self._stats["evictions"] += 1
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+            self._generation += 1
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "size": len(self._data),
+                "max_size": self.maxsize,
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+
+# College/program lists behind the dropdowns; invalidated by the model writes
+reference_cache = TTLCache()
+# User rows by id and by email; invalidated when a user is added or changed
+user_cache = TTLCache()
+
+
+def init_app(app):
+    reference_cache.maxsize = app.config["REFERENCE_CACHE_MAXSIZE"]
+    user_cache.maxsize = app.config["USER_CACHE_MAXSIZE"]
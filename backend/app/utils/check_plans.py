@@ -0,0 +1,149 @@
+"""Fail if a model query would fall back to a sequential scan.
+
+Run against a database seeded with a large dataset, after `flask db upgrade`:
+
+    python -m app.utils.check_plans --min-rows 100000
+
+Every SELECT issued by the model calls below is EXPLAINed first. Each case is
+selective by construction, so a Seq Scan on a table holding at least
+--min-rows rows means an index from the migrations is missing or unusable.
+Exits with status 1 when any such plan is found.
+"""
+import argparse
+import json
+import sys
+
+import psycopg2
+import psycopg2.extensions
+from flask import g
+
+from app import create_app
+from app.models.college import College
+from app.models.program import Program
+from app.models.student import Student
+
+
+class PlanConnection(psycopg2.extensions.connection):
+    plans = []
+
+
+class ExplainCursor(psycopg2.extensions.cursor):
+    """Cursor that records the plan of every SELECT before running it."""
+
+    def execute(self, sql, params=None):
+        if self.name is None and sql.lstrip().upper().startswith("SELECT"):
+            super().execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = self.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            self.connection.plans.append((" ".join(sql.split()), plan[0]["Plan"]))
+        return super().execute(sql, params)
+
+
+def seq_scans(plan):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def sample_values(cursor):
+    cursor.execute("SELECT studentid, lastname FROM student ORDER BY studentid LIMIT 1")
+    row = cursor.fetchone()
+    if row is None:
+        sys.exit("The student table is empty; seed a large dataset first.")
+    studentid, lastname = row
+    cursor.execute("""
+        SELECT programcode FROM student
+        WHERE programcode IS NOT NULL
+        GROUP BY programcode
+        ORDER BY COUNT(*), programcode
+        LIMIT 1
+    """)
+    rare_program = cursor.fetchone()[0]
+    cursor.execute("SELECT programcode FROM program ORDER BY programcode LIMIT 1")
+    programcode = cursor.fetchone()[0]
+    cursor.execute("SELECT collegecode FROM college ORDER BY collegecode LIMIT 1")
+    collegecode = cursor.fetchone()[0]
+    return studentid, lastname.lower()[:4], rare_program, programcode, collegecode
+
+
+def cases(studentid, name_fragment, rare_program, programcode, collegecode):
+    def students(**kwargs):
+        args = dict(search="", search_by="all", sort_by="studentID", sort_order="asc", page=1,
+                    page_size=10, program_codes=[], genders=[], year_levels=[], count="estimate")
+        args.update(kwargs)
+        return lambda: Student.query(**args)
+
+    def seek(sort_by, sort_order):
+        def run():
+            _, next_cursor, _ = Student.seek("", "all", sort_by, sort_order, "", 10, [], [], [])
+            if next_cursor:
+                Student.seek("", "all", sort_by, sort_order, next_cursor, 10, [], [], [])
+        return run
+
+    yield "Student.get", lambda: Student.get(studentid)
+    yield "Student.exists", lambda: Student.exists(studentid)
+    yield "Student.students_by_prog", lambda: Student.students_by_prog(rare_program)
+    for sort_by in Student.sort_map:
+        for order in ("asc", "desc"):
+            yield f"Student.query sortBy={sort_by} {order}", students(sort_by=sort_by, sort_order=order)
+            yield f"Student.seek sortBy={sort_by} {order}", seek(sort_by, order)
+    yield "Student.query searchBy=studentID", students(search=studentid, search_by="studentID", count="exact")
+    yield "Student.query searchBy=lastName", students(search=name_fragment, search_by="lastName", count="exact")
+    yield "Student.query searchBy=all", students(search=name_fragment, count="exact")
+    yield "Student.query programCode filter", students(program_codes=[rare_program.lower()], count="exact")
+    yield "Program.get", lambda: Program.get(programcode)
+    yield "Program.exists", lambda: Program.exists(programcode)
+    yield "Program.by_college", lambda: Program.by_college(collegecode)
+    yield "College.get", lambda: College.get(collegecode)
+    yield "College.exists", lambda: College.exists(collegecode)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-rows", type=int, default=100000,
+                        help="ignore sequential scans on tables smaller than this")
+    args = parser.parse_args()
+
+    app = create_app()
+    conn = psycopg2.connect(app.config["DATABASE_URL"], connection_factory=PlanConnection, cursor_factory=ExplainCursor)
+    failures = []
+
+    with app.app_context():
+        cursor = psycopg2.extensions.cursor(conn)
+        cursor.execute("ANALYZE student, program, college")
+        cursor.execute("SELECT relname, reltuples FROM pg_class WHERE relname IN ('student', 'program', 'college')")
+        sizes = dict(cursor.fetchall())
+        samples = sample_values(cursor)
+        cursor.close()
+        conn.commit()
+
+        big_tables = {name for name, rows in sizes.items() if rows >= args.min_rows}
+        print(f"Checking plans (tables with >= {args.min_rows} rows: {', '.join(sorted(big_tables)) or 'none'})")
+
+        g.db = conn
+        try:
+            for label, run in cases(*samples):
+                conn.plans = []
+                run()
+                conn.rollback()
+                for sql, plan in conn.plans:
+                    scanned = sorted(set(seq_scans(plan)) & big_tables)
+                    if scanned:
+                        failures.append((label, scanned, sql))
+                print(f"  {'FAIL' if any(f[0] == label for f in failures) else 'ok  '} {label}")
+        finally:
+            g.pop("db", None)
+            conn.close()
+
+    if failures:
+        print(f"\n{len(failures)} query plan(s) fall back to a sequential scan:")
+        for label, tables, sql in failures:
+            print(f"- {label}: Seq Scan on {', '.join(tables)}\n    {sql}")
+        sys.exit(1)
+    print("✅ No sequential scans on large tables.")
+
+
+if __name__ == "__main__":
+    main()
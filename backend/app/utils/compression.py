@@ -0,0 +1,125 @@
+"""Content-Encoding negotiation for API responses and static assets.
+
+gzip is always available; brotli is used when the optional ``brotli`` package
+is installed and the client prefers it.
+"""
+import gzip
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+def negotiate(encodings=None):
+    """Pick the encoding the client ranks highest among ``encodings``, or None."""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in encodings or available_encodings():
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level=None):
+    if encoding == "br":
+        quality = level if level is not None else current_app.config["COMPRESS_BROTLI_QUALITY"]
+        return brotli.compress(data, quality=quality)
+    level = level if level is not None else current_app.config["COMPRESS_GZIP_LEVEL"]
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk.
+
+    Every chunk is sync-flushed so the client can decode what it has received so
+    far; chunked responses keep streaming instead of waiting for the whole body.
+    """
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def compress(self, chunk):
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def stream_compress(chunks, encoding, level):
+    """Compress an iterable of chunks with a StreamCompressor."""
+    compressor = StreamCompressor(encoding, level)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _tag_etag(response, encoding):
+    # A compressed body is a different representation, so it needs its own tag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+
+
+def compress_response(response):
+    if request.method == "HEAD" or response.status_code != 200 or response.direct_passthrough:
+        return response
+    if "Content-Encoding" in response.headers or not is_compressible(response.mimetype):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    config = current_app.config
+    level = config["COMPRESS_BROTLI_QUALITY"] if encoding == "br" else config["COMPRESS_GZIP_LEVEL"]
+
+    if response.is_streamed:
+        response.response = stream_compress(response.response, encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        response.set_data(compress(data, encoding, level))
+
+    response.headers["Content-Encoding"] = encoding
+    _tag_etag(response, encoding)
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
@@ -0,0 +1,46 @@
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+from app.models.table_version import TableVersion
+from app.utils.compression import available_encodings
+
+
+def table_etag(tables):
+    return etag_for(tables, TableVersion.current(tables))
+
+
+def etag_for(tables, versions):
+    key = "|".join(f"{table}:{version}" for table, version in zip(tables, versions))
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def conditional(*tables):
+    """Tag GET responses with an ETag derived from the version counters of ``tables``.
+
+    The versions are read before the view runs, so a write that lands in between
+    can only make the tag older than the body, never newer. A request whose
+    If-None-Match matches gets a 304 without calling the view at all.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = table_etag(tables)
+            # Compressed bodies carry the tag with an encoding suffix
+            candidates = [etag] + [f"{etag}-{encoding}" for encoding in available_encodings()]
+            matched = next((tag for tag in candidates if request.if_none_match.contains(tag)), None)
+            if matched:
+                response = make_response("", 304)
+                response.set_etag(matched)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+            # Let clients keep the body but always come back to revalidate
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
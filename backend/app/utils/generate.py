@@ -0,0 +1,213 @@
+"""Deterministic synthetic data for load testing, loaded with COPY from parallel workers.
+
+    python -m app.utils.generate --seed 42 --students 5000000 --programs 2000 --colleges 200 --workers 8
+    python -m app.utils.generate --seed 43 --students 1000000 --append   # add to existing data
+    python -m app.utils.generate --seed 42 --students 100000 --reset     # TRUNCATE first
+
+Starting from the same data, the same seed, sizes and --chunk-size always
+produce the same rows, however many workers run. Each chunk of students has
+its own RNG derived from the seed and the chunk number, and each chunk commits
+on its own. Without --append or --reset, the target tables must be empty.
+
+Skew is deliberate. Program sizes follow a Zipf-like curve, each program has
+its own gender ratio, and upper year levels thin out. Student IDs keep the
+XXXX-XXXX format and are numbered sequentially after the highest existing ID.
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+from bisect import bisect
+from itertools import accumulate
+from multiprocessing import Pool
+
+import psycopg2
+from faker import Faker
+
+from app import create_app
+
+# Generated codes carry a prefix so --append can continue numbering them
+COLLEGE_PREFIX = "GC"
+PROGRAM_PREFIX = "GP"
+YEAR_LEVEL_WEIGHTS = (30, 25, 22, 20, 3)
+FIRST_ID = 2000 * 10000  # "2000-0000"
+MAX_ID = 10 ** 8 - 1     # "9999-9999"
+PROGRAM_ZIPF_EXPONENT = 1.1
+
+DISCIPLINES = (
+    "Computer Science", "Information Technology", "Accountancy", "Business Administration",
+    "Civil Engineering", "Electrical Engineering", "Mechanical Engineering", "Nursing",
+    "Biology", "Chemistry", "Mathematics", "Statistics", "Psychology", "Political Science",
+    "Education", "Architecture", "Tourism Management", "Criminology", "Agriculture",
+    "Marine Biology", "Pharmacy", "Medical Technology", "Economics", "Journalism",
+)
+DEGREES = ("Bachelor of Science in", "Bachelor of Arts in", "Associate in", "Diploma in")
+COLLEGE_KINDS = ("College of", "School of", "Institute of", "Faculty of")
+
+
+def format_id(number):
+    return f"{number // 10000:04d}-{number % 10000:04d}"
+
+
+def parse_id(student_id):
+    return int(student_id[:4]) * 10000 + int(student_id[5:])
+
+
+def name_pools(seed, size=3000):
+    fake = Faker()
+    fake.seed_instance(seed)
+    first = sorted({fake.first_name() for _ in range(size)})
+    last = sorted({fake.last_name() for _ in range(size)})
+    return first, last
+
+
+def next_code_index(cursor, table, column, prefix):
+    cursor.execute(
+        f"SELECT COALESCE(MAX(SUBSTRING({column} FROM %s)::int), 0) FROM {table} WHERE {column} ~ %s",
+        (len(prefix) + 1, f"^{prefix}[0-9]+$")
+    )
+    return cursor.fetchone()[0] + 1
+
+
+def copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def generate_reference(cursor, rng, colleges, programs):
+    """Insert ``colleges`` new colleges and ``programs`` new programs spread across all colleges."""
+    start = next_code_index(cursor, "college", "collegecode", COLLEGE_PREFIX)
+    college_rows = [
+        (f"{COLLEGE_PREFIX}{start + i:04d}", f"{rng.choice(COLLEGE_KINDS)} {rng.choice(DISCIPLINES)} {start + i}")
+        for i in range(colleges)
+    ]
+    copy_rows(cursor, "college", ("collegecode", "collegename"), college_rows)
+
+    cursor.execute("SELECT collegecode FROM college ORDER BY collegecode")
+    college_codes = [row[0] for row in cursor.fetchall()]
+    if programs and not college_codes:
+        sys.exit("Programs need at least one college; pass --colleges.")
+
+    start = next_code_index(cursor, "program", "programcode", PROGRAM_PREFIX)
+    program_rows = [
+        (f"{PROGRAM_PREFIX}{start + i:05d}", f"{rng.choice(DEGREES)} {rng.choice(DISCIPLINES)} {start + i}",
+         rng.choice(college_codes))
+        for i in range(programs)
+    ]
+    copy_rows(cursor, "program", ("programcode", "programname", "collegecode"), program_rows)
+
+
+def program_profiles(seed, program_codes):
+    """Zipf-like popularity and a per-program gender ratio, shuffled by seed."""
+    rng = random.Random(f"{seed}:programs")
+    codes = list(program_codes)
+    rng.shuffle(codes)
+    weights = [1 / (rank + 1) ** PROGRAM_ZIPF_EXPONENT for rank in range(len(codes))]
+    female_share = [min(0.95, max(0.05, rng.gauss(0.5, 0.18))) for _ in codes]
+    return codes, list(accumulate(weights)), female_share
+
+
+def student_rows(seed, chunk, first_id, size, profiles, pools):
+    codes, cum_weights, female_share = profiles
+    first_names, last_names = pools
+    rng = random.Random(f"{seed}:students:{chunk}")
+    total_weight = cum_weights[-1]
+    year_cum = list(accumulate(YEAR_LEVEL_WEIGHTS))
+
+    rows = []
+    for offset in range(size):
+        program = bisect(cum_weights, rng.random() * total_weight)
+        gender = "Female" if rng.random() < female_share[program] else "Male"
+        year_level = bisect(year_cum, rng.random() * year_cum[-1]) + 1
+        rows.append((
+            format_id(first_id + offset),
+            rng.choice(first_names),
+            rng.choice(last_names),
+            codes[program],
+            year_level,
+            gender,
+        ))
+    return rows
+
+
+def load_chunk(task):
+    """Worker: generate one chunk of students and COPY it in its own transaction."""
+    dsn, seed, chunk, first_id, size, profiles, pools = task
+    rows = student_rows(seed, chunk, first_id, size, profiles, pools)
+
+    conn = psycopg2.connect(dsn)
+    try:
+        cursor = conn.cursor()
+        copy_rows(cursor, "student", ("studentid", "firstname", "lastname", "programcode", "yearlevel", "gender"), rows)
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--programs", type=int, default=0, help="new programs to create")
+    parser.add_argument("--colleges", type=int, default=0, help="new colleges to create")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--append", action="store_true", help="keep existing rows and add to them")
+    mode.add_argument("--reset", action="store_true", help="TRUNCATE student, program and college first")
+    args = parser.parse_args()
+
+    dsn = create_app().config["DATABASE_URL"]
+    started = time.perf_counter()
+
+    conn = psycopg2.connect(dsn)
+    cursor = conn.cursor()
+    if args.reset:
+        cursor.execute("TRUNCATE student, program, college")
+    elif not args.append:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM student) OR EXISTS (SELECT 1 FROM program) OR EXISTS (SELECT 1 FROM college)")
+        if cursor.fetchone()[0]:
+            sys.exit("Tables already hold data; pass --append to add to it or --reset to wipe it.")
+
+    generate_reference(cursor, random.Random(f"{args.seed}:reference"), args.colleges, args.programs)
+    cursor.execute("SELECT programcode FROM program ORDER BY programcode")
+    program_codes = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT MAX(studentid) FROM student WHERE studentid ~ '^[0-9]{4}-[0-9]{4}$'")
+    highest = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"Reference data ready: {len(program_codes)} programs ({time.perf_counter() - started:.1f}s)")
+
+    if args.students and not program_codes:
+        sys.exit("Students need at least one program; pass --programs.")
+    first_id = max(FIRST_ID, parse_id(highest) + 1) if highest else FIRST_ID
+    if first_id + args.students - 1 > MAX_ID:
+        sys.exit(f"Not enough free student IDs after {format_id(first_id - 1)}.")
+
+    profiles = program_profiles(args.seed, program_codes)
+    pools = name_pools(args.seed)
+    tasks = []
+    for chunk, offset in enumerate(range(0, args.students, args.chunk_size)):
+        size = min(args.chunk_size, args.students - offset)
+        tasks.append((dsn, args.seed, chunk, first_id + offset, size, profiles, pools))
+
+    loaded = 0
+    with Pool(args.workers) as pool:
+        for size in pool.imap_unordered(load_chunk, tasks):
+            loaded += size
+            elapsed = time.perf_counter() - started
+            print(f"  {loaded:>10,} / {args.students:,} students ({loaded / elapsed:,.0f} rows/s)", end="\r")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Loaded {loaded:,} students ({format_id(first_id)} .. {format_id(first_id + loaded - 1)}) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Password hashing on a small dedicated thread pool.
+
+The KDFs behind werkzeug's hashes (scrypt, pbkdf2) run in OpenSSL with the GIL
+released, so a couple of threads can hash in parallel with request handling.
+Capping the workers and the queue stops a login burst from taking every CPU
+away from the rest of the API. When the queue is full, callers get
+HashingBusy and can answer 503 instead of piling up.
+
+The threads are started on first use in each process, so a pool created
+before a pre-forking server forks gives every worker its own.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+class HashingPool:
+    def __init__(self, workers=2, max_queue=64, timeout=10.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "wait_time": 0.0,
+            "run_time": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                # Threads do not survive a fork; each worker gets its own
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def run(self, fn, *args):
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HashingBusy("Password hashing queue is full")
+
+        submitted = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+
+        def task():
+            started = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._stats["wait_time"] += started - submitted
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._stats["completed"] += 1
+                    self._stats["run_time"] += time.monotonic() - started
+
+        # The slot is held until the task itself finishes, even if the caller gives up
+        future = executor.submit(task)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Nobody is waiting for the result any more; drop it if it has not started
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise HashingBusy(f"Password hashing did not finish within {self.timeout:.1f}s")
+
+    def stats(self):
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                **self._stats,
+                "avg_wait_ms": 1000 * self._stats["wait_time"] / completed if completed else 0.0,
+                "avg_run_ms": 1000 * self._stats["run_time"] / completed if completed else 0.0,
+            }
+
+
+def get_hash_pool():
+    return current_app.extensions["hash_pool"]
+
+
+def hash_password(password):
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    return get_hash_pool().run(generate_password_hash, password, method)
+
+
+def check_password(password_hash, password):
+    return get_hash_pool().run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with a different method or cost than configured."""
+    return password_hash.split("$", 1)[0] != current_app.extensions["hash_method"]
+
+
+def init_app(app):
+    app.extensions["hash_pool"] = HashingPool(
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_queue=app.config["PASSWORD_HASH_QUEUE_SIZE"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+    )
+    # Werkzeug expands short names ("scrypt") to the full method with its
+    # parameters; hash a throwaway value once to learn the stored prefix.
+    sample = generate_password_hash("", app.config["PASSWORD_HASH_METHOD"])
+    app.extensions["hash_method"] = sample.split("$", 1)[0]
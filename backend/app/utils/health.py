@@ -0,0 +1,107 @@
+"""Per-worker warm-up and the state behind /healthz and /readyz.
+
+A worker warms up once before taking traffic (gunicorn.conf.py's
+post_worker_init, or the ASGI lifespan): it opens DB_POOL_MIN_SIZE pooled
+connections and loads the reference data behind the dropdowns, so the first
+requests do not pay for either. Under a server without that hook (run.py),
+the first /readyz probe warms the worker instead.
+
+/healthz only says the process is serving requests and never touches the
+database, so a database outage does not get every worker restarted.
+/readyz is 200 once this process has warmed up and can check out a pooled
+connection and run a query on it; 503 while starting, draining or when the
+database is unreachable.
+"""
+import os
+import threading
+import time
+
+from flask import current_app
+
+from app import database
+from app.models.college import College
+from app.models.program import Program
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+
+class WorkerHealth:
+    def __init__(self, app):
+        self.app = app
+        self.started_at = time.time()
+        self.ready_pid = None
+        self.draining = False
+        self.warmup_ms = None
+        self._lock = threading.Lock()
+
+    @property
+    def warm(self):
+        # Warm-up state is per process: a forked worker starts cold
+        return self.ready_pid == os.getpid()
+
+    def warm_up(self):
+        """Open the pool and load reference data; returns whether this process is warm."""
+        if self.warm:
+            return True
+        # One warm-up at a time; concurrent probes just report "starting"
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if self.warm:
+                return True
+            started = time.perf_counter()
+            try:
+                database.get_pool(self.app).open()
+                with self.app.app_context():
+                    Program.all()
+                    College.all()
+            except Exception:
+                log.exception("worker.warmup_failed", pid=os.getpid())
+                return False
+            self.warmup_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.ready_pid = os.getpid()
+            self.draining = False
+            log.info("worker.ready", pid=os.getpid(), warmup_ms=self.warmup_ms)
+            return True
+        finally:
+            self._lock.release()
+
+    def drain(self):
+        """Report not ready from now on; called when the worker starts shutting down."""
+        self.draining = True
+
+    def liveness(self):
+        return {"status": "ok", "pid": os.getpid(), "uptime_seconds": round(time.time() - self.started_at, 1)}
+
+    def readiness(self):
+        """``(ready, body)`` for /readyz."""
+        if self.draining:
+            return False, {"status": "draining"}
+        if not self.warm_up():
+            return False, {"status": "starting"}
+
+        pool = database.get_pool(self.app)
+        try:
+            conn = pool.getconn(timeout=self.app.config["HEALTH_DB_TIMEOUT"])
+        except Exception:
+            log.warning("worker.not_ready", reason="no database connection")
+            return False, {"status": "unavailable"}
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            log.warning("worker.not_ready", reason="database query failed")
+            return False, {"status": "unavailable"}
+        finally:
+            pool.putconn(conn)
+        return True, {"status": "ready", "pid": os.getpid(), "warmup_ms": self.warmup_ms}
+
+
+def get_health(app=None):
+    return (app or current_app).extensions["health"]
+
+
+def init_app(app):
+    app.extensions["health"] = WorkerHealth(app)
@@ -0,0 +1,253 @@
+"""Structured logging that never blocks a request on log I/O.
+
+Records go onto a bounded in-memory queue and a background QueueListener
+thread formats and writes them. When the queue is full, records are dropped
+and counted rather than waited on. Every record carries the request ID (taken
+from X-Request-ID or generated, and echoed back), and each request ends with
+one access record holding its timings.
+
+Read-path events (``log.read``) and access records for successful GETs are
+sampled per request with LOG_READ_SAMPLE_RATE: a request is either sampled
+whole or not at all. Writes, errors and slow requests are always logged.
+
+    log = get_logger(__name__)
+    log.info("student.create", user_id=user_id, student_id=student_id)
+    log.exception("student.list_failed")
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+ROOT_LOGGER = "ssis"
+REQUEST_ID_HEADER = "X-Request-ID"
+# Accept a caller's request ID only if it is short and safe to put in logs and headers
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or erroring."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Keep the work done on the request thread small: render the message and
+        # any traceback, leave the JSON/text formatting to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.msg,
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"{self.formatTime(record)} {record.levelname:<7} {record.msg} {fields}".rstrip()
+        if record.exc_text:
+            line = f"{line}\n{record.exc_text}"
+        return line
+
+
+class StructuredLogger:
+    """Thin wrapper over a stdlib logger: an event name plus keyword fields."""
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def _log(self, level, event, fields, exc_info=False):
+        if not self._logger.isEnabledFor(level):
+            return
+        if has_request_context():
+            fields = {"request_id": g.get("request_id"), **fields}
+        self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+    def read(self, event, **fields):
+        """A noisy read-path event, logged only for sampled requests."""
+        if has_request_context() and not g.get("log_sampled", True):
+            return
+        self._log(logging.INFO, event, fields)
+
+
+def get_logger(name):
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+log = get_logger("request")
+
+
+class LogPipeline:
+    """The queue, its handler and the listener thread, restarted after a fork."""
+
+    def __init__(self, formatter, max_queue):
+        self.queue = queue.Queue(max_queue)
+        self.handler = DroppingQueueHandler(self.queue)
+        self.formatter = formatter
+        self.listener = None
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.pid == os.getpid():
+                return
+            if self.pid is not None:
+                # A forked worker inherits the queue but not the listener thread. The
+                # queue's condition still lists the parent listener as its waiter, so
+                # notify() would wake nobody here: start over with a fresh queue.
+                self.queue = queue.Queue(self.queue.maxsize)
+                self.handler.queue = self.queue
+            stream = logging.StreamHandler(sys.stdout)
+            stream.setFormatter(self.formatter)
+            self.listener = logging.handlers.QueueListener(self.queue, stream, respect_handler_level=False)
+            self.listener.start()
+            self.pid = os.getpid()
+
+    def set_formatter(self, formatter):
+        self.formatter = formatter
+        if self.listener is not None:
+            for handler in self.listener.handlers:
+                handler.setFormatter(formatter)
+
+    def ensure_running(self):
+        if self.pid != os.getpid():
+            self.start()
+
+    def stop(self):
+        with self._lock:
+            if self.listener is not None and self.pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self.pid = None
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "dropped": self.handler.dropped,
+        }
+
+
+_settings = {"read_sample_rate": 1.0, "access_log": True, "slow_request_ms": 500.0}
+# One pipeline per process, shared by every app instance (the "ssis" logger is global)
+_pipeline = None
+
+
+def start_request():
+    _pipeline.ensure_running()
+    g.log_started = time.perf_counter()
+    supplied = request.headers.get(REQUEST_ID_HEADER, "")
+    g.request_id = supplied if REQUEST_ID_PATTERN.match(supplied) else uuid.uuid4().hex
+    g.log_sampled = random.random() < _settings["read_sample_rate"]
+
+
+def finish_request(response):
+    started = g.get("log_started")
+    if started is None:
+        return response
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    if not _settings["access_log"]:
+        return response
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    slow = elapsed_ms >= _settings["slow_request_ms"]
+    routine = request.method in ("GET", "HEAD") and response.status_code < 400
+    if routine and not slow and not g.log_sampled:
+        return response
+
+    fields = {
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "duration_ms": round(elapsed_ms, 2),
+    }
+    conn = g.get("db")
+    # Only instrumented connections (METRICS_ENABLED) count their queries
+    if getattr(conn, "query_count", None) is not None:
+        fields["db_queries"] = conn.query_count
+        fields["db_ms"] = round(conn.query_time * 1000, 2)
+    if response.status_code >= 500:
+        log.error("request", **fields)
+    elif slow:
+        log.warning("request.slow", **fields)
+    else:
+        log.info("request", **fields)
+    return response
+
+
+def get_pipeline():
+    return _pipeline
+
+
+def init_app(app):
+    global _pipeline
+    _settings.update(
+        read_sample_rate=app.config["LOG_READ_SAMPLE_RATE"],
+        access_log=app.config["LOG_ACCESS"],
+        slow_request_ms=app.config["LOG_SLOW_REQUEST_MS"],
+    )
+    formatter = JSONFormatter() if app.config["LOG_FORMAT"] == "json" else TextFormatter()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(app.config["LOG_LEVEL"])
+    root.propagate = False
+    if _pipeline is None:
+        _pipeline = LogPipeline(formatter, app.config["LOG_QUEUE_SIZE"])
+        root.addHandler(_pipeline.handler)
+        atexit.register(_pipeline.stop)
+    else:
+        _pipeline.set_formatter(formatter)
+    _pipeline.start()
+    app.extensions["log_pipeline"] = _pipeline
+
+    app.before_request(start_request)
+    app.after_request(finish_request)
@@ -0,0 +1,281 @@
+"""Request, SQL, pool and cache metrics in the Prometheus text format.
+
+Enabled with METRICS_ENABLED. When it is off, nothing here is hooked into the
+app: no before/after_request handlers, plain psycopg2 cursors and no /metrics
+route, so the only cost is this module being imported.
+
+Each worker process keeps its own numbers; with several gunicorn workers,
+scrape every worker or put them behind a per-process port.
+"""
+import threading
+import time
+
+from flask import Response, current_app, g, request
+
+from app import database
+from app.utils.auth import has_bearer_token
+from app.utils.cache import reference_cache, user_cache
+
+# Seconds; tuned for API calls that mostly take a few milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labels, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._values.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labels, labels, ("le", _format_value(float(bound)))), cumulative
+            yield f"{self.name}_bucket", _format_labels(self.labels, labels, ("le", "+Inf")), series[-1]
+            yield f"{self.name}_sum", _format_labels(self.labels, labels), series[-2]
+            yield f"{self.name}_count", _format_labels(self.labels, labels), series[-1]
+
+
+class Gauge:
+    """A value read when scraped: ``collect`` returns ``{labels: value}``."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), collect=None, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+        self.kind = kind
+
+    def samples(self):
+        for labels, value in self.collect().items():
+            yield self.name, _format_labels(self.labels, labels), value
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# In-process caches reported on /metrics, by name
+caches = {"reference": reference_cache, "user": user_cache}
+
+
+def register_cache(name, cache):
+    caches[name] = cache
+
+
+def _cache_values(field):
+    def collect():
+        return {(name,): cache.stats()[field] for name, cache in caches.items()}
+    return collect
+
+
+def _pool_values(fields):
+    def collect():
+        stats = database.get_pool(current_app).stats()
+        return {(field,): stats[field] for field in fields}
+    return collect
+
+
+def create_registry(app):
+    registry = Registry()
+    metrics = {
+        "requests": registry.register(Histogram(
+            "http_request_duration_seconds", "Time spent handling a request, by route.",
+            ("method", "endpoint", "status"),
+        )),
+        "sql_queries": registry.register(Histogram(
+            "db_queries_per_request", "SQL statements executed per request, by route.",
+            ("endpoint",), QUERY_COUNT_BUCKETS,
+        )),
+        "sql_time": registry.register(Histogram(
+            "db_query_duration_seconds_per_request", "Total time spent in SQL per request, by route.",
+            ("endpoint",),
+        )),
+        "sql_rows": registry.register(Counter(
+            "db_rows_total", "Rows returned (or affected) by SQL statements, by route.", ("endpoint",),
+        )),
+    }
+    registry.register(Gauge(
+        "db_pool_connections", "Connection pool state.", ("state",),
+        _pool_values(("size", "idle", "in_use", "waiting", "max_size")),
+    ))
+    registry.register(Gauge(
+        "db_pool_events_total", "Connection pool checkouts, timeouts and reconnects.", ("event",),
+        _pool_values(("checkouts", "timeouts", "connects", "reconnects", "discarded")), kind="counter",
+    ))
+    registry.register(Gauge(
+        "db_pool_wait_seconds_total", "Time requests spent waiting for a pooled connection.", (),
+        lambda: {(): database.get_pool(current_app).stats()["wait_time"]}, kind="counter",
+    ))
+    for field, kind, help in (
+        ("hits", "counter", "Cache hits."),
+        ("misses", "counter", "Cache misses."),
+        ("evictions", "counter", "Entries evicted to stay under max size."),
+        ("size", "gauge", "Entries currently cached."),
+        ("hit_rate", "gauge", "Hits divided by lookups since start."),
+    ):
+        name = f"cache_{field}_total" if kind == "counter" else f"cache_{field}"
+        registry.register(Gauge(name, help, ("cache",), _cache_values(field), kind=kind))
+    return registry, metrics
+
+
+def _endpoint():
+    # The route template keeps label cardinality bounded (no IDs or query strings)
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def record_request(response):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return response
+    endpoint = _endpoint()
+    if endpoint == "/metrics":
+        return response
+    if response.is_streamed:
+        # The body (and its queries) has not run yet; record once it has been
+        # sent, in record_streamed(). Its headers are gone by then, so a
+        # streamed response carries no Server-Timing.
+        streamed = g.metrics_streamed = {"args": (started, endpoint, str(response.status_code)), "sending": False}
+        response.response = _sending(response.response, streamed)
+        return response
+    elapsed, conn = _observe(started, endpoint, str(response.status_code))
+    if conn is not None:
+        response.headers["Server-Timing"] = (
+            f"db;dur={conn.query_time * 1000:.1f};desc=\"{conn.query_count} queries\", "
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+    return response
+
+
+def _sending(body, streamed):
+    streamed["sending"] = True
+    yield from body
+
+
+def record_streamed(exc=None):
+    # The request context of a stream_with_context body is popped once the body
+    # is done, before the connection goes back to the pool. Flask also tears
+    # down as the view returns, before the body has started; skip that one.
+    streamed = g.get("metrics_streamed")
+    if streamed is not None and streamed["sending"]:
+        del g.metrics_streamed
+        _observe(*streamed["args"])
+
+
+def _observe(started, endpoint, status):
+    elapsed = time.perf_counter() - started
+    metrics = current_app.extensions["metrics"]
+    metrics["requests"].observe(elapsed, (request.method, endpoint, status))
+
+    conn = g.get("db")
+    if conn is not None:
+        metrics["sql_queries"].observe(conn.query_count, (endpoint,))
+        metrics["sql_time"].observe(conn.query_time, (endpoint,))
+        if conn.row_count:
+            metrics["sql_rows"].inc((endpoint,), conn.row_count)
+    return elapsed, conn
+
+
+def metrics_view():
+    token = current_app.config["METRICS_TOKEN"]
+    if token and not has_bearer_token(token):
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    registry = current_app.extensions["metrics_registry"]
+    return Response(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def init_app(app):
+    if not app.config["METRICS_ENABLED"]:
+        return
+    registry, metrics = create_registry(app)
+    app.extensions["metrics_registry"] = registry
+    app.extensions["metrics"] = metrics
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    app.teardown_request(record_streamed)
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
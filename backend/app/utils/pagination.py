@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+
+from flask import current_app
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, key, direction):
+    payload = json.dumps({"v": value, "k": key, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, value_type=str):
+    """Decode an opaque cursor token; an empty token means the first page.
+
+    The sort value must be a ``value_type`` (the sort column's type) and the
+    key a string: anything else reaching the seek predicate would fail in the
+    database instead of being rejected as a bad request.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(data, dict) or data.get("d") not in ("next", "prev") or "v" not in data or "k" not in data:
+        raise InvalidCursor("Malformed cursor")
+    value = data["v"]
+    if not isinstance(value, value_type) or isinstance(value, bool) or not isinstance(data["k"], str):
+        raise InvalidCursor("Malformed cursor")
+    return data
+
+
+def keyset(sort_expr, key_column, sort_order, cursor):
+    """Build the seek predicate and ORDER BY for a keyset page.
+
+    Rows are ordered by ``(sort_expr, key_column)`` so the unique key breaks ties.
+    Walking backwards ("prev") flips both the comparison and the scan direction;
+    the caller reverses the fetched rows afterwards.
+
+    Returns ``(predicate, params, order_sql, backwards)``.
+    """
+    descending = sort_order.lower() == "desc"
+    backwards = cursor is not None and cursor["d"] == "prev"
+    scan_desc = descending != backwards
+    direction = "DESC" if scan_desc else "ASC"
+    order_sql = f"ORDER BY {sort_expr} {direction}, {key_column} {direction}"
+
+    if cursor is None:
+        return None, [], order_sql, False
+
+    op = "<" if scan_desc else ">"
+    predicate = f"({sort_expr}, {key_column}) {op} (%s, %s)"
+    return predicate, [cursor["v"], cursor["k"]], order_sql, backwards
+
+
+def page_cursors(rows, page_size, cursor, backwards, sort_index, key_index=0):
+    """Trim the ``page_size + 1`` rows fetched by a keyset query and build its cursors.
+
+    Returns ``(rows, next_cursor, prev_cursor)``.
+    """
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    def token(row, direction):
+        value = row[sort_index]
+        return encode_cursor(value if value is not None else "", row[key_index], direction)
+
+    has_next = has_more if not backwards else True
+    has_prev = (cursor is not None) if not backwards else has_more
+
+    next_cursor = token(rows[-1], "next") if has_next else None
+    prev_cursor = token(rows[0], "prev") if has_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+def estimate_rows(cursor, from_sql, params):
+    """Return the planner's row estimate for ``SELECT 1 {from_sql}`` without running it."""
+    cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(cursor, select_sql, from_sql, order_sql, params, page, page_size, count="exact", order_params=()):
+    """Fetch one LIMIT/OFFSET page together with the total number of matches.
+
+    The exact total rides along on the page rows as a ``COUNT(*) OVER ()`` column,
+    so the filter is evaluated once. With ``count="estimate"`` the planner's estimate
+    is used instead whenever it reaches ``COUNT_ESTIMATE_THRESHOLD``.
+
+    ``order_params`` fill placeholders in ``order_sql`` (e.g. a relevance score).
+
+    Returns ``(rows, total, exact)``.
+    """
+    offset = (page - 1) * page_size
+    page_params = params + list(order_params) + [page_size, offset]
+
+    if count == "estimate":
+        estimate = estimate_rows(cursor, from_sql, params)
+        if estimate >= current_app.config["COUNT_ESTIMATE_THRESHOLD"]:
+            cursor.execute(f"{select_sql} {from_sql} {order_sql} LIMIT %s OFFSET %s", page_params)
+            return cursor.fetchall(), estimate, False
+
+    cursor.execute(
+        f"{select_sql}, COUNT(*) OVER () {from_sql} {order_sql} LIMIT %s OFFSET %s",
+        page_params
+    )
+    rows = cursor.fetchall()
+    if rows:
+        return [row[:-1] for row in rows], rows[0][-1], True
+
+    # Past the last page the window has no rows to ride on
+    if offset:
+        cursor.execute(f"SELECT COUNT(*) {from_sql}", params)
+        return [], cursor.fetchone()[0], True
+    return [], 0, True
@@ -0,0 +1,78 @@
+"""Rebuild the student_stats counters from the student table and report drift.
+
+    python -m app.utils.repair_stats            # report drift and rebuild
+    python -m app.utils.repair_stats --check    # report only; exit 1 on drift
+
+The counters are maintained by triggers (see the student_stats_counters
+migration), so drift should only appear after manual edits with the triggers
+disabled or a restore of one table without the other.
+"""
+import argparse
+import sys
+
+import psycopg2
+
+from app import create_app
+
+ACTUAL = """
+    SELECT COALESCE(programcode, '') AS programcode, COALESCE(gender, '') AS gender,
+           COALESCE(yearlevel, 0) AS yearlevel, COUNT(*) AS student_count
+    FROM student
+    GROUP BY 1, 2, 3
+"""
+
+
+def repair(conn, check_only):
+    cur = conn.cursor()
+    # SHARE mode lets reads through but holds off writers until we commit
+    cur.execute("LOCK TABLE student IN SHARE MODE")
+    cur.execute(f"""
+        WITH actual AS ({ACTUAL})
+        SELECT COALESCE(a.programcode, s.programcode), COALESCE(a.gender, s.gender),
+               COALESCE(a.yearlevel, s.yearlevel),
+               COALESCE(s.student_count, 0), COALESCE(a.student_count, 0)
+        FROM actual a
+        FULL OUTER JOIN student_stats s
+          ON (s.programcode, s.gender, s.yearlevel) = (a.programcode, a.gender, a.yearlevel)
+        WHERE COALESCE(s.student_count, 0) <> COALESCE(a.student_count, 0)
+        ORDER BY 1, 2, 3
+    """)
+    drift = cur.fetchall()
+
+    for programcode, gender, yearlevel, stored, actual in drift:
+        print(f"  program={programcode or '-'} gender={gender or '-'} year={yearlevel or '-'}: "
+              f"stored {stored}, actual {actual} ({actual - stored:+d})")
+
+    if not check_only:
+        cur.execute("DELETE FROM student_stats")
+        cur.execute(f"INSERT INTO student_stats (programcode, gender, yearlevel, student_count) {ACTUAL}")
+        conn.commit()
+    else:
+        conn.rollback()
+    cur.close()
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only report drift, do not rebuild")
+    args = parser.parse_args()
+
+    app = create_app()
+    conn = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        drift = repair(conn, args.check)
+    finally:
+        conn.close()
+
+    if not drift:
+        print("✅ student_stats matches the student table.")
+    elif args.check:
+        print(f"❌ {len(drift)} group(s) drifted.")
+        sys.exit(1)
+    else:
+        print(f"✅ Rebuilt student_stats; {len(drift)} group(s) had drifted.")
+
+
+if __name__ == "__main__":
+    main()
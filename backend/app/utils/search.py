@@ -0,0 +1,60 @@
+def search_clause(columns, search, search_by, matches=None):
+    """Build the substring-match predicate for a ``searchBy`` value.
+
+    ``columns`` maps each searchable field to its lowered SQL expression; ``all``
+    ORs every column. Each expression has a pg_trgm GIN index (see the
+    trigram_search_indexes migration), so the LIKE '%term%' arms are served by
+    bitmap index scans instead of a sequential scan. A trigram index needs a
+    term of three or more characters: one- and two-character terms still scan.
+
+    ``matches`` covers fields with only a handful of short values (gender, year
+    level), which a trigram index cannot narrow down. It maps each to
+    ``(expression, values)``, where ``values`` are the field's values that
+    contain the term, looked up beforehand (see Student.search_matches). The
+    field is then matched with ``expression = ANY(values)`` on a B-tree index,
+    or left out when no value contains the term: the same rows as a LIKE on
+    the field, with values the planner can estimate.
+
+    Returns ``(predicate, params)``; the predicate is None when nothing applies.
+    """
+    fields = _search_fields(columns, search, search_by)
+    if not fields:
+        return None, []
+    matches = matches or {}
+    arms = []
+    params = []
+    for field in fields:
+        if field in matches:
+            expr, values = matches[field]
+            if values:
+                arms.append(f"{expr} = ANY(%s)")
+                params.append(list(values))
+        else:
+            arms.append(f"{columns[field]} LIKE %s")
+            params.append(f"%{search}%")
+    if not arms:
+        return "FALSE", []
+    return "(" + " OR ".join(arms) + ")", params
+
+
+def relevance(columns, search, search_by):
+    """Build a trigram relevance score for ordering search results, best match first.
+
+    Returns ``(expression, params)``, or ``(None, [])`` when there is no search.
+    """
+    exprs = [columns[field] for field in _search_fields(columns, search, search_by)]
+    if not exprs:
+        return None, []
+    scores = [f"word_similarity(%s, {expr})" for expr in exprs]
+    expression = scores[0] if len(scores) == 1 else f"GREATEST({', '.join(scores)})"
+    return expression, [search] * len(scores)
+
+
+def _search_fields(columns, search, search_by):
+    if not search:
+        return []
+    if search_by == "all":
+        return list(columns)
+    if search_by in columns:
+        return [search_by]
+    return []
@@ -0,0 +1,230 @@
+"""Slow-query log: statements over SLOW_QUERY_MS, grouped by shape, with captured plans.
+
+Every statement run on an instrumented pooled connection is timed (see
+app.database.InstrumentedCursor); a server-side cursor's time includes the
+FETCHes that stream its rows. Those at or over the threshold are logged
+with their normalized SQL, redacted parameters and duration. They are also
+aggregated per shape (the SQL with literals and VALUES lists collapsed) for
+GET /api/admin/slow-queries.
+
+For read-only statements, ``EXPLAIN (ANALYZE, BUFFERS)`` is re-run on a
+separate connection by a single background thread, at most once per shape
+every SLOW_QUERY_EXPLAIN_INTERVAL seconds. The request that triggered it never
+waits for the plan. ANALYZE executes the query again, so the EXPLAIN runs
+inside a transaction that is rolled back, under SLOW_QUERY_EXPLAIN_TIMEOUT.
+The plan shows the parameters substituted into its conditions, so its string
+literals are masked (``redact_plan``) before it is logged or stored.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.sql
+from flask import current_app, has_request_context, request
+
+from app import database
+from app.utils.log import get_logger
+
+log = get_logger(__name__)
+
+# Plans waiting for the explain thread; slow queries beyond this go unexplained
+MAX_PENDING_EXPLAINS = 4
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_VALUES = re.compile(r"\bVALUES\s*\([^()]*\)(\s*,\s*\([^()]*\))*", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+# Plan lines holding the statement's conditions ("Index Cond: (studentid = '...'::text)"),
+# but not counters such as "Rows Removed by Filter"
+_CONDITION = re.compile(r"^\s*(?:[\w ]+ Cond|(?:Join |One-Time )?Filter)$")
+_EXECUTE = re.compile(r"^EXECUTE (\w+)")
+# EXPLAIN ANALYZE runs the statement, so only plain reads are replayed
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+UPDATE|FOR\s+SHARE|FOR\s+NO\s+KEY|FOR\s+KEY)\b", re.IGNORECASE)
+
+
+def query_text(cursor, query):
+    if isinstance(query, psycopg2.sql.Composable):
+        return query.as_string(cursor)
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    # Report (and explain) a prepared statement by its SQL rather than its name
+    match = _EXECUTE.match(query)
+    statement = match and database.prepared_statements.get(match.group(1))
+    return statement.sql if statement else query
+
+
+def normalize(sql):
+    """The statement's shape: literals become ?, a VALUES list becomes VALUES (...)."""
+    sql = _STRING.sub("?", sql)
+    sql = _VALUES.sub("VALUES (...)", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def redact(params):
+    """Keep the shape of the parameters, not their values (names, emails, IDs)."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_redact_value(value) for value in params]
+    return _redact_value(params)
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_plan(plan):
+    """Mask the values EXPLAIN prints in its conditions; costs, rows and timings stay."""
+    lines = []
+    for line in _STRING.sub("'?'", plan).split("\n"):
+        label, colon, condition = line.partition(":")
+        if colon and _CONDITION.match(label):
+            line = label + colon + _NUMBER.sub("?", condition)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def is_explainable(sql):
+    return bool(_READ_ONLY.match(sql)) and not _WRITES.search(sql)
+
+
+class SlowQueryLog:
+    def __init__(self, dsn, threshold_ms, explain=True, explain_interval=300.0,
+                 explain_timeout_ms=10000, max_shapes=500):
+        self.dsn = dsn
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_shapes = max_shapes
+        self._shapes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._explains_pending = 0
+
+    def observe(self, cursor, query, params, elapsed):
+        sql = query_text(cursor, query)
+        shape = normalize(sql)
+        endpoint = request.url_rule.rule if has_request_context() and request.url_rule else None
+        redacted = redact(params)
+        now = time.time()
+
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    # Make room by forgetting the shape with the smallest worst case
+                    del self._shapes[min(self._shapes, key=lambda s: self._shapes[s]["max_ms"])]
+                entry = self._shapes[shape] = {
+                    "sql": shape,
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "endpoints": [],
+                    "plan": None,
+                    "plan_captured_at": None,
+                    "explain_requested_at": None,
+                }
+            elapsed_ms = elapsed * 1000
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["last_ms"] = elapsed_ms
+            entry["last_params"] = redacted
+            entry["last_seen"] = now
+            if elapsed_ms >= entry["max_ms"]:
+                entry["max_ms"] = elapsed_ms
+                entry["max_params"] = redacted
+            if endpoint and endpoint not in entry["endpoints"] and len(entry["endpoints"]) < 10:
+                entry["endpoints"].append(endpoint)
+            last_explain = entry["explain_requested_at"]
+            explain = (
+                self.explain
+                and is_explainable(sql)
+                and (last_explain is None or now - last_explain >= self.explain_interval)
+                and self._explains_pending < MAX_PENDING_EXPLAINS
+            )
+            if explain:
+                entry["explain_requested_at"] = now
+                self._explains_pending += 1
+
+        log.warning("db.slow_query", sql=shape, duration_ms=round(elapsed * 1000, 2),
+                    params=redacted, endpoint=endpoint)
+        if explain:
+            self._submit(shape, sql, params)
+
+    def _submit(self, shape, sql, params):
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                # Threads do not survive a fork; each worker gets its own explainer
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+                self._executor_pid = os.getpid()
+        self._executor.submit(self._capture_plan, shape, sql, params)
+
+    def _capture_plan(self, shape, sql, params):
+        try:
+            conn = psycopg2.connect(self.dsn)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SET LOCAL statement_timeout = %s", (self.explain_timeout_ms,))
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+                plan = redact_plan("\n".join(row[0] for row in cursor.fetchall()))
+                conn.rollback()
+            finally:
+                conn.close()
+        except Exception as e:
+            plan = None
+            log.warning("db.slow_query_explain_failed", sql=shape, error=str(e))
+        with self._lock:
+            self._explains_pending -= 1
+            entry = self._shapes.get(shape)
+            if entry is not None and plan is not None:
+                entry["plan"] = plan
+                entry["plan_captured_at"] = time.time()
+        if plan is not None:
+            log.info("db.slow_query_plan", sql=shape, plan=plan)
+
+    def top(self, limit=20, order="max_ms"):
+        with self._lock:
+            entries = [dict(entry, endpoints=list(entry["endpoints"])) for entry in self._shapes.values()]
+        for entry in entries:
+            entry["mean_ms"] = entry["total_ms"] / entry["calls"]
+            del entry["explain_requested_at"]
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        return entries[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+def get_slow_log():
+    return current_app.extensions.get("slow_query_log")
+
+
+def init_app(app):
+    threshold = app.config["SLOW_QUERY_MS"]
+    if threshold <= 0:
+        return
+    slow_log = SlowQueryLog(
+        app.config["DATABASE_URL"],
+        threshold,
+        explain=app.config["SLOW_QUERY_EXPLAIN"],
+        explain_interval=app.config["SLOW_QUERY_EXPLAIN_INTERVAL"],
+        explain_timeout_ms=app.config["SLOW_QUERY_EXPLAIN_TIMEOUT_MS"],
+    )
+    app.extensions["slow_query_log"] = slow_log
+    database.get_pool(app).slow_log = slow_log
@@ -0,0 +1,105 @@
+import codecs
+import json
+import uuid
+
+from flask import current_app, request
+
+from app.database import hold_db
+
+
+def iter_lines(stream, chunk_size=64 * 1024):
+    """Yield decoded text lines (newline included) from a binary request stream.
+
+    Reads fixed-size chunks rather than relying on the stream's readline, so
+    memory stays bounded by the longest line no matter how large the body is.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        final = not chunk
+        pending += decoder.decode(chunk or b"", final=final)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+        if final:
+            break
+    if pending:
+        yield pending
+
+
+def iter_chunks(db, sql, params, chunk_size, name="stream"):
+    """Yield lists of up to ``chunk_size`` rows from a server-side (named) cursor.
+
+    Only one chunk is held in memory at a time, so callers can stream result
+    sets of any size.
+    """
+    cursor = db.cursor(name=f"{name}_{uuid.uuid4().hex[:12]}")
+    cursor.itersize = chunk_size
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def primed(chunks):
+    """Run ``chunks``' query now and return an iterator over all of its chunks.
+
+    A generator does not touch the database until the body is sent, when the
+    200 is already out: calling this inside the view's try gets a failing
+    query answered with the view's error response instead of a truncated
+    body. The request's connection stays checked out until the returned
+    iterator is exhausted or closed (see app.database.hold_db).
+    """
+    release = hold_db()
+
+    def stream():
+        try:
+            first = next(chunks, None)
+            # Parked here until the body is sent
+            yield None
+            if first is not None:
+                yield first
+                yield from chunks
+        finally:
+            chunks.close()
+            release()
+
+    rest = stream()
+    next(rest)
+    return rest
+
+
+def json_array_stream(key, chunks, serialize, max_rows):
+    """Stream ``{"<key>": [...], "truncated": bool}`` without materialising the array.
+
+    ``chunks`` yields lists of rows (see iter_chunks); at most ``max_rows`` rows
+    are emitted, and ``truncated`` reports whether the guard cut the result short.
+    """
+    yield f'{{"{key}": ['
+    sent = 0
+    truncated = False
+    for rows in chunks:
+        if sent + len(rows) > max_rows:
+            rows = rows[:max_rows - sent]
+            truncated = True
+        if rows:
+            prefix = "," if sent else ""
+            yield prefix + ",".join(json.dumps(serialize(row)) for row in rows)
+            sent += len(rows)
+        if truncated:
+            break
+    yield f'], "truncated": {"true" if truncated else "false"}}}'
+
+
+def stream_limit():
+    """Row cap for a streamed list: ?limit= when given, never above MAX_STREAM_ROWS."""
+    max_rows = current_app.config["MAX_STREAM_ROWS"]
+    limit = request.args.get("limit", type=int)
+    return min(limit, max_rows) if limit and limit > 0 else max_rows
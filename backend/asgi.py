@@ -0,0 +1,8 @@
+"""ASGI entry point: uvicorn asgi:app --workers 4
+
+The read-heavy GET endpoints are served with asyncpg (see app/aio); every
+other request goes to the same Flask app as run.py.
+"""
+from app.aio import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,116 @@
+"""Login storm: login latency and concurrent CRUD latency while many users log in.
+
+Run against a live server with an existing account:
+
+    python -m benchmarks.login_storm --email admin@example.com --password secret \
+        --logins 400 --login-concurrency 32 --crud-concurrency 4
+
+A first phase measures the CRUD endpoint alone; a second phase repeats it
+while the login storm runs. Compare the two CRUD p99s (and the login p99)
+before and after changing PASSWORD_HASH_WORKERS / PASSWORD_HASH_METHOD.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks.stats import format_line, summarize
+
+
+def summary(label, samples, statuses):
+    print(format_line(label, summarize(samples, statuses=statuses)))
+
+
+class Client:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.cookie = None
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        headers = {"Content-Type": "application/json"}
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        started = time.perf_counter()
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - started
+        set_cookie = response.getheader("Set-Cookie")
+        conn.close()
+        return response.status, elapsed, set_cookie
+
+
+def login(client, email, password):
+    return client.request("POST", "/api/auth/login", {"email": email, "password": password})
+
+
+def crud_loop(client, path, stop, samples, statuses, lock):
+    while not stop.is_set():
+        status, elapsed, _ = client.request("GET", path)
+        with lock:
+            samples.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+
+def run_crud(client, path, concurrency, until):
+    samples, statuses, lock, stop = [], {}, threading.Lock(), threading.Event()
+    threads = [threading.Thread(target=crud_loop, args=(client, path, stop, samples, statuses, lock))
+               for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    until()
+    stop.set()
+    for t in threads:
+        t.join()
+    return samples, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--crud-concurrency", type=int, default=4)
+    parser.add_argument("--crud-path", default="/api/colleges?page=1&per_page=15")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    crud_client = Client(args.base_url)
+    status, _, set_cookie = login(crud_client, args.email, args.password)
+    if status != 200 or not set_cookie:
+        raise SystemExit(f"Login failed with status {status}")
+    crud_client.cookie = set_cookie.split(";", 1)[0]
+
+    samples, statuses = run_crud(crud_client, args.crud_path, args.crud_concurrency,
+                                 lambda: time.sleep(args.baseline_seconds))
+    summary("CRUD (idle)", samples, statuses)
+
+    login_samples, login_statuses = [], {}
+
+    def storm():
+        def one(_):
+            status, elapsed, _ = login(Client(args.base_url), args.email, args.password)
+            return status, elapsed
+        with ThreadPoolExecutor(max_workers=args.login_concurrency) as pool:
+            for status, elapsed in pool.map(one, range(args.logins)):
+                login_samples.append(elapsed)
+                login_statuses[status] = login_statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    samples, statuses = run_crud(crud_client, args.crud_path, args.crud_concurrency, storm)
+    duration = time.perf_counter() - started
+
+    summary("CRUD (during login storm)", samples, statuses)
+    summary("Login", login_samples, login_statuses)
+    print(f"{args.logins} logins in {duration:.1f}s ({args.logins / duration:.1f}/s)")
+
+
+if __name__ == "__main__":
+    main()
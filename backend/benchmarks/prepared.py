@@ -0,0 +1,98 @@
+"""Point lookups with and without server-side prepared statements.
+
+Against the database in DATABASE_URL (with data, e.g. from app.utils.generate):
+
+    python -m benchmarks.prepared --iterations 5000
+
+Each registered point query runs on two dedicated connections: one sends the
+SQL text every time (parse + plan on each call), the other PREPAREs it once
+and sends EXECUTE. Calls alternate between the two in rounds so drift in the
+server or the network hits both equally. The network round trip is the same
+for both, so the gap is the parse/plan work saved per call.
+"""
+import argparse
+import random
+import time
+
+import psycopg2
+
+from benchmarks.stats import format_line, summarize
+
+from app import create_app
+from app.database import PooledConnection, execute_prepared
+from app.models.college import GET_COLLEGE
+from app.models.program import GET_PROGRAM
+from app.models.student import GET_STUDENT, STUDENT_EXISTS
+from app.models.user import GET_USER_BY_ID
+
+
+def sample_keys(cursor, sql, limit):
+    cursor.execute(sql, (limit,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def connect(dsn, prepared):
+    conn = psycopg2.connect(dsn, connection_factory=PooledConnection)
+    conn.use_prepared = prepared
+    # Read-only lookups; autocommit keeps each one a single round trip
+    conn.autocommit = True
+    return conn
+
+
+def time_call(cursor, statement, key):
+    started = time.perf_counter()
+    execute_prepared(cursor, statement, (key,))
+    cursor.fetchall()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per query and mode")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dsn = create_app().config["DATABASE_URL"]
+    plain, prepared = connect(dsn, False), connect(dsn, True)
+    cursor = plain.cursor()
+    cases = [
+        ("student get", GET_STUDENT, sample_keys(cursor, "SELECT studentid FROM student LIMIT %s", 1000)),
+        ("student exists", STUDENT_EXISTS, sample_keys(cursor, "SELECT studentid FROM student LIMIT %s", 1000)),
+        ("program get", GET_PROGRAM, sample_keys(cursor, "SELECT programcode FROM program LIMIT %s", 1000)),
+        ("college get", GET_COLLEGE, sample_keys(cursor, "SELECT collegecode FROM college LIMIT %s", 1000)),
+        ("user get by id", GET_USER_BY_ID, sample_keys(cursor, "SELECT userid FROM users LIMIT %s", 1000)),
+    ]
+    cursor.close()
+
+    rng = random.Random(args.seed)
+    modes = (("text", plain.cursor()), ("prepared", prepared.cursor()))
+    for label, statement, keys in cases:
+        if not keys:
+            print(f"{label:<34} skipped: no rows")
+            continue
+        for _ in range(args.warmup):
+            for _, mode_cursor in modes:
+                time_call(mode_cursor, statement, rng.choice(keys))
+
+        samples = {name: [] for name, _ in modes}
+        for i in range(args.iterations):
+            key = rng.choice(keys)
+            # Alternate which mode goes first so neither always gets the warmer cache
+            order = modes if i % 2 else modes[::-1]
+            for name, mode_cursor in order:
+                samples[name].append(time_call(mode_cursor, statement, key))
+
+        summaries = {name: summarize(values) for name, values in samples.items()}
+        for name, summary in summaries.items():
+            print(format_line(f"{label} ({name})", summary))
+        saved = summaries["text"]["mean_ms"] - summaries["prepared"]["mean_ms"]
+        print(f"{'':<34} prepared saves {saved * 1000:.1f}µs per call "
+              f"({saved / summaries['text']['mean_ms'] * 100:.1f}% of the mean)\n")
+
+    plain.close()
+    prepared.close()
+
+
+if __name__ == "__main__":
+    main()
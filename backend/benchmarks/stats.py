@@ -0,0 +1,36 @@
+"""Latency statistics shared by the benchmark scripts."""
+import statistics
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (any order)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(seconds, rows=0, statuses=None):
+    """Reduce per-call durations (in seconds) to the numbers stored in a baseline."""
+    ms = [s * 1000 for s in seconds]
+    total = sum(seconds)
+    return {
+        "n": len(ms),
+        "mean_ms": statistics.fmean(ms) if ms else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms) if ms else 0.0,
+        "ops_per_s": len(ms) / total if total else 0.0,
+        "rows_per_s": rows / total if total else 0.0,
+        "statuses": statuses or {},
+    }
+
+
+def format_line(label, summary):
+    codes = ", ".join(f"{code}: {count}" for code, count in sorted(summary["statuses"].items()))
+    return (f"{label:<34} n={summary['n']:<5} p50={summary['p50_ms']:8.2f}ms "
+            f"p95={summary['p95_ms']:8.2f}ms p99={summary['p99_ms']:8.2f}ms "
+            f"{summary['rows_per_s']:>10,.0f} rows/s  [{codes}]")
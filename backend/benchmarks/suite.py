@@ -0,0 +1,324 @@
+"""Endpoint benchmarks through the Flask test client, across dataset sizes.
+
+Against the database in DATABASE_URL (migrated with `flask db upgrade`):
+
+    python -m benchmarks.suite --prepare --sizes 10000 100000 1000000 --out benchmarks/results/main.json
+    python -m benchmarks.suite --prepare --sizes 10000 100000 1000000 --compare benchmarks/results/main.json
+
+--prepare WIPES the student, program and college tables and regenerates each
+size with app.utils.generate (fixed seed, so every run sees the same data).
+Without it the suite runs once against whatever data is already there.
+
+Each case is called --iterations times after --warmup untimed calls. The
+baseline JSON records latency percentiles, ops/s and rows/s per case and size;
+--compare prints the change against an earlier baseline and, with
+--fail-on-regression, exits 1 when a p50 or p95 grew by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.stats import format_line, summarize
+
+from app import create_app
+from app.controllers.dashboard_controller import summary_cache
+from app.database import get_db
+from app.models.user import User
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+# Created and deleted by the write cases; outside the generator's ID range
+WRITE_ID_PREFIX = 9990
+
+
+def prepare(size, seed):
+    programs = max(20, min(2000, size // 500))
+    colleges = max(5, programs // 10)
+    subprocess.run(
+        [sys.executable, "-m", "app.utils.generate", "--reset", "--seed", str(seed),
+         "--students", str(size), "--programs", str(programs), "--colleges", str(colleges)],
+        check=True
+    )
+    db = get_db()
+    cursor = db.cursor()
+    cursor.execute("ANALYZE student, program, college")
+    db.commit()
+    cursor.close()
+
+
+def ensure_user():
+    if not User.exists(BENCH_EMAIL):
+        User(username="bench", email=BENCH_EMAIL).add(BENCH_PASSWORD)
+
+
+def samples_from_db(seed):
+    db = get_db()
+    cursor = db.cursor()
+    cursor.execute("SELECT studentid, lastname FROM student TABLESAMPLE SYSTEM (1) LIMIT 200")
+    students = cursor.fetchall()
+    if not students:
+        cursor.execute("SELECT studentid, lastname FROM student LIMIT 200")
+        students = cursor.fetchall()
+    cursor.execute("SELECT programcode FROM program ORDER BY programcode")
+    programs = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT collegecode FROM college ORDER BY collegecode")
+    colleges = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT COUNT(*) FROM student")
+    total = cursor.fetchone()[0]
+    db.rollback()
+    cursor.close()
+    if not students or not programs:
+        sys.exit("The database needs students and programs; run with --prepare.")
+    rng = random.Random(seed)
+    return {
+        "rng": rng,
+        "student_ids": [row[0] for row in students],
+        "name_fragments": sorted({row[1].lower()[:4] for row in students}),
+        "programs": programs,
+        "colleges": colleges,
+        "total": total,
+    }
+
+
+def rows_in(response, key):
+    if key is None or response.status_code != 200:
+        return 0
+    body = response.get_json(silent=True) or {}
+    value = body.get(key)
+    return len(value) if isinstance(value, list) else 0
+
+
+def read_cases(ctx):
+    """(name, callable(client, rng) -> (response, rows)) for the read-only endpoints."""
+    def get(path_fn, key=None):
+        def run(client, rng):
+            response = client.get(path_fn(rng))
+            return response, rows_in(response, key)
+        return run
+
+    def dashboard(cached):
+        def run(client, rng):
+            if not cached:
+                summary_cache.clear()
+            response = client.get("/api/dashboard/summary")
+            return response, 0
+        return run
+
+    pick = lambda items: lambda rng: rng.choice(items)
+    student_id, fragment, program = pick(ctx["student_ids"]), pick(ctx["name_fragments"]), pick(ctx["programs"])
+    last_page = max(1, ctx["total"] // 15)
+
+    return [
+        ("students list page 1", get(lambda r: "/api/students?page=1&per_page=15", "students")),
+        ("students list page 1 estimate", get(lambda r: "/api/students?page=1&per_page=15&count=estimate", "students")),
+        ("students deep page", get(lambda r: f"/api/students?page={last_page}&per_page=15&count=estimate", "students")),
+        ("students cursor page", get(lambda r: "/api/students?cursor=&per_page=15", "students")),
+        ("students sort lastName desc", get(lambda r: "/api/students?sortBy=lastName&order=desc", "students")),
+        ("students sort programCode", get(lambda r: "/api/students?sortBy=programCode", "students")),
+        ("students search all", get(lambda r: f"/api/students?search={fragment(r)}", "students")),
+        ("students search lastName", get(lambda r: f"/api/students?search={fragment(r)}&searchBy=lastName", "students")),
+        ("students search relevance", get(lambda r: f"/api/students?search={fragment(r)}&sortBy=relevance", "students")),
+        ("students filter program", get(lambda r: f"/api/students?programCode={program(r)}", "students")),
+        ("students filter gender+year", get(lambda r: "/api/students?gender=female&yearLevel=2,3", "students")),
+        ("student detail", get(lambda r: f"/api/students/{student_id(r)}")),
+        ("students by program (stream)", get(lambda r: f"/api/students/by-program?programCode={program(r)}", "students")),
+        ("students count by program", get(lambda r: "/api/students/count-by-program")),
+        ("students count by gender", get(lambda r: "/api/students/count-by-gender")),
+        ("students total", get(lambda r: "/api/students/total")),
+        ("programs list", get(lambda r: "/api/programs?page=1&per_page=15", "programs")),
+        ("programs dropdown", get(lambda r: "/api/programs/dropdown", "programs")),
+        ("colleges list", get(lambda r: "/api/colleges?page=1&per_page=15", "colleges")),
+        ("dashboard summary (uncached)", dashboard(cached=False)),
+        ("dashboard summary (cached)", dashboard(cached=True)),
+        ("auth ping", get(lambda r: "/api/auth/ping")),
+    ]
+
+
+def write_cases(ctx):
+    """Create, update, then delete the same students so the dataset is left unchanged."""
+    created = []
+    counter = iter(range(10000))
+
+    def create(client, rng):
+        student_id = f"{WRITE_ID_PREFIX}-{next(counter):04d}"
+        response = client.post("/api/students/create", json={
+            "studentID": student_id, "firstName": "Bench", "lastName": "Mark",
+            "programCode": rng.choice(ctx["programs"]), "yearLevel": 1, "gender": "Female",
+        })
+        if response.status_code == 201:
+            created.append(student_id)
+        return response, 0
+
+    def update(client, rng):
+        student_id = rng.choice(created) if created else f"{WRITE_ID_PREFIX}-missing"
+        response = client.put(f"/api/students/{student_id}", json={
+            "studentID": student_id, "firstName": "Bench", "lastName": "Updated",
+            "programCode": rng.choice(ctx["programs"]), "yearLevel": 2, "gender": "Male",
+        })
+        return response, 0
+
+    def delete(client, rng):
+        student_id = created.pop() if created else f"{WRITE_ID_PREFIX}-missing"
+        return client.delete(f"/api/students/{student_id}"), 0
+
+    return [("student create", create), ("student update", update), ("student delete", delete)]
+
+
+def login_case(client, rng):
+    return client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}), 0
+
+
+def measure(client, rng, run, iterations, warmup):
+    for _ in range(warmup):
+        run(client, rng)
+    seconds, rows, statuses = [], 0, {}
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response, count = run(client, rng)
+        seconds.append(time.perf_counter() - started)
+        rows += count
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    return summarize(seconds, rows, statuses)
+
+
+class BenchClient:
+    """Test client whose requests go to 127.0.0.1, the domain the JWT cookie is scoped to."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def open(self, method, path, **kwargs):
+        return self.client.open(path, method=method, base_url="http://127.0.0.1", **kwargs)
+
+    def get(self, path, **kwargs):
+        return self.open("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.open("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.open("PUT", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.open("DELETE", path, **kwargs)
+
+
+def run_size(app, ctx, args):
+    client = BenchClient(app)
+    client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    rng = ctx["rng"]
+    results = {}
+
+    for name, run in read_cases(ctx):
+        results[name] = measure(client, rng, run, args.iterations, args.warmup)
+        print(format_line(name, results[name]))
+
+    # Writes run once per iteration each, in create -> update -> delete order
+    write_iterations = min(args.iterations, 1000)
+    for name, run in write_cases(ctx):
+        results[name] = measure(client, rng, run, write_iterations, 0)
+        print(format_line(name, results[name]))
+
+    login_iterations = max(5, args.iterations // 20)
+    results["auth login"] = measure(BenchClient(app), rng, login_case, login_iterations, 1)
+    print(format_line("auth login", results["auth login"]))
+    return results
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for size, cases in current["results"].items():
+        base_cases = baseline["results"].get(size)
+        if not base_cases:
+            continue
+        print(f"\n== {size} students: change vs baseline ({baseline['meta']['commit'] or 'unknown'}) ==")
+        for name, result in cases.items():
+            base = base_cases.get(name)
+            if not base:
+                continue
+            deltas = []
+            for metric in ("p50_ms", "p95_ms"):
+                before, after = base[metric], result[metric]
+                change = (after - before) / before if before else 0.0
+                deltas.append(f"{metric[:3]} {before:8.2f} -> {after:8.2f}ms ({change:+6.1%})")
+                if change > threshold:
+                    regressions.append((size, name, metric, change))
+            print(f"  {name:<34} " + "   ".join(deltas))
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--prepare", action="store_true", help="wipe and regenerate the data for each size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    app = create_app()
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    sizes = args.sizes if args.prepare else [None]
+    for size in sizes:
+        with app.app_context():
+            if size is not None:
+                print(f"\nPreparing {size:,} students...")
+                prepare(size, args.seed)
+            ensure_user()
+            ctx = samples_from_db(args.seed)
+        label = str(ctx["total"])
+        print(f"\n== {ctx['total']:,} students ==")
+        report["results"][label] = run_size(app, ctx, args)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nSaved {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for size, name, metric, change in regressions:
+                print(f"- {size} students, {name}: {metric} {change:+.1%}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print(f"\nNo regressions above {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
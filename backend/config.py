@@ -8,7 +8,88 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///dev.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_CHECK_INTERVAL = float(os.getenv("DB_POOL_CHECK_INTERVAL", "30"))
+    # Connections every worker process together may hold (PostgreSQL's max_connections
+    # less some headroom); gunicorn.conf.py sizes the worker count to stay under it
+    DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+    # Prepare hot point queries once per pooled connection; turn off behind a
+    # transaction-pooling proxy (PgBouncer) that does not keep sessions
+    DB_PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true"
+
+    # asgi.py (optional): asyncpg pool for the async read endpoints, and the
+    # threads that run every other request through the Flask app
+    ASYNC_DB_POOL_MIN_SIZE = int(os.getenv("ASYNC_DB_POOL_MIN_SIZE", "2"))
+    ASYNC_DB_POOL_MAX_SIZE = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "20"))
+    ASYNC_WSGI_THREADS = int(os.getenv("ASYNC_WSGI_THREADS", "16"))
+
+    # How long /readyz waits for a pooled connection before reporting unavailable
+    HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", "2"))
+
     ITEMS_PER_PAGE = int(os.getenv("ITEMS_PER_PAGE", "15"))
+    # count=estimate switches to planner estimates at or above this many rows
+    COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "10000"))
+
+    IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+    IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+    BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "1000"))
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+    # Hard cap on rows a streamed /list or /by-program response may contain
+    MAX_STREAM_ROWS = int(os.getenv("MAX_STREAM_ROWS", "50000"))
+    STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+    DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "15"))
+    # College/program lists are invalidated on write; the TTL bounds staleness
+    # across worker processes, which each hold their own copy
+    REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+    REFERENCE_CACHE_MAXSIZE = int(os.getenv("REFERENCE_CACHE_MAXSIZE", "64"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+    USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "1024"))
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+    COMPRESS_STATIC = os.getenv("COMPRESS_STATIC", "true").lower() == "true"
+    # Frontend files above this size are streamed from disk instead of kept in memory
+    ASSET_MEMORY_MAX_SIZE = int(os.getenv("ASSET_MEMORY_MAX_SIZE", str(4 * 1024 * 1024)))
+
+    # Any werkzeug generate_password_hash method, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000";
+    # stored hashes made with a different method are upgraded on the next login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+    # Per-route latency, SQL and pool/cache metrics on /metrics (Prometheus format);
+    # set METRICS_TOKEN to require "Authorization: Bearer <token>" when scraping
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+    # The /api/admin endpoints require "Authorization: Bearer <token>"; they are
+    # off (404) while no token is set
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # Statements at or over this many milliseconds are logged and listed on
+    # /api/admin/slow-queries; 0 turns the slow-query log off
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+    # Re-run slow reads under EXPLAIN (ANALYZE, BUFFERS) in the background, once per shape per interval
+    SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "10000"))
+
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    # "json" (one object per line) or "text"
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    # Records waiting for the background writer; more than this are dropped, never waited on
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Share of requests whose read-path events and successful GET access lines are logged
+    LOG_READ_SAMPLE_RATE = float(os.getenv("LOG_READ_SAMPLE_RATE", "0.1"))
+    LOG_ACCESS = os.getenv("LOG_ACCESS", "true").lower() == "true"
+    # Requests slower than this are always logged, as warnings
+    LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "500"))
 
     CORS_ORIGINS = ["http://127.0.0.1:3000"]
 
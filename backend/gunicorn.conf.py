@@ -0,0 +1,97 @@
+"""Production server: ``gunicorn -c gunicorn.conf.py`` from backend/.
+
+create_app() runs once in the master (preload_app) and the workers are forked
+from it, so they share the imported code and the precompressed frontend. Each
+worker then opens its own pooled connections and loads the reference data
+before it accepts connections (app.utils.health); /readyz reports 503 until
+that has happened and again once the worker starts shutting down.
+"""
+import os
+import signal
+
+from dotenv import load_dotenv
+
+# config.Config reads the environment once, at import, so .env must be loaded first
+load_dotenv()
+
+from config import Config  # noqa: E402
+
+
+def _cpu_count():
+    try:
+        # The CPUs this process may run on, which a container can limit
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _default_workers():
+    # One process per core: the threads cover time spent waiting on the database,
+    # and workers × pool size must stay within what PostgreSQL will accept
+    return max(1, min(_cpu_count(), Config.DB_MAX_CONNECTIONS // Config.DB_POOL_MAX_SIZE))
+
+
+wsgi_app = "run:app"
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+preload_app = True
+
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or _default_workers()
+# A request holds at most one pooled connection, so threads beyond the pool size would only queue for one
+threads = int(os.getenv("GUNICORN_THREADS", "0")) or Config.DB_POOL_MAX_SIZE
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# In-flight requests get this long to finish after SIGTERM
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recycle workers after this many requests (0: never); the jitter keeps them from restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+# The app writes its own structured access records (LOG_ACCESS)
+accesslog = None
+
+
+def _flask_app(server):
+    # Already loaded in the master with preload_app; this returns the same object
+    return server.app.wsgi()
+
+
+def when_ready(server):
+    from app.database import get_pool
+
+    # The master never serves requests; no connection of its own may leak into the workers
+    get_pool(_flask_app(server)).closeall()
+    server.log.info(f"Serving with {workers} workers × {threads} threads "
+                    f"(DB_POOL_MAX_SIZE={Config.DB_POOL_MAX_SIZE}, DB_MAX_CONNECTIONS={Config.DB_MAX_CONNECTIONS})")
+
+
+def post_fork(server, worker):
+    from app.utils.log import get_pipeline
+
+    # The log writer thread did not survive the fork; warm-up logs need it
+    get_pipeline().start()
+
+
+def post_worker_init(worker):
+    from app.utils.health import get_health
+
+    health = get_health(_flask_app(worker))
+    # Runs before the worker's accept loop, so no request arrives while this is cold
+    health.warm_up()
+
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def drain(signum, frame):
+        health.drain()
+        handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, drain)
+
+
+def worker_exit(server, worker):
+    from app.database import get_pool
+    from app.utils.log import get_pipeline
+
+    get_pool(_flask_app(server)).closeall()
+    get_pipeline().stop()
@@ -0,0 +1,61 @@
+"""initial schema
+
+Revision ID: 3c8e5d1a9f20
+Revises: 
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e5d1a9f20'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # IF NOT EXISTS so databases that were created by hand can be stamped forward
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS college (
+            collegecode VARCHAR(10) PRIMARY KEY,
+            collegename VARCHAR(255) NOT NULL
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS program (
+            programcode VARCHAR(10) PRIMARY KEY,
+            programname VARCHAR(255) NOT NULL,
+            collegecode VARCHAR(10) REFERENCES college (collegecode)
+                ON UPDATE CASCADE ON DELETE SET NULL
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS student (
+            studentid VARCHAR(9) PRIMARY KEY,
+            firstname VARCHAR(255) NOT NULL,
+            lastname VARCHAR(255) NOT NULL,
+            programcode VARCHAR(10) REFERENCES program (programcode)
+                ON UPDATE CASCADE ON DELETE SET NULL,
+            yearlevel INTEGER NOT NULL,
+            gender VARCHAR(20) NOT NULL,
+            photo_url TEXT
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            userid SERIAL PRIMARY KEY,
+            username VARCHAR(255) NOT NULL UNIQUE,
+            email VARCHAR(255) NOT NULL UNIQUE,
+            user_password TEXT NOT NULL
+        )
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS users")
+    op.execute("DROP TABLE IF EXISTS student")
+    op.execute("DROP TABLE IF EXISTS program")
+    op.execute("DROP TABLE IF EXISTS college")
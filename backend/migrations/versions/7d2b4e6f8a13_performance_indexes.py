@@ -0,0 +1,61 @@
+"""performance indexes
+
+Revision ID: 7d2b4e6f8a13
+Revises: a1f3c9e2b7d4
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2b4e6f8a13'
+down_revision = 'a1f3c9e2b7d4'
+branch_labels = None
+depends_on = None
+
+
+# B-tree indexes for the predicates and ORDER BYs in app/models/*.py. Expressions
+# are spelled exactly as the queries spell them so the planner can match them.
+INDEXES = [
+    # Student.exists()
+    ("ix_student_studentid_lower", "student", "(LOWER(studentid))"),
+    # Student.query() filters, each followed by the default sort key
+    ("ix_student_programcode_lower", "student", "(LOWER(programcode)), studentid"),
+    ("ix_student_gender_lower", "student", "(LOWER(gender)), studentid"),
+    ("ix_student_yearlevel_text", "student", "(CAST(yearlevel AS TEXT)), studentid"),
+    # Student.students_by_prog(), Program.delete_with_student_update(), sortBy=programCode
+    ("ix_student_programcode_lastname", "student", "programcode, lastname"),
+    # Student.all() and the sortBy columns; the key suffix also serves keyset pages
+    ("ix_student_lastname", "student", "lastname, studentid"),
+    ("ix_student_firstname", "student", "firstname, studentid"),
+    ("ix_student_yearlevel", "student", "yearlevel, studentid"),
+    ("ix_student_gender", "student", "gender, studentid"),
+    ("ix_student_programcode_keyset", "student", "(COALESCE(programcode, '')), studentid"),
+
+    # Program.exists()
+    ("ix_program_programcode_lower", "program", "(LOWER(programcode))"),
+    # Program.by_college(), College.delete_with_program_update(), sortBy=collegeCode
+    ("ix_program_collegecode", "program", "collegecode, programcode"),
+    # Program.all() and sortBy=programName
+    ("ix_program_programname", "program", "programname, programcode"),
+    ("ix_program_collegecode_keyset", "program", "(COALESCE(collegecode, '')), programcode"),
+
+    # College.exists()
+    ("ix_college_collegecode_lower", "college", "(LOWER(collegecode))"),
+    # College.all() and sortBy=collegeName
+    ("ix_college_collegename", "college", "collegename, collegecode"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,165 @@
+"""student stats counters
+
+Revision ID: 9e4a7c2d5b31
+Revises: 7d2b4e6f8a13
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4a7c2d5b31'
+down_revision = '7d2b4e6f8a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One row per (program, gender, year level) group. Missing values are stored
+    # as '' / 0 so the group key can be a plain unique constraint.
+    op.execute("""
+        CREATE TABLE student_stats (
+            programcode VARCHAR(10) NOT NULL,
+            gender VARCHAR(20) NOT NULL,
+            yearlevel INTEGER NOT NULL,
+            student_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (programcode, gender, yearlevel)
+        )
+    """)
+
+    # Deltas of transactions that have not committed yet, one row per group
+    op.execute("""
+        CREATE UNLOGGED TABLE student_stats_pending (
+            txid BIGINT NOT NULL,
+            programcode VARCHAR(10) NOT NULL,
+            gender VARCHAR(20) NOT NULL,
+            yearlevel INTEGER NOT NULL,
+            delta BIGINT NOT NULL,
+            PRIMARY KEY (txid, programcode, gender, yearlevel)
+        )
+    """)
+
+    # Statement-level triggers with transition tables: a COPY, batch UPDATE or
+    # the program-delete cascade adds each affected group's delta once per
+    # statement. The deltas only go to the transaction's own pending rows, so a
+    # write never waits on another transaction for a counter row; an UPDATE
+    # nets its old and new rows.
+    op.execute("""
+        CREATE FUNCTION student_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM student_stats_pending WHERE txid = txid_current();
+                DELETE FROM student_stats;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO student_stats_pending AS p (txid, programcode, gender, yearlevel, delta)
+                SELECT txid_current(), COALESCE(programcode, ''), COALESCE(gender, ''), COALESCE(yearlevel, 0), COUNT(*)
+                FROM new_rows
+                GROUP BY 2, 3, 4
+                ON CONFLICT (txid, programcode, gender, yearlevel)
+                DO UPDATE SET delta = p.delta + EXCLUDED.delta;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO student_stats_pending AS p (txid, programcode, gender, yearlevel, delta)
+                SELECT txid_current(), COALESCE(programcode, ''), COALESCE(gender, ''), COALESCE(yearlevel, 0), -COUNT(*)
+                FROM old_rows
+                GROUP BY 2, 3, 4
+                ON CONFLICT (txid, programcode, gender, yearlevel)
+                DO UPDATE SET delta = p.delta + EXCLUDED.delta;
+            ELSE
+                INSERT INTO student_stats_pending AS p (txid, programcode, gender, yearlevel, delta)
+                SELECT txid_current(), programcode, gender, yearlevel, SUM(delta)
+                FROM (
+                    SELECT COALESCE(programcode, '') AS programcode, COALESCE(gender, '') AS gender,
+                           COALESCE(yearlevel, 0) AS yearlevel, 1 AS delta
+                    FROM new_rows
+                    UNION ALL
+                    SELECT COALESCE(programcode, ''), COALESCE(gender, ''), COALESCE(yearlevel, 0), -1
+                    FROM old_rows
+                ) d
+                GROUP BY 2, 3, 4
+                HAVING SUM(delta) <> 0
+                ON CONFLICT (txid, programcode, gender, yearlevel)
+                DO UPDATE SET delta = p.delta + EXCLUDED.delta;
+            END IF;
+
+            RETURN NULL;
+        END
+        $$
+    """)
+
+    # At COMMIT a deferred constraint trigger applies all of the transaction's
+    # deltas in one upsert, in key order: the counter rows are locked only
+    # while the transaction commits, and two committing transactions lock
+    # shared groups in the same order, so they cannot deadlock however many
+    # statements each ran. Groups left with no students are deleted, so
+    # emptied groups do not pile up in the dashboard scan.
+    op.execute("""
+        CREATE FUNCTION student_stats_commit() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- The first firing in a transaction applies every delta and clears
+            -- its pending rows; the others find nothing left to do
+            INSERT INTO student_stats AS t (programcode, gender, yearlevel, student_count)
+            SELECT programcode, gender, yearlevel, delta
+            FROM student_stats_pending
+            WHERE txid = NEW.txid AND delta <> 0
+            ORDER BY 1, 2, 3
+            ON CONFLICT (programcode, gender, yearlevel)
+            DO UPDATE SET student_count = t.student_count + EXCLUDED.student_count;
+            DELETE FROM student_stats s
+            USING student_stats_pending p
+            WHERE p.txid = NEW.txid AND p.delta < 0
+              AND (s.programcode, s.gender, s.yearlevel) = (p.programcode, p.gender, p.yearlevel)
+              AND s.student_count = 0;
+            DELETE FROM student_stats_pending WHERE txid = NEW.txid;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER student_stats_pending_commit
+        AFTER INSERT ON student_stats_pending
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION student_stats_commit()
+    """)
+
+    # Block writers while the triggers go in and the counters are backfilled
+    op.execute("LOCK TABLE student IN SHARE ROW EXCLUSIVE MODE")
+    op.execute("""
+        CREATE TRIGGER student_stats_insert AFTER INSERT ON student
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION student_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER student_stats_update AFTER UPDATE ON student
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION student_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER student_stats_delete AFTER DELETE ON student
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION student_stats_apply()
+    """)
+    op.execute("""
+        CREATE TRIGGER student_stats_truncate AFTER TRUNCATE ON student
+        FOR EACH STATEMENT EXECUTE FUNCTION student_stats_apply()
+    """)
+    op.execute("""
+        INSERT INTO student_stats (programcode, gender, yearlevel, student_count)
+        SELECT COALESCE(programcode, ''), COALESCE(gender, ''), COALESCE(yearlevel, 0), COUNT(*)
+        FROM student
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade():
+    for name in ("insert", "update", "delete", "truncate"):
+        op.execute(f"DROP TRIGGER IF EXISTS student_stats_{name} ON student")
+    op.execute("DROP FUNCTION IF EXISTS student_stats_apply()")
+    op.execute("DROP TRIGGER IF EXISTS student_stats_pending_commit ON student_stats_pending")
+    op.execute("DROP FUNCTION IF EXISTS student_stats_commit()")
+    op.execute("DROP TABLE IF EXISTS student_stats_pending")
+    op.execute("DROP TABLE IF EXISTS student_stats")
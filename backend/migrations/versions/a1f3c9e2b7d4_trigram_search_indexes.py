@@ -0,0 +1,47 @@
+"""trigram search indexes
+
+Revision ID: a1f3c9e2b7d4
+Revises: 3c8e5d1a9f20
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1f3c9e2b7d4'
+down_revision = '3c8e5d1a9f20'
+branch_labels = None
+depends_on = None
+
+
+# One GIN index per searchable expression, written exactly as the models'
+# search_columns so the planner can match LOWER(col) LIKE '%term%' to them.
+# Gender and year level are matched through their distinct values and B-tree
+# indexes instead (Student.search_domains).
+TRIGRAM_INDEXES = [
+    ("ix_student_studentid_trgm", "student", "LOWER(studentid)"),
+    ("ix_student_firstname_trgm", "student", "LOWER(firstname)"),
+    ("ix_student_lastname_trgm", "student", "LOWER(lastname)"),
+    ("ix_student_programcode_trgm", "student", "LOWER(programcode)"),
+    ("ix_program_programcode_trgm", "program", "LOWER(programcode)"),
+    ("ix_program_programname_trgm", "program", "LOWER(programname)"),
+    ("ix_program_collegecode_trgm", "program", "LOWER(collegecode)"),
+    ("ix_college_collegecode_trgm", "college", "LOWER(collegecode)"),
+    ("ix_college_collegename_trgm", "college", "LOWER(collegename)"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so an existing student table stays writable
+    with op.get_context().autocommit_block():
+        for name, table, expr in TRIGRAM_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (({expr}) gin_trgm_ops)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
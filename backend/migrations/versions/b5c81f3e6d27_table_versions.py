@@ -0,0 +1,56 @@
+"""table versions
+
+Revision ID: b5c81f3e6d27
+Revises: 9e4a7c2d5b31
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5c81f3e6d27'
+down_revision = '9e4a7c2d5b31'
+branch_labels = None
+depends_on = None
+
+TABLES = ("student", "program", "college")
+
+
+def upgrade():
+    op.execute("""
+        CREATE TABLE table_versions (
+            table_name VARCHAR(63) PRIMARY KEY,
+            version BIGINT NOT NULL
+        )
+    """)
+    # Start from the current time in milliseconds so a recreated database never
+    # hands out version numbers (and therefore ETags) that a client has already seen.
+    op.execute(f"""
+        INSERT INTO table_versions (table_name, version)
+        SELECT name, (EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::bigint
+        FROM unnest(ARRAY{list(TABLES)}) AS name
+    """)
+
+    op.execute("""
+        CREATE FUNCTION table_versions_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for table in TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table}_version_bump
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION table_versions_bump()
+        """)
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_version_bump ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS table_versions_bump()")
+    op.execute("DROP TABLE IF EXISTS table_versions")
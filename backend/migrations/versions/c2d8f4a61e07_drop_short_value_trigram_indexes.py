@@ -0,0 +1,35 @@
+"""drop the gender and year level trigram indexes
+
+Revision ID: c2d8f4a61e07
+Revises: b5c81f3e6d27
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d8f4a61e07'
+down_revision = 'b5c81f3e6d27'
+branch_labels = None
+depends_on = None
+
+
+# Gender and year level hold a few one- to six-character values: a trigram
+# index cannot narrow a search on them. A search now matches the term against
+# their distinct values and finds the rows on ix_student_gender_lower and
+# ix_student_yearlevel_text (Student.search_domains). Databases created after
+# trigram_search_indexes stopped creating these have nothing to drop.
+INDEXES = ["ix_student_yearlevel_trgm", "ix_student_gender_trgm"]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def downgrade():
+    # Nothing to restore: trigram_search_indexes no longer creates them either
+    pass
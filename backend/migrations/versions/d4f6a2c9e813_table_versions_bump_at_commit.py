@@ -0,0 +1,97 @@
+"""bump table versions at commit
+
+Revision ID: d4f6a2c9e813
+Revises: c2d8f4a61e07
+Create Date: 2026-10-18 14:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f6a2c9e813'
+down_revision = 'c2d8f4a61e07'
+branch_labels = None
+depends_on = None
+
+# The statement triggers used to UPDATE the table's table_versions row right
+# away, which row-locked it until the writing transaction ended: two writers
+# of the same table were serialized for the whole of the first one's
+# transaction (a long import blocked every other student write).
+#
+# Now a write only queues the table in table_versions_pending (an INSERT,
+# which never waits on another transaction), at most once per table and
+# transaction. A deferred constraint trigger bumps the counters at COMMIT, so
+# the row lock is held only while the transaction commits. Counters are
+# locked in table-name order, so two transactions committing writes to the
+# same tables cannot deadlock.
+#
+# A lock-free version (a sequence value, or the rows' xmin / pg_current_xact_id())
+# is fixed when the write happens, not when it commits: a reader can see a
+# later transaction's number before an earlier one commits, and then keep that
+# ETag for data that changed underneath it. Bumping at commit keeps the
+# version in step with what readers can see.
+
+BUMP_AT_COMMIT = """
+    CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Once per table and transaction; the flag is transaction-local
+        IF current_setting('table_versions.pending_' || TG_TABLE_NAME, true) IS DISTINCT FROM 'on' THEN
+            PERFORM set_config('table_versions.pending_' || TG_TABLE_NAME, 'on', true);
+            INSERT INTO table_versions_pending (txid, table_name) VALUES (txid_current(), TG_TABLE_NAME);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+BUMP_NOW = """
+    CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+        RETURN NULL;
+    END
+    $$
+"""
+
+
+def upgrade():
+    # Holds only the rows of transactions that have not committed yet
+    op.execute("""
+        CREATE UNLOGGED TABLE table_versions_pending (
+            txid BIGINT NOT NULL,
+            table_name VARCHAR(63) NOT NULL,
+            PRIMARY KEY (txid, table_name)
+        )
+    """)
+    op.execute("""
+        CREATE FUNCTION table_versions_commit() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- The first firing in a transaction bumps every table it wrote and
+            -- clears its pending rows; the others find nothing left to do
+            PERFORM 1 FROM table_versions
+            WHERE table_name IN (SELECT table_name FROM table_versions_pending WHERE txid = NEW.txid)
+            ORDER BY table_name
+            FOR UPDATE;
+            UPDATE table_versions SET version = version + 1
+            WHERE table_name IN (SELECT table_name FROM table_versions_pending WHERE txid = NEW.txid);
+            DELETE FROM table_versions_pending WHERE txid = NEW.txid;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE CONSTRAINT TRIGGER table_versions_pending_commit
+        AFTER INSERT ON table_versions_pending
+        DEFERRABLE INITIALLY DEFERRED
+        FOR EACH ROW EXECUTE FUNCTION table_versions_commit()
+    """)
+    op.execute(BUMP_AT_COMMIT)
+
+
+def downgrade():
+    op.execute(BUMP_NOW)
+    op.execute("DROP TRIGGER IF EXISTS table_versions_pending_commit ON table_versions_pending")
+    op.execute("DROP FUNCTION IF EXISTS table_versions_commit()")
+    op.execute("DROP TABLE IF EXISTS table_versions_pending")
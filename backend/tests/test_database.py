@@ -0,0 +1,81 @@
+import pytest
+
+from app.database import PreparedStatement, execute_prepared, numbered, prepare, prepared_statements
+
+
+def test_numbered_rewrites_placeholders_in_order():
+    assert numbered("SELECT 1 FROM student WHERE studentid = %s AND yearlevel = %s") == \
+        "SELECT 1 FROM student WHERE studentid = $1 AND yearlevel = $2"
+
+
+def test_numbered_unescapes_literal_percent():
+    assert numbered("WHERE LOWER(firstname) LIKE '%%' || %s || '%%'") == "WHERE LOWER(firstname) LIKE '%' || $1 || '%'"
+    assert numbered("SELECT '100%%s' , %s") == "SELECT '100%s' , $1"
+
+
+def test_numbered_without_placeholders():
+    assert numbered("SELECT COUNT(*) FROM program") == "SELECT COUNT(*) FROM program"
+
+
+def test_prepared_statement_sql():
+    statement = PreparedStatement("student_get", "SELECT * FROM student WHERE studentid = %s AND yearlevel = %s")
+    assert statement.param_count == 2
+    assert statement.prepare_sql == "PREPARE student_get AS SELECT * FROM student WHERE studentid = $1 AND yearlevel = $2"
+    assert statement.execute_sql == "EXECUTE student_get (%s, %s)"
+
+
+def test_prepared_statement_without_params():
+    statement = PreparedStatement("program_total", "SELECT COUNT(*) FROM program")
+    assert statement.param_count == 0
+    assert statement.execute_sql == "EXECUTE program_total"
+
+
+def test_prepared_statement_literal_percent():
+    statement = PreparedStatement("student_like", "SELECT 1 FROM student WHERE firstname LIKE '%%s' || %s")
+    assert statement.param_count == 1
+    assert statement.prepare_sql == "PREPARE student_like AS SELECT 1 FROM student WHERE firstname LIKE '%s' || $1"
+    assert statement.execute_sql == "EXECUTE student_like (%s)"
+
+
+def test_prepare_rejects_a_different_statement_under_the_same_name():
+    try:
+        prepare("test_same_name", "SELECT 1")
+        assert prepare("test_same_name", "SELECT 1").sql == "SELECT 1"
+        with pytest.raises(ValueError):
+            prepare("test_same_name", "SELECT 2")
+    finally:
+        prepared_statements.pop("test_same_name", None)
+
+
+class _Connection:
+    def __init__(self, use_prepared):
+        self.use_prepared = use_prepared
+        self.prepared = set()
+
+
+class _Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+
+def test_execute_prepared_prepares_once_per_connection():
+    statement = PreparedStatement("student_get", "SELECT * FROM student WHERE studentid = %s")
+    cursor = _Cursor(_Connection(use_prepared=True))
+    execute_prepared(cursor, statement, ("2024-0001",))
+    execute_prepared(cursor, statement, ("2024-0002",))
+    assert cursor.executed == [
+        (statement.prepare_sql, None),
+        (statement.execute_sql, ("2024-0001",)),
+        (statement.execute_sql, ("2024-0002",)),
+    ]
+
+
+def test_execute_prepared_runs_plain_sql_when_disabled():
+    statement = PreparedStatement("student_get", "SELECT * FROM student WHERE studentid = %s")
+    cursor = _Cursor(_Connection(use_prepared=False))
+    execute_prepared(cursor, statement, ("2024-0001",))
+    assert cursor.executed == [(statement.sql, ("2024-0001",))]
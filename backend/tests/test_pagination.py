@@ -0,0 +1,57 @@
+import base64
+import json
+
+import pytest
+
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset
+
+
+def _token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    token = encode_cursor("Cruz", "2024-0001", "next")
+    assert decode_cursor(token) == {"v": "Cruz", "k": "2024-0001", "d": "next"}
+
+
+def test_round_trip_int_value():
+    token = encode_cursor(3, "2024-0001", "prev")
+    assert decode_cursor(token, int) == {"v": 3, "k": "2024-0001", "d": "prev"}
+
+
+def test_empty_token_is_first_page():
+    assert decode_cursor("") is None
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    _token([1, 2]),
+    _token({"v": "a", "k": "b"}),
+    _token({"v": "a", "k": "b", "d": "sideways"}),
+    _token({"v": "a", "d": "next"}),
+    _token({"v": ["a"], "k": "b", "d": "next"}),
+    _token({"v": {"a": 1}, "k": "b", "d": "next"}),
+    _token({"v": "a", "k": 1, "d": "next"}),
+    _token({"v": "a", "k": None, "d": "next"}),
+    _token({"v": 1, "k": "b", "d": "next"}),
+])
+def test_malformed(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+
+
+@pytest.mark.parametrize("value", ["3", True, 2.5, None])
+def test_wrong_value_type(value):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(_token({"v": value, "k": "b", "d": "next"}), int)
+
+
+def test_keyset_walks_backwards_from_prev_cursor():
+    cursor = decode_cursor(encode_cursor("Cruz", "2024-0001", "prev"))
+    predicate, params, order_sql, backwards = keyset("lastname", "studentid", "asc", cursor)
+    assert predicate == "(lastname, studentid) < (%s, %s)"
+    assert params == ["Cruz", "2024-0001"]
+    assert order_sql == "ORDER BY lastname DESC, studentid DESC"
+    assert backwards
@@ -0,0 +1,60 @@
+from app.models.student import Student
+from app.utils.search import relevance, search_clause
+
+
+def _search(search, search_by, rows=None):
+    matches = None if rows is None else Student.search_matches(search, search_by, rows)
+    return search_clause(Student.search_columns, search, search_by, matches)
+
+
+def test_no_search():
+    assert _search("", "all") == (None, [])
+
+
+def test_substring_field():
+    assert _search("cruz", "lastName") == ("(LOWER(lastname) LIKE %s)", ["%cruz%"])
+
+
+def test_domain_values_lookup():
+    sql, params = Student.search_values_sql("fem", "gender")
+    assert sql == "SELECT DISTINCT 'gender', LOWER(gender) FROM student_stats WHERE LOWER(gender) LIKE %s"
+    assert params == ["%fem%"]
+
+    sql, params = Student.search_values_sql("2", "all")
+    assert sql.count("UNION ALL") == 1
+    assert params == ["%2%", "%2%"]
+
+    assert Student.search_values_sql("cruz", "lastName") == (None, [])
+    assert Student.search_values_sql("", "all") == (None, [])
+
+
+def test_domain_field_matches_the_values_holding_the_term():
+    assert _search("fem", "gender", [("gender", "female")]) == ("(LOWER(gender) = ANY(%s))", [["female"]])
+    assert _search("male", "gender", [("gender", "male"), ("gender", "female")]) == \
+        ("(LOWER(gender) = ANY(%s))", [["male", "female"]])
+    assert _search("2", "yearLevel", [("yearLevel", "2")]) == ("(CAST(yearlevel AS TEXT) = ANY(%s))", [["2"]])
+
+
+def test_domain_field_without_matching_values_matches_nothing():
+    assert _search("zz", "gender", []) == ("FALSE", [])
+
+
+def test_all_leaves_out_domain_fields_without_matching_values():
+    predicate, params = _search("ana", "all", [])
+    assert "gender" not in predicate and "yearlevel" not in predicate
+    assert predicate.count("LIKE %s") == len(Student.search_columns) - len(Student.search_domains)
+    assert params == ["%ana%"] * predicate.count("LIKE %s")
+
+    predicate, params = _search("male", "all", [("gender", "male"), ("gender", "female")])
+    assert "LOWER(gender) = ANY(%s)" in predicate and "yearlevel" not in predicate
+    assert ["male", "female"] in params
+
+
+def test_without_lookup_domain_fields_use_like():
+    assert _search("fem", "gender") == ("(LOWER(gender) LIKE %s)", ["%fem%"])
+
+
+def test_relevance_scores_every_field():
+    expression, params = relevance(Student.search_columns, "male", "gender")
+    assert expression == "word_similarity(%s, LOWER(gender))"
+    assert params == ["male"]
@@ -0,0 +1,66 @@
+from app.models.student import GET_STUDENT
+from app.utils.slow_queries import is_explainable, normalize, query_text, redact, redact_plan
+
+
+def test_normalize_collapses_literals():
+    sql = "SELECT *  FROM student\n WHERE studentid = '2023-0001' AND yearlevel = 3 LIMIT 11"
+    assert normalize(sql) == "SELECT * FROM student WHERE studentid = ? AND yearlevel = ? LIMIT ?"
+
+
+def test_normalize_keeps_identifiers_and_placeholders():
+    assert normalize("SELECT col1 FROM t2 WHERE a = $1 AND b = 'it''s'") == "SELECT col1 FROM t2 WHERE a = $1 AND b = ?"
+
+
+def test_normalize_collapses_values_lists():
+    sql = "INSERT INTO college VALUES ('CCS', 'Computing'), ('COE', 'Engineering')"
+    assert normalize(sql) == "INSERT INTO college VALUES (...)"
+
+
+def test_redact_keeps_shape_only():
+    assert redact(None) is None
+    assert redact(("juan@example.com", 3, None, True, [1, 2])) == ["<str:16>", 3, None, True, "<list:2>"]
+    assert redact({"name": "Juan", "year": 2}) == {"name": "<str:4>", "year": 2}
+
+
+def test_redact_plan_masks_condition_values():
+    plan = "\n".join([
+        "Index Scan using student_pkey on student  (cost=0.28..8.29 rows=1 width=64) (actual time=0.01..0.02 rows=1 loops=1)",
+        "  Index Cond: (studentid = '2023-0001'::text)",
+        "  Filter: ((lower(email) = 'juan@example.com'::text) AND (yearlevel = 3))",
+        "Planning Time: 0.120 ms",
+    ])
+    redacted = redact_plan(plan)
+    assert "2023-0001" not in redacted
+    assert "juan@example.com" not in redacted
+    assert "(yearlevel = ?)" in redacted
+    assert "cost=0.28..8.29 rows=1" in redacted
+    assert "Planning Time: 0.120 ms" in redacted
+
+
+def test_redact_plan_keeps_counters():
+    plan = "\n".join([
+        "Hash Join  (cost=1.09..2.31 rows=4 width=64)",
+        "  Hash Cond: (s.programcode = p.programcode)",
+        "  Join Filter: (s.yearlevel > 2)",
+        "  ->  Seq Scan on student s  (cost=0.00..1.12 rows=4 width=64)",
+        "        Filter: (yearlevel = 3)",
+        "        Rows Removed by Filter: 123456",
+        "        Heap Blocks: exact=42",
+    ])
+    redacted = redact_plan(plan)
+    assert "Rows Removed by Filter: 123456" in redacted
+    assert "Heap Blocks: exact=42" in redacted
+    assert "Join Filter: (s.yearlevel > ?)" in redacted
+    assert "Filter: (yearlevel = ?)" in redacted
+
+
+def test_query_text_resolves_prepared_statements():
+    assert query_text(None, f"EXECUTE {GET_STUDENT.name} ('2023-0001')") == GET_STUDENT.sql
+    assert query_text(None, b"SELECT 1") == "SELECT 1"
+
+
+def test_is_explainable_only_plain_reads():
+    assert is_explainable("SELECT * FROM student")
+    assert is_explainable("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_explainable("SELECT * FROM student FOR UPDATE")
+    assert not is_explainable("UPDATE student SET yearlevel = 2")
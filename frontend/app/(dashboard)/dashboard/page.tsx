@@ -9,49 +9,25 @@ import { ChartGenderDistribution } from "@/components/dashboard-ui/gender-distri
 import { useAuth } from "@/hooks/useAuth"
 import { DashboardSkeleton } from "@/components/global/dashboard-skeleton"
 import { useEffect, useState } from "react"
-import { loadColleges, loadPrograms, loadStudents } from "@/lib/loaders"
+import {
+  DashboardSummary,
+  fetchDashboardSummary,
+} from "@/lib/api/dashboard-api"
 
 export default function DashboardPage() {
   const user = useCurrentUser()
   const { authenticated, loading } = useAuth()
-  const [totalColleges, setTotalColleges] = useState(0)
-  const [totalPrograms, setTotalPrograms] = useState(0)
-  const [totalStudents, setTotalStudents] = useState(0)
+  const [summary, setSummary] = useState<DashboardSummary | null>(null)
 
   useEffect(() => {
-    const fetchCollegesData = async () => {
+    const fetchSummary = async () => {
       try {
-        const { total } = await loadColleges()
-        setTotalColleges(total)
+        setSummary(await fetchDashboardSummary())
       } catch (error) {
-        console.error("Failed to load colleges:", error)
+        console.error("Failed to load dashboard summary:", error)
       }
     }
-    fetchCollegesData()
-  }, [])
-
-  useEffect(() => {
-    const fetchProgramsData = async () => {
-      try {
-        const { total } = await loadPrograms()
-        setTotalPrograms(total)
-      } catch (error) {
-        console.error("Failed to load programs:", error)
-      }
-    }
-    fetchProgramsData()
-  }, [])
-
-  useEffect(() => {
-    const fetchStudentsData = async () => {
-      try {
-        const { total } = await loadStudents()
-        setTotalStudents(total)
-      } catch (error) {
-        console.error("Failed to load students:", error)
-      }
-    }
-    fetchStudentsData()
+    fetchSummary()
   }, [])
 
   if (loading) {
@@ -70,11 +46,11 @@ export default function DashboardPage() {
         <div className="flex-1 flex-col space-y-5">
           <WelcomeBanner name={user?.name ?? "Guest"} />
           <CardDemographic
-            colleges={totalColleges}
-            programs={totalPrograms}
-            students={totalStudents}
+            colleges={summary?.totals.colleges ?? 0}
+            programs={summary?.totals.programs ?? 0}
+            students={summary?.totals.students ?? 0}
           />
-          <AreaChartStudents />
+          <AreaChartStudents data={summary?.by_program ?? []} />
         </div>
 
         <div className="ml-auto flex-col space-y-5">
@@ -82,7 +58,7 @@ export default function DashboardPage() {
             <StudentList />
           </div>
           <div className="w-full">
-            <ChartGenderDistribution />
+            <ChartGenderDistribution data={summary?.by_gender ?? []} />
           </div>
         </div>
       </div>
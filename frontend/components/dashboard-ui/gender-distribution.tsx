@@ -16,7 +16,6 @@ import {
   CardHeader,
   CardTitle,
 } from "@/components/ui/card"
-import { fetchStudentCountByGender } from "@/lib/api/student-api"
 
 const COLORS = ["var(--accent)", "var(--popover-foreground)"]
 
@@ -33,19 +32,17 @@ function ThemedTooltip({ active, payload }: TooltipProps<number, string>) {
   return null
 }
 
-export function ChartGenderDistribution() {
-  const [data, setData] = React.useState<{ gender: string; count: number }[]>(
-    []
-  )
+type ChartGenderDistributionProps = {
+  data: { gender: string; count: number }[]
+}
+
+export function ChartGenderDistribution({
+  data,
+}: ChartGenderDistributionProps) {
   const [isClient, setIsClient] = React.useState(false)
 
   React.useEffect(() => {
     setIsClient(true)
-    fetchStudentCountByGender()
-      .then(setData)
-      .catch((err) =>
-        console.error("Failed to fetch gender distribution:", err)
-      )
   }, [])
 
   if (!isClient) {
@@ -1,6 +1,5 @@
 "use client"
 
-import * as React from "react"
 import { Area, AreaChart, CartesianGrid, XAxis } from "recharts"
 import {
   Card,
@@ -16,19 +15,12 @@ import {
   ChartLegend,
   ChartLegendContent,
 } from "@/components/ui/chart"
-import { fetchStudentCountsByProgram } from "@/lib/api/student-api"
 
-export function AreaChartStudents() {
-  const [data, setData] = React.useState<
-    { programCode: string; count: number }[]
-  >([])
-
-  React.useEffect(() => {
-    fetchStudentCountsByProgram()
-      .then(setData)
-      .catch((err) => console.error("Failed to load chart data:", err))
-  }, [])
+type AreaChartStudentsProps = {
+  data: { programCode: string | null; count: number }[]
+}
 
+export function AreaChartStudents({ data }: AreaChartStudentsProps) {
   return (
     <Card className="h-107.5">
       <CardHeader>
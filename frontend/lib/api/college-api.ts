@@ -1,11 +1,12 @@
 import { College } from "@/components/table/college-columns"
+import { fetchWithETag } from "./etag-fetch"
 
 const BASE_URL = "http://127.0.0.1:5000/api/colleges"
 
 export const fetchColleges = async (): Promise<{
   colleges: College[]
 }> => {
-  const res = await fetch(`${BASE_URL}/list`, {
+  const res = await fetchWithETag(`${BASE_URL}/list`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -28,6 +29,7 @@ export const fetchCollegesFiltered = async (
 ): Promise<{
   colleges: College[]
   total: number
+  total_exact: boolean
   pages: number
   current_page: number
 }> => {
@@ -41,7 +43,7 @@ export const fetchCollegesFiltered = async (
     order,
   })
 
-  const res = await fetch(`${BASE_URL}?${params.toString()}`, {
+  const res = await fetchWithETag(`${BASE_URL}?${params.toString()}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -55,7 +57,7 @@ export const fetchCollegesFiltered = async (
 }
 
 export const fetchCollegesForDropdown = async (): Promise<College[]> => {
-  const res = await fetch(`${BASE_URL}/dropdown`, {
+  const res = await fetchWithETag(`${BASE_URL}/dropdown`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -95,7 +97,7 @@ export const createCollege = async (
 }
 
 export const fetchCollege = async (collegeCode: string): Promise<College> => {
-  const res = await fetch(`${BASE_URL}/${collegeCode}`, {
+  const res = await fetchWithETag(`${BASE_URL}/${collegeCode}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -153,7 +155,7 @@ export const deleteCollege = async (collegeCode: string) => {
 }
 
 export async function fetchCollegesTotal(): Promise<number> {
-  const res = await fetch("http://127.0.0.1:5000/api/colleges/total", {
+  const res = await fetchWithETag("http://127.0.0.1:5000/api/colleges/total", {
     method: "GET",
     credentials: "include",
   })
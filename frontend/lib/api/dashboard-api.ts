@@ -0,0 +1,18 @@
+const BASE_URL = "http://127.0.0.1:5000/api/dashboard"
+
+export type DashboardSummary = {
+  totals: { students: number; programs: number; colleges: number }
+  by_college: { collegeCode: string | null; count: number }[]
+  by_program: { programCode: string | null; count: number }[]
+  by_gender: { gender: string; count: number }[]
+  by_year_level: { yearLevel: number; count: number }[]
+}
+
+export async function fetchDashboardSummary(): Promise<DashboardSummary> {
+  const res = await fetch(`${BASE_URL}/summary`, {
+    method: "GET",
+    credentials: "include",
+  })
+  if (!res.ok) throw new Error("Failed to fetch dashboard summary")
+  return res.json()
+}
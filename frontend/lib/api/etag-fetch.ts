@@ -0,0 +1,49 @@
+// Remembers the last ETag and body per URL and revalidates with If-None-Match.
+// On a 304 the remembered body is replayed, so callers always see a 200.
+type CachedResponse = {
+  etag: string
+  body: string
+  contentType: string
+}
+
+const MAX_ENTRIES = 100
+const cache = new Map<string, CachedResponse>()
+
+export const fetchWithETag = async (
+  url: string,
+  init: RequestInit = {}
+): Promise<Response> => {
+  const cached = cache.get(url)
+  const headers = new Headers(init.headers)
+  if (cached) headers.set("If-None-Match", cached.etag)
+
+  const res = await fetch(url, { ...init, headers })
+
+  if (res.status === 304 && cached) {
+    // Refresh the entry's position so the least recently used URL goes first
+    cache.delete(url)
+    cache.set(url, cached)
+    return new Response(cached.body, {
+      status: 200,
+      headers: { "Content-Type": cached.contentType, ETag: cached.etag },
+    })
+  }
+
+  const etag = res.headers.get("ETag")
+  if (res.ok && etag) {
+    const body = await res.clone().text()
+    cache.delete(url)
+    cache.set(url, {
+      etag,
+      body,
+      contentType: res.headers.get("Content-Type") ?? "application/json",
+    })
+    if (cache.size > MAX_ENTRIES) {
+      cache.delete(cache.keys().next().value as string)
+    }
+  } else if (!res.ok) {
+    cache.delete(url)
+  }
+
+  return res
+}
@@ -1,11 +1,12 @@
 import { Program } from "@/components/table/program-columns"
+import { fetchWithETag } from "./etag-fetch"
 
 const BASE_URL = "http://127.0.0.1:5000/api/programs"
 
 export const fetchPrograms = async (): Promise<{
   programs: Program[]
 }> => {
-  const res = await fetch(`${BASE_URL}/list`, {
+  const res = await fetchWithETag(`${BASE_URL}/list`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -28,6 +29,7 @@ export const fetchProgramsFiltered = async (
 ): Promise<{
   programs: Program[]
   total: number
+  total_exact: boolean
   pages: number
   current_page: number
 }> => {
@@ -41,7 +43,7 @@ export const fetchProgramsFiltered = async (
     order,
   })
 
-  const res = await fetch(`${BASE_URL}?${params.toString()}`, {
+  const res = await fetchWithETag(`${BASE_URL}?${params.toString()}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -55,7 +57,7 @@ export const fetchProgramsFiltered = async (
 }
 
 export const fetchProgramsForDropdown = async (): Promise<Program[]> => {
-  const res = await fetch(`${BASE_URL}/dropdown`, {
+  const res = await fetchWithETag(`${BASE_URL}/dropdown`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -96,7 +98,7 @@ export const createProgram = async (
 }
 
 export const fetchProgram = async (programCode: string): Promise<Program> => {
-  const response = await fetch(`${BASE_URL}/${programCode}`, {
+  const response = await fetchWithETag(`${BASE_URL}/${programCode}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -155,7 +157,7 @@ export const deleteProgram = async (programCode: string) => {
 }
 
 export async function fetchProgramsTotal(): Promise<number> {
-  const res = await fetch("http://127.0.0.1:5000/api/programs/total", {
+  const res = await fetchWithETag("http://127.0.0.1:5000/api/programs/total", {
     method: "GET",
     credentials: "include",
   })
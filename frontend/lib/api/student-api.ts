@@ -1,12 +1,13 @@
 import { Student } from "@/components/table/student-columns"
 import { supabase } from "../supabase/client"
+import { fetchWithETag } from "./etag-fetch"
 
 const BASE_URL = "http://127.0.0.1:5000/api/students"
 
 export const fetchStudents = async (): Promise<{
   students: Student[]
 }> => {
-  const res = await fetch(`${BASE_URL}/list`, {
+  const res = await fetchWithETag(`${BASE_URL}/list`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -47,6 +48,7 @@ export const fetchStudentsFiltered = async (
 ): Promise<{
   students: Student[]
   total: number
+  total_exact: boolean
   pages: number
   current_page: number
 }> => {
@@ -65,7 +67,7 @@ export const fetchStudentsFiltered = async (
   if (filters.yearLevel?.length)
     params.append("yearLevel", filters.yearLevel.join(","))
 
-  const res = await fetch(`${BASE_URL}?${params.toString()}`, {
+  const res = await fetchWithETag(`${BASE_URL}?${params.toString()}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -112,7 +114,7 @@ export const createStudent = async (
 }
 
 export const fetchStudent = async (studentID: string): Promise<Student> => {
-  const response = await fetch(`${BASE_URL}/${studentID}`, {
+  const response = await fetchWithETag(`${BASE_URL}/${studentID}`, {
     method: "GET",
     credentials: "include",
     headers: {
@@ -190,7 +192,7 @@ export const fetchStudentsByProgram = async (
     params.set("programCode", programCode)
   }
 
-  const res = await fetch(`${BASE_URL}/by-program?${params.toString()}`, {
+  const res = await fetchWithETag(`${BASE_URL}/by-program?${params.toString()}`, {
     method: "GET",
     credentials: "include",
   })
@@ -201,7 +203,7 @@ export const fetchStudentsByProgram = async (
 }
 
 export async function fetchStudentCountsByProgram() {
-  const res = await fetch(
+  const res = await fetchWithETag(
     "http://127.0.0.1:5000/api/students/count-by-program",
     {
       method: "GET",
@@ -213,7 +215,7 @@ export async function fetchStudentCountsByProgram() {
 }
 
 export async function fetchStudentCountByGender() {
-  const res = await fetch(
+  const res = await fetchWithETag(
     "http://127.0.0.1:5000/api/students/count-by-gender",
     {
       method: "GET",
@@ -225,7 +227,7 @@ export async function fetchStudentCountByGender() {
 }
 
 export async function fetchStudentsTotal(): Promise<number> {
-  const res = await fetch("http://127.0.0.1:5000/api/students/total", {
+  const res = await fetchWithETag("http://127.0.0.1:5000/api/students/total", {
     method: "GET",
     credentials: "include",
   })